@@ -0,0 +1,406 @@
+# Compact binary session format (.grtlog) with a sidecar time index (.grtidx).
+#
+# .grtlog  header: b"GRTLOG", version u8, reserved u8, session start int64 ns
+#          then append-only chunks, one per writer flush: b"K", flags u8, stored len u32, raw len u32,
+#          first ts int64 ns, last ts int64 ns, followed by the chunk body.
+#          The body is a run of varint records:
+#            0, entry id, name len, name utf-8                      -> entry dictionary definition
+#                                                                       ("entry@source" for a tagged source)
+#            entry id + 1, zigzag(ts - previous ts), payload len, payload utf-8  -> one log message
+#          Timestamps inside a chunk are deltas from the chunk's first ts. A coalesced record keeps its count in
+#          the payload the same way the text log does (" [repeat xN first=HH:MM:SS.mmm]", see models/LogMessage.py).
+#          Chunks are grouped into blocks of about BLOCK_MAX_RAW_BYTES that share one zlib stream. Each chunk
+#          is sync-flushed, so everything up to the last flush survives a crash, and a new block (FLAG_BLOCK_START)
+#          resets the stream so decoding never has to start further back than one block.
+# .grtidx  header: b"GRTIDX", version u8, then records:
+#            b"E" id u16, name len u16, name                      -> copy of the entry dictionary
+#            b"C" first ts, last ts, chunk offset, block offset   -> one checkpoint per chunk (time -> bytes)
+#
+# Seeking to a time only reads the index and decompresses at most one block.
+# Convert back to the text log with:  python -m BinaryLogFormat session.grtlog [out.txt]
+
+import bisect
+import mmap
+import os
+import struct
+import sys
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from models.LogMessage import LogMessage, to_ns, from_ns, split_repeat, split_source
+
+BINARY_LOG_SUFFIX = ".grtlog"
+INDEX_SUFFIX = ".grtidx"
+
+FILE_MAGIC = b"GRTLOG"
+INDEX_MAGIC = b"GRTIDX"
+FORMAT_VERSION = 1
+
+FLAG_ZLIB = 0x01
+FLAG_BLOCK_START = 0x02
+
+FILE_HEADER = struct.Struct("<6sBBq")
+CHUNK_HEADER = struct.Struct("<cBIIqq")
+INDEX_HEADER = struct.Struct("<6sB")
+INDEX_ENTRY = struct.Struct("<cHH")
+INDEX_CHECKPOINT = struct.Struct("<cqqqq")
+
+UNKNOWN_ENTRY = ("unknown", None)
+
+CHUNK_MAX_BYTES = 256 * 1024       # start a new chunk early if a single flush window gets this big
+BLOCK_MAX_RAW_BYTES = 512 * 1024   # restart the compression stream after this much raw data
+
+
+def _write_varint(buf: bytearray, value: int):
+    while value > 0x7F:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(data, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def index_path_for(path: Path) -> Path:
+    return Path(path).with_suffix(INDEX_SUFFIX)
+
+
+class BinaryLogWriter:
+
+    def __init__(self, path: Path, started: datetime, compress: bool = True):
+        self.path = Path(path)
+        self.compress = compress
+
+        self.file_handle = open(self.path, "wb")
+        self.index_handle = open(index_path_for(self.path), "wb")
+        self.file_handle.write(FILE_HEADER.pack(FILE_MAGIC, FORMAT_VERSION, 0, to_ns(started)))
+        self.index_handle.write(INDEX_HEADER.pack(INDEX_MAGIC, FORMAT_VERSION))
+        # on disk right away, a reader opening the segment before the first flush sees an empty log, not an empty file
+        self.file_handle.flush()
+        self.index_handle.flush()
+        self.offset = FILE_HEADER.size
+
+        self.entry_ids: Dict[object, int] = {}  # entry name, or (entry name, source) for a tagged message
+
+        # compression stream of the current block
+        self.block_open = False
+        self.compressor = None
+        self.block_offset = self.offset
+        self.block_raw_bytes = 0
+
+        # current (not yet written) chunk
+        self.chunk = bytearray()
+        self.chunk_first_ts = 0
+        self.chunk_last_ts = 0
+        self.chunk_count = 0
+
+    def write_messages(self, messages: List[LogMessage]):
+        chunk = self.chunk
+        for log_msg in messages:
+            timestamp = log_msg.timestamp_ns
+
+            source = log_msg.source
+            key = log_msg.entry_name if source is None else (log_msg.entry_name, source)
+            entry_id = self.entry_ids.get(key)
+            if entry_id is None:
+                entry_id = self._define_entry(key, log_msg.qualified_name)
+
+            if self.chunk_count == 0:
+                self.chunk_first_ts = timestamp
+                self.chunk_last_ts = timestamp
+
+            delta = timestamp - self.chunk_last_ts
+            text = log_msg.message + log_msg.repeat_suffix() if log_msg.repeat else log_msg.message
+            payload = text.encode("utf-8")
+            _write_varint(chunk, entry_id + 1)
+            _write_varint(chunk, (delta << 1) ^ (delta >> 63))  # zigzag, clocks can step backwards
+            _write_varint(chunk, len(payload))
+            chunk += payload
+
+            self.chunk_last_ts = timestamp
+            self.chunk_count += 1
+
+            if len(chunk) >= CHUNK_MAX_BYTES:
+                self._write_chunk()
+                chunk = self.chunk
+
+    def _define_entry(self, key, qualified_name: str) -> int:
+        entry_id = len(self.entry_ids)
+        self.entry_ids[key] = entry_id
+        name = qualified_name.encode("utf-8")
+
+        _write_varint(self.chunk, 0)
+        _write_varint(self.chunk, entry_id)
+        _write_varint(self.chunk, len(name))
+        self.chunk += name
+
+        self.index_handle.write(INDEX_ENTRY.pack(b"E", entry_id, len(name)) + name)
+        return entry_id
+
+    def _write_chunk(self):
+        if not self.chunk:
+            return
+
+        raw = bytes(self.chunk)
+        flags = 0
+        if not self.block_open or self.block_raw_bytes >= BLOCK_MAX_RAW_BYTES:
+            flags |= FLAG_BLOCK_START
+            self.block_open = True
+            self.block_offset = self.offset
+            self.block_raw_bytes = 0
+            self.compressor = zlib.compressobj(6) if self.compress else None
+
+        if self.compressor:
+            flags |= FLAG_ZLIB
+            # sync flush: the bytes on disk decode up to here even though the stream continues
+            body = self.compressor.compress(raw) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        else:
+            body = raw
+        self.block_raw_bytes += len(raw)
+
+        header = CHUNK_HEADER.pack(b"K", flags, len(body), len(raw), self.chunk_first_ts, self.chunk_last_ts)
+        self.file_handle.write(header + body)
+        self.index_handle.write(INDEX_CHECKPOINT.pack(
+            b"C", self.chunk_first_ts, self.chunk_last_ts, self.offset, self.block_offset
+        ))
+        self.offset += len(header) + len(body)
+
+        self.chunk = bytearray()
+        self.chunk_count = 0
+
+    def flush(self):
+        # every flush seals the current chunk, so a crash loses at most one flush window
+        self._write_chunk()
+        self.file_handle.flush()
+        self.index_handle.flush()
+
+    def sync(self):
+        # data before index, so the index never points at chunks a crash could lose
+        os.fsync(self.file_handle.fileno())
+        os.fsync(self.index_handle.fileno())
+
+    def size(self) -> int:
+        return self.offset + len(self.chunk)
+
+    def close(self):
+        try:
+            self._write_chunk()
+        finally:
+            self.file_handle.close()
+            self.index_handle.close()
+
+
+class BinaryLogReader:
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.file_handle = open(self.path, "rb")
+        self.data = mmap.mmap(self.file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, start_ns = FILE_HEADER.unpack_from(self.data, 0)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{self.path} is not a binary robot log")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary log version {version}")
+        self.start_ns = start_ns
+
+        self.entries: Dict[int, Tuple[str, Optional[str]]] = {}  # entry id -> (entry name, source)
+        # (first ts, last ts, chunk offset, block offset), one per chunk
+        self.checkpoints: List[Tuple[int, int, int, int]] = []
+        if not self._load_index():
+            self._rebuild_index()
+        self._checkpoint_times = [checkpoint[0] for checkpoint in self.checkpoints]
+
+    @property
+    def started(self) -> datetime:
+        return from_ns(self.start_ns)
+
+    def _load_index(self) -> bool:
+        index_path = index_path_for(self.path)
+        if not index_path.exists():
+            return False
+
+        data = index_path.read_bytes()
+        if len(data) < INDEX_HEADER.size or data[:6] != INDEX_MAGIC:
+            return False
+
+        pos = INDEX_HEADER.size
+        while pos < len(data):
+            tag = data[pos:pos + 1]
+            if tag == b"E" and pos + INDEX_ENTRY.size <= len(data):
+                _, entry_id, name_len = INDEX_ENTRY.unpack_from(data, pos)
+                pos += INDEX_ENTRY.size
+                self.entries[entry_id] = split_source(data[pos:pos + name_len].decode("utf-8"))
+                pos += name_len
+            elif tag == b"C" and pos + INDEX_CHECKPOINT.size <= len(data):
+                self.checkpoints.append(INDEX_CHECKPOINT.unpack_from(data, pos)[1:])
+                pos += INDEX_CHECKPOINT.size
+            else:
+                break  # truncated tail after a crash
+
+        # the index can get ahead of the data file if we crashed between the two writes
+        while self.checkpoints and not self._chunk_complete(self.checkpoints[-1][2]):
+            self.checkpoints.pop()
+
+        # or fall behind it (data flushed, index not), pick up the chunks it's missing from the data file itself
+        if self.checkpoints:
+            _, _, last_offset, block_offset = self.checkpoints[-1]
+        else:
+            last_offset, block_offset = None, FILE_HEADER.size
+        indexed = len(self.checkpoints)
+        for offset, flags, first_ts, last_ts in self._chunk_headers(last_offset or FILE_HEADER.size):
+            if offset == last_offset:
+                continue
+            if flags & FLAG_BLOCK_START:
+                block_offset = offset
+            self.checkpoints.append((first_ts, last_ts, offset, block_offset))
+        if len(self.checkpoints) > indexed:
+            # their entry definitions only made it into the chunks
+            for _ in self.iter_from_chunk(indexed):
+                pass
+        return True
+
+    def _rebuild_index(self):
+        # no (or unreadable) sidecar: walk every chunk once to recover the dictionary and checkpoints
+        block_offset = FILE_HEADER.size
+        for offset, flags, first_ts, last_ts in self._chunk_headers():
+            if flags & FLAG_BLOCK_START:
+                block_offset = offset
+            self.checkpoints.append((first_ts, last_ts, offset, block_offset))
+        for _ in self:
+            pass
+
+    def _chunk_complete(self, offset: int) -> bool:
+        if offset + CHUNK_HEADER.size > len(self.data):
+            return False
+        _, _, stored_len, _, _, _ = CHUNK_HEADER.unpack_from(self.data, offset)
+        return offset + CHUNK_HEADER.size + stored_len <= len(self.data)
+
+    def _chunk_headers(self, offset: int = FILE_HEADER.size) -> Iterator[Tuple[int, int, int, int]]:
+        size = len(self.data)
+        while offset + CHUNK_HEADER.size <= size:
+            tag, flags, stored_len, _, first_ts, last_ts = CHUNK_HEADER.unpack_from(self.data, offset)
+            if tag != b"K" or offset + CHUNK_HEADER.size + stored_len > size:
+                break
+            yield offset, flags, first_ts, last_ts
+            offset += CHUNK_HEADER.size + stored_len
+
+    def _chunk_bodies(self, first_chunk: int) -> Iterator[Tuple[int, bytes]]:
+        # raw bodies from chunk first_chunk onwards, restarting decompression at each block boundary
+        decompressor = None
+        block_offset = None
+        start = first_chunk
+        if first_chunk < len(self.checkpoints):
+            # the zlib stream has to be replayed from the start of the block the chunk lives in
+            block_offset = self.checkpoints[first_chunk][3]
+            while start > 0 and self.checkpoints[start][2] != block_offset:
+                start -= 1
+
+        for chunk_index in range(start, len(self.checkpoints)):
+            offset = self.checkpoints[chunk_index][2]
+            _, flags, stored_len, _, _, _ = CHUNK_HEADER.unpack_from(self.data, offset)
+            body_start = offset + CHUNK_HEADER.size
+            body = self.data[body_start:body_start + stored_len]
+
+            if flags & FLAG_BLOCK_START:
+                decompressor = zlib.decompressobj() if flags & FLAG_ZLIB else None
+            if flags & FLAG_ZLIB:
+                body = decompressor.decompress(body)
+
+            if chunk_index >= first_chunk:
+                yield chunk_index, body
+
+    def _decode_body(self, body: bytes, first_ts: int) -> Iterator[LogMessage]:
+        entries = self.entries
+        timestamp = first_ts
+        pos = 0
+        end = len(body)
+        while pos < end:
+            kind, pos = _read_varint(body, pos)
+            if kind == 0:
+                entry_id, pos = _read_varint(body, pos)
+                name_len, pos = _read_varint(body, pos)
+                entries[entry_id] = split_source(body[pos:pos + name_len].decode("utf-8"))
+                pos += name_len
+                continue
+
+            delta, pos = _read_varint(body, pos)
+            timestamp += (delta >> 1) ^ -(delta & 1)
+            payload_len, pos = _read_varint(body, pos)
+            message = body[pos:pos + payload_len].decode("utf-8")
+            pos += payload_len
+
+            message, repeat = split_repeat(message, timestamp)
+            entry_name, source = entries.get(kind - 1, UNKNOWN_ENTRY)
+            yield LogMessage(entry_name, message, timestamp_ns=timestamp, repeat=repeat, source=source)
+
+    def iter_from_chunk(self, first_chunk: int) -> Iterator[LogMessage]:
+        for chunk_index, body in self._chunk_bodies(first_chunk):
+            yield from self._decode_body(body, self.checkpoints[chunk_index][0])
+
+    def __iter__(self) -> Iterator[LogMessage]:
+        return self.iter_from_chunk(0)
+
+    def seek_time(self, timestamp_ns: int) -> int:
+        # index of the first chunk that can contain messages at or after timestamp_ns
+        index = bisect.bisect_right(self._checkpoint_times, timestamp_ns) - 1
+        index = max(index, 0)
+        # clocks can step, so walk forward past chunks that end before the target
+        while index < len(self.checkpoints) - 1 and self.checkpoints[index][1] < timestamp_ns:
+            index += 1
+        return index
+
+    def iter_from_time(self, timestamp_ns: int) -> Iterator[LogMessage]:
+        for log_msg in self.iter_from_chunk(self.seek_time(timestamp_ns)):
+            if log_msg.timestamp_ns >= timestamp_ns:
+                yield log_msg
+
+    def iter_from_offset(self, seconds: float) -> Iterator[LogMessage]:
+        # e.g. iter_from_offset(135) for "T+2:15" into the session
+        return self.iter_from_time(self.start_ns + int(seconds * 1e9))
+
+    def close(self):
+        self.data.close()
+        self.file_handle.close()
+
+
+def convert_to_text(source: Path, destination: Optional[Path] = None) -> Path:
+    # writes the same layout LogFileManager uses for .txt logs
+    source = Path(source)
+    destination = Path(destination) if destination else source.with_suffix(".txt")
+
+    reader = BinaryLogReader(source)
+    try:
+        with open(destination, "w", encoding="utf-8") as f:
+            f.write("FRC Robot Log\n")
+            f.write(f"Started: {reader.started.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write("=" * 80 + "\n\n")
+            for log_msg in reader:
+                f.write(str(log_msg) + "\n")
+    finally:
+        reader.close()
+    return destination
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) < 2:
+        print("usage: python -m BinaryLogFormat <session.grtlog> [output.txt]")
+        return 1
+
+    output = convert_to_text(Path(argv[1]), Path(argv[2]) if len(argv) > 2 else None)
+    print(f"Wrote {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
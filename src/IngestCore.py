@@ -0,0 +1,283 @@
+# Qt-free ingestion core: subscribes to the logging topics (or generates placeholder data) and hands out
+# LogMessage batches on poll(). NetworkTablesListener wraps it for the GUI, recorder.py runs it headless, and
+# IngestSources.py runs one per configured source (its own NT instance, its messages tagged with the source id).
+
+import queue
+import re
+from datetime import datetime
+from typing import Callable, List, Optional
+from models.LogMessage import LogMessage, to_ns
+from models.LatencyStats import LatencyStats
+from models.RepeatCoalescer import RepeatCoalescer
+from config import (
+    PLACEHOLDER_MODE,
+    ENTRY_TYPES,
+    LOGGING_TABLE_NAME,
+    LOGGING_BATCH_TABLE,
+    NETWORKTABLES_SERVER,
+    INGEST_QUEUE_MAX_SIZE,
+    COALESCE_REPEATS,
+    PLACEHOLDER_MESSAGE_PROBABILITY,
+    PLACEHOLDER_SEED,
+    PLACEHOLDER_RATES,
+    PLACEHOLDER_BURSTS
+)
+
+from placeholder_data import PlaceholderDataGenerator
+
+# what RobotLogger's coalescing appends to the last message of a run, times are the robot's NT clock in us
+ROBOT_REPEAT_PATTERN = re.compile(r" \[repeat x(\d+) first=(\d+) last=(\d+)\]$")
+
+
+def strip_robot_timestamp(message_text: str) -> str:
+    # removes the "[HH:MM:SS.mmm] " prefix RobotLogger adds, the viewer keeps its own timestamps.
+    # Only that exact shape, RobotLogger's fast mode sends no prefix and a message can start with "[" itself
+    if (len(message_text) >= 14 and message_text[0] == "[" and message_text[13] == "]"
+            and message_text[3] == ":" and message_text[6] == ":" and message_text[9] == "."):
+        return message_text[15:]
+    return message_text
+
+
+class IngestCore:
+
+    def __init__(self, on_connection_changed: Optional[Callable[[bool], None]] = None,
+                 placeholder: bool = PLACEHOLDER_MODE, server: str = NETWORKTABLES_SERVER, port: int = 0,
+                 table_name: str = LOGGING_TABLE_NAME, source: Optional[str] = None,
+                 generator: Optional[PlaceholderDataGenerator] = None):
+        # on_connection_changed(connected) is called from poll(), on whatever thread polls.
+        # With a source id the core gets an NT instance of its own (several can be connected at once) and tags
+        # every message with it, without one it's the default instance and untagged messages as always.
+        # port 0 = the NT4 default
+        self.on_connection_changed = on_connection_changed or (lambda connected: None)
+        self.placeholder = placeholder
+        self.server = server
+        self.port = port
+        self.table_name = table_name
+        self.source = source
+
+        self.nt_instance = None
+        self.nt_now = None  # ntcore._now once connected (if this ntcore has it), NT clock in us
+        self.log_table = None
+        self.subscribers = {}
+        self.batch_subscribers = {}
+        self.listener_handles = {}
+        self.placeholder_generator = None
+        self.connected = False
+
+        # NT listener callbacks run on ntcore's thread and push (entry, value, server time, receive ns, robot ns)
+        # here, poll() drains it so no update is lost between polls
+        self.pending = queue.Queue(maxsize=INGEST_QUEUE_MAX_SIZE)
+        self.received_count = 0
+        self.dropped_count = 0
+        self.max_queue_depth = 0
+        self.latency = LatencyStats()  # network stage recorded here, the GUI adds the display stages
+        self.coalescer = RepeatCoalescer() if COALESCE_REPEATS else None
+
+        if placeholder:
+            self._setup_placeholder_mode(generator)
+        else:
+            self._setup_networktables()
+
+    def _setup_placeholder_mode(self, generator: Optional[PlaceholderDataGenerator]):
+        self.placeholder_generator = generator or PlaceholderDataGenerator(PLACEHOLDER_SEED, PLACEHOLDER_RATES,
+                                                                           PLACEHOLDER_BURSTS)
+        self.entry_names = ENTRY_TYPES.copy()
+        self.connected = True
+        self.on_connection_changed(True)  # ALWAYS "connected" in placeholder mode
+
+    def _setup_networktables(self):
+        try:
+            # imported here so importing this module (tools, placeholder mode) doesn't load ntcore
+            from ntcore import NetworkTableInstance
+            try:
+                # private and not in every robotpy release, without it messages just go without robot times
+                from ntcore import _now
+                self.nt_now = _now
+            except ImportError:
+                self.nt_now = None
+            if self.source is None:
+                self.nt_instance = NetworkTableInstance.getDefault()
+            else:
+                self.nt_instance = NetworkTableInstance.create()
+            self.log_table = self.nt_instance.getTable(self.table_name)
+
+            # Subscribe to all logging entries
+            for entry_name in ENTRY_TYPES:
+                self._subscribe(entry_name)
+
+            self.nt_instance.setServer(self.server, self.port)
+            # NT4 client names have to be unique on a server, two sources can be watching the same one
+            self.nt_instance.startClient4("GRTRobotLogger" if self.source is None else f"GRTRobotLogger-{self.source}")
+
+        except Exception as e:
+            print(f"Error initializing NetworkTables: {e}")
+            self.on_connection_changed(False)
+
+    def _subscribe(self, entry_name: str):
+        from ntcore import PubSubOptions, EventFlags
+
+        # sendAll + keepDuplicates so every set() on the robot reaches us, even repeated text
+        options = PubSubOptions(sendAll=True, keepDuplicates=True)
+        subscriber = self.log_table.getStringTopic(entry_name).subscribe("", options)
+        self.subscribers[entry_name] = subscriber
+        self.listener_handles[entry_name] = self.nt_instance.addListener(
+            subscriber,
+            EventFlags.kValueAll,
+            lambda event, name=entry_name: self._on_value(name, [event.data.value.getString()], event.data.value)
+        )
+
+        # RobotLogger's buffered mode: one string array per entry per robot loop, unpacked into single messages
+        batch_topic = self.log_table.getSubTable(LOGGING_BATCH_TABLE).getStringArrayTopic(entry_name)
+        batch_subscriber = batch_topic.subscribe([], options)
+        self.batch_subscribers[entry_name] = batch_subscriber
+        self.listener_handles[f"{LOGGING_BATCH_TABLE}/{entry_name}"] = self.nt_instance.addListener(
+            batch_subscriber,
+            EventFlags.kValueAll,
+            lambda event, name=entry_name: self._on_value(name, event.data.value.getStringArray(), event.data.value)
+        )
+
+    def _on_value(self, entry_name: str, texts: List[str], value):
+        # Runs on the ntcore listener thread, so only touch the thread-safe queue here
+        receive_ns = to_ns(datetime.now())
+
+        # value.time() is when the robot set it, already moved onto our NT clock by the time sync offset,
+        # so how long ago that was on the NT clock gives the robot's time on the wall clock. Times the robot
+        # put in the text (coalesced runs) are on its own clock, the server's, which is ours + offset
+        robot_ns = None
+        server_to_wall_ns = None
+        offset = self.nt_instance.getServerTimeOffset()
+        if offset is not None and self.nt_now is not None:
+            local_to_wall_ns = receive_ns - self.nt_now() * 1000
+            robot_ns = local_to_wall_ns + value.time() * 1000
+            server_to_wall_ns = local_to_wall_ns - offset * 1000
+
+        server_time = value.server_time()
+        for text in texts:
+            try:
+                self.pending.put_nowait((entry_name, text, server_time, receive_ns, robot_ns, server_to_wall_ns))
+            except queue.Full:
+                self.dropped_count += 1
+
+    def get_ingest_stats(self) -> dict:
+        return {
+            "received": self.received_count,
+            "dropped": self.dropped_count,
+            "queue_depth": self.pending.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+    def poll(self) -> List[LogMessage]:
+        # everything that arrived since the last poll, oldest first
+        if self.placeholder:
+            batch = self._poll_placeholder()
+        else:
+            batch = self._poll_networktables()
+
+        if self.coalescer:
+            batch = self.coalescer.process(batch, to_ns(datetime.now()))
+        return batch
+
+    def flush(self) -> List[LogMessage]:
+        # repeat runs still being counted, call once more before shutting down
+        return self.coalescer.flush() if self.coalescer else []
+
+    def _poll_placeholder(self) -> List[LogMessage]:
+        generator = self.placeholder_generator
+        if generator.has_load:
+            return self._poll_load(generator)
+
+        batch = []
+
+        # Generate message with configured probability
+        rng = generator.random
+        if rng.random() < PLACEHOLDER_MESSAGE_PROBABILITY:
+            entry_name = rng.choice(self.entry_names)
+            message_text = strip_robot_timestamp(generator.get_random_message(entry_name))
+            self.received_count += 1
+            batch.append(LogMessage(entry_name, message_text, source=self.source))
+
+        return batch
+
+    def _poll_load(self, generator: PlaceholderDataGenerator) -> List[LogMessage]:
+        # everything the load generator had due since the last poll, as if it had queued up in the listener
+        due = generator.messages_until(to_ns(datetime.now()))
+        if len(due) > INGEST_QUEUE_MAX_SIZE:
+            self.dropped_count += len(due) - INGEST_QUEUE_MAX_SIZE
+            del due[INGEST_QUEUE_MAX_SIZE:]
+        self.max_queue_depth = max(self.max_queue_depth, len(due))
+        self.received_count += len(due)
+        source = self.source
+        return [LogMessage(entry_name, message_text, timestamp_ns=timestamp_ns, source=source)
+                for timestamp_ns, entry_name, message_text in due]
+
+    def _poll_networktables(self) -> List[LogMessage]:
+        batch = []
+        try:
+            connected = self.nt_instance.isConnected()
+            if connected != self.connected:
+                self.connected = connected
+                self.on_connection_changed(connected)
+
+            depth = self.pending.qsize()
+            if depth > self.max_queue_depth:
+                self.max_queue_depth = depth
+
+            # Only drain what was queued when the poll started so a flood can't starve the caller
+            for _ in range(depth):
+                try:
+                    entry_name, value, server_time, receive_ns, robot_ns, server_to_wall_ns = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+
+                if not value:
+                    continue
+
+                self.received_count += 1
+                text = strip_robot_timestamp(value)
+                repeat = None
+                if text.endswith("]"):
+                    match = ROBOT_REPEAT_PATTERN.search(text)
+                    if match:
+                        count, first_us, last_us = (int(group) for group in match.groups())
+                        text = text[:match.start()]
+                        if server_to_wall_ns is not None:
+                            repeat = (count, first_us * 1000 + server_to_wall_ns)
+                            robot_ns = last_us * 1000 + server_to_wall_ns
+                        else:
+                            repeat = (count, receive_ns)
+                batch.append(LogMessage(entry_name, text, server_time=server_time,
+                                        timestamp_ns=receive_ns, robot_ns=robot_ns, repeat=repeat,
+                                        source=self.source))
+
+        except Exception as e:
+            print(f"Error reading NetworkTables: {e}")
+            self.on_connection_changed(False)
+
+        self.latency.record_received(batch)
+        return batch
+
+    def add_entry_type(self, entry_name: str):
+        if self.placeholder:
+            if entry_name not in self.entry_names:
+                self.entry_names.append(entry_name)
+        else:
+            if entry_name not in self.subscribers:
+                self._subscribe(entry_name)
+
+    def disconnect(self):
+        if not self.placeholder and self.nt_instance:
+            # Unsubscribe from all topics
+            for handle in self.listener_handles.values():
+                self.nt_instance.removeListener(handle)
+            self.listener_handles.clear()
+            for subscriber in list(self.subscribers.values()) + list(self.batch_subscribers.values()):
+                subscriber.close()
+            self.subscribers.clear()
+            self.batch_subscribers.clear()
+            self.nt_instance.stopClient()
+            if self.source is not None:
+                from ntcore import NetworkTableInstance
+                NetworkTableInstance.destroy(self.nt_instance)
+                self.nt_instance = None
+            self.connected = False
+            self.on_connection_changed(False)
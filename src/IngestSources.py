@@ -0,0 +1,322 @@
+# Several ingest sources at once (INGEST_SOURCES in config.py): every live NT connection, replay file or generator
+# runs on a worker thread of its own, tags its messages with its id and pushes them, together with how far it has
+# got, into a SourceMerger (models/SourceMerger.py) that puts them back into one time-ordered feed.
+# MultiSourceIngest hands that feed out with IngestCore's interface (poll, flush, latency, stats...), so
+# NetworkTablesListener and recorder.py take whichever create_ingest() gives them. A slow or stuck source only
+# blocks its own thread, the merge waits for it at most MERGE_REORDER_WINDOW_MS.
+
+import queue
+import threading
+from datetime import datetime
+from pathlib import Path
+from sys import intern
+from typing import Callable, Dict, List, Optional
+from models.LogMessage import LogMessage, to_ns
+from models.LatencyStats import LatencyStats
+from models.SourceMerger import SourceMerger
+from IngestCore import IngestCore
+from placeholder_data import PlaceholderDataGenerator
+from config import (
+    INGEST_SOURCES,
+    INGEST_SOURCE_POLL_MS,
+    NETWORKTABLES_SERVER,
+    LOGGING_TABLE_NAME,
+    PLACEHOLDER_SEED,
+    PLACEHOLDER_RATES,
+    PLACEHOLDER_BURSTS,
+    REPLAY_MAX_BATCH
+)
+
+SOURCE_TYPES = ["nt", "placeholder", "replay"]
+
+
+class IngestSource(threading.Thread):
+    # one source on its own thread: poll() every poll interval and push what came out to the merger.
+    # Subclasses provide poll() (this source's new messages, oldest first), see CoreSource and ReplayFileSource
+
+    def __init__(self, source_id: str, merger: SourceMerger, poll_ms: float = INGEST_SOURCE_POLL_MS):
+        super().__init__(name=f"ingest-{source_id}", daemon=True)
+        self.source_id = intern(source_id)
+        self.merger = merger
+        self.poll_interval_s = poll_ms / 1000
+        self.stop_event = threading.Event()
+        self.stopped = False
+        self.connected = False
+        # (source id, connected) on this source's thread, MultiSourceIngest passes it on from its own poll()
+        self.status_changed: Callable[[str, bool], None] = lambda source_id, connected: None
+
+    def set_connected(self, connected: bool):
+        if connected != self.connected:
+            self.connected = connected
+            self.status_changed(self.source_id, connected)
+
+    def flush(self) -> List[LogMessage]:
+        return []
+
+    def watermark_ns(self, before_ns: int) -> int:
+        # nothing this source hands out later will be older than this. before_ns is the time just before the
+        # poll, everything received until then came out of it
+        return before_ns
+
+    def run(self):
+        while not self.stop_event.wait(self.poll_interval_s):
+            self.poll_once()
+
+    def poll_once(self):
+        before_ns = to_ns(datetime.now())
+        try:
+            batch = self.poll()
+        except Exception as e:
+            print(f"Error reading ingest source {self.source_id}: {e}")
+            batch = []
+        self.merger.push(self.source_id, batch, self.watermark_ns(before_ns))
+
+    def stop(self):
+        # stops the thread, whatever the source still had goes to the merger
+        if self.stopped:
+            return
+        self.stopped = True
+        self.stop_event.set()
+        if self.is_alive():
+            self.join()
+        try:
+            self.merger.push(self.source_id, self.poll() + self.flush(), to_ns(datetime.now()))
+        except Exception as e:
+            print(f"Error reading ingest source {self.source_id}: {e}")
+
+    def add_entry_type(self, entry_name: str):
+        pass
+
+    def get_ingest_stats(self) -> dict:
+        return {}
+
+    def disconnect(self):
+        self.set_connected(False)
+
+
+class CoreSource(IngestSource):
+    # a live NetworkTables connection (its own NT instance) or a placeholder generator, through an IngestCore
+
+    def __init__(self, source_id: str, merger: SourceMerger, poll_ms: float = INGEST_SOURCE_POLL_MS, **core_args):
+        super().__init__(source_id, merger, poll_ms)
+        self.core = IngestCore(on_connection_changed=self.set_connected, source=self.source_id, **core_args)
+
+    def poll(self) -> List[LogMessage]:
+        return self.core.poll()
+
+    def flush(self) -> List[LogMessage]:
+        return self.core.flush()
+
+    def watermark_ns(self, before_ns: int) -> int:
+        # a repeat run the coalescer is still counting comes out later with an older time
+        coalescer = self.core.coalescer
+        held_ns = coalescer.held_since_ns() if coalescer else None
+        return before_ns if held_ns is None else min(before_ns, held_ns)
+
+    def add_entry_type(self, entry_name: str):
+        self.core.add_entry_type(entry_name)
+
+    def get_ingest_stats(self) -> dict:
+        return self.core.get_ingest_stats()
+
+    def disconnect(self):
+        self.core.disconnect()
+
+
+class ReplayFileSource(IngestSource):
+    # a saved session played back in real time as if it was live, its times moved up to when playback started.
+    # "Connected" until it runs out
+
+    def __init__(self, source_id: str, merger: SourceMerger, path: Path, poll_ms: float = INGEST_SOURCE_POLL_MS):
+        super().__init__(source_id, merger, poll_ms)
+        from LogCursors import open_log_cursor  # here, not at the top: the file readers only load when replaying
+
+        self.path = Path(path)
+        self.cursor = open_log_cursor(self.path)
+        self.offset_ns: Optional[int] = None  # session time -> now, set on the first poll
+        self.pending: Optional[LogMessage] = None  # first message that is not due yet
+        self.behind_ns: Optional[int] = None  # last poll stopped at REPLAY_MAX_BATCH, more was due after this
+        self.finished = False
+        self.replayed_count = 0
+
+    def poll(self) -> List[LogMessage]:
+        if self.finished:
+            return []
+        now_ns = to_ns(datetime.now())
+        if self.offset_ns is None:
+            self.offset_ns = now_ns - self.cursor.start_ns
+            self.set_connected(True)
+
+        offset_ns = self.offset_ns
+        batch = []
+        while len(batch) < REPLAY_MAX_BATCH:
+            log_msg = self.pending or self.cursor.next()
+            self.pending = None
+            if log_msg is None:
+                self.finished = True
+                self.set_connected(False)
+                break
+            if log_msg.timestamp_ns + offset_ns > now_ns:
+                self.pending = log_msg  # not due yet, keep it for the next poll
+                break
+            log_msg.timestamp_ns += offset_ns
+            if log_msg.repeat:
+                log_msg.repeat = (log_msg.repeat[0], log_msg.repeat[1] + offset_ns)
+            log_msg.source = self.source_id
+            batch.append(log_msg)
+        else:
+            self.behind_ns = batch[-1].timestamp_ns
+        if self.pending is not None or self.finished:
+            self.behind_ns = None
+        self.replayed_count += len(batch)
+        return batch
+
+    def watermark_ns(self, before_ns: int) -> int:
+        # a poll cut short by REPLAY_MAX_BATCH leaves due messages behind
+        return before_ns if self.behind_ns is None else min(before_ns, self.behind_ns)
+
+    def get_ingest_stats(self) -> dict:
+        return {"received": self.replayed_count, "dropped": 0, "queue_depth": 0, "max_queue_depth": 0}
+
+    def disconnect(self):
+        self.finished = True
+        self.cursor.close()
+        self.set_connected(False)
+
+
+def create_source(source_config: dict, merger: SourceMerger) -> IngestSource:
+    # one INGEST_SOURCES entry -> its (not yet started) source, raises ValueError for a bad entry
+    source_id = source_config.get("id")
+    if not source_id:
+        raise ValueError(f"Ingest source without an id: {source_config}")
+    source_type = source_config.get("type", "nt")
+    poll_ms = source_config.get("poll_ms", INGEST_SOURCE_POLL_MS)
+
+    if source_type == "nt":
+        return CoreSource(source_id, merger, poll_ms, placeholder=False,
+                          server=source_config.get("server", NETWORKTABLES_SERVER),
+                          port=source_config.get("port", 0),
+                          table_name=source_config.get("table", LOGGING_TABLE_NAME))
+    if source_type == "placeholder":
+        generator = PlaceholderDataGenerator(source_config.get("seed", PLACEHOLDER_SEED),
+                                             source_config.get("rates", PLACEHOLDER_RATES),
+                                             source_config.get("bursts", PLACEHOLDER_BURSTS))
+        return CoreSource(source_id, merger, poll_ms, placeholder=True, generator=generator)
+    if source_type == "replay":
+        return ReplayFileSource(source_id, merger, Path(source_config["path"]), poll_ms)
+    raise ValueError(f"Unknown type '{source_type}' for ingest source {source_id} (use {', '.join(SOURCE_TYPES)})")
+
+
+class MultiSourceIngest:
+
+    def __init__(self, sources: Optional[List[dict]] = None,
+                 on_connection_changed: Optional[Callable[[bool], None]] = None,
+                 on_source_status: Optional[Callable[[str, bool], None]] = None,
+                 merger: Optional[SourceMerger] = None):
+        # the callbacks are called from poll(), on whatever thread polls (like IngestCore's):
+        # on_connection_changed(connected) with whether any source is connected, on_source_status(source id,
+        # connected) for each source on its own
+        self.on_connection_changed = on_connection_changed or (lambda connected: None)
+        self.on_source_status = on_source_status or (lambda source_id, connected: None)
+        self.merger = merger or SourceMerger()
+        self.sources: Dict[str, IngestSource] = {}
+        self.source_status: Dict[str, bool] = {}
+        self.status_events = queue.SimpleQueue()
+        self.connected = False
+        self.latency = LatencyStats()  # network stage of the merged feed, the GUI adds the display stages
+        self.coalescer = None  # each source coalesces its own repeats
+
+        for source_config in (INGEST_SOURCES if sources is None else sources):
+            try:
+                self.add_source(create_source(source_config, self.merger))
+            except Exception as e:
+                print(f"Error starting ingest source {source_config.get('id')}: {e}")
+
+    def add_source(self, source: IngestSource):
+        if source.source_id in self.sources:
+            raise ValueError(f"Duplicate ingest source id '{source.source_id}'")
+        self.merger.add_source(source.source_id)
+        self.sources[source.source_id] = source
+        source.status_changed = lambda source_id, connected: self.status_events.put((source_id, connected))
+        self.status_events.put((source.source_id, source.connected))  # whatever it was before we listened
+        source.start()
+
+    def remove_source(self, source_id: str):
+        source = self.sources.pop(source_id)
+        source.stop()
+        source.disconnect()
+        self.merger.remove_source(source_id)  # what it sent still goes out, without waiting for more
+        self.status_events.put((source_id, None))
+
+    def _update_status(self):
+        while True:
+            try:
+                source_id, connected = self.status_events.get_nowait()
+            except queue.Empty:
+                break
+            if connected is None:
+                self.source_status.pop(source_id, None)
+            elif self.source_status.get(source_id) != connected:
+                self.source_status[source_id] = connected
+                self.on_source_status(source_id, connected)
+
+            any_connected = any(self.source_status.values())
+            if any_connected != self.connected:
+                self.connected = any_connected
+                self.on_connection_changed(any_connected)
+
+    def poll(self) -> List[LogMessage]:
+        # everything every source is done with, oldest first
+        self._update_status()
+        batch = self.merger.pop_ready(to_ns(datetime.now()))
+        self.latency.record_received(batch)
+        return batch
+
+    def flush(self) -> List[LogMessage]:
+        # stops the sources, everything they and the merge still held comes out. Call once before shutting down
+        for source in self.sources.values():
+            source.stop()
+        batch = self.merger.flush()
+        self.latency.record_received(batch)
+        return batch
+
+    @property
+    def received_count(self) -> int:
+        return sum(source.get_ingest_stats().get("received", 0) for source in self.sources.values())
+
+    @property
+    def dropped_count(self) -> int:
+        return (sum(source.get_ingest_stats().get("dropped", 0) for source in self.sources.values())
+                + self.merger.dropped_count)
+
+    def get_ingest_stats(self) -> dict:
+        per_source = {}
+        for source_id, source in self.sources.items():
+            per_source[source_id] = dict(source.get_ingest_stats(), connected=source.connected)
+        stats = {key: sum(source_stats.get(key, 0) for source_stats in per_source.values())
+                 for key in ("received", "dropped", "queue_depth")}
+        stats["max_queue_depth"] = max((source_stats.get("max_queue_depth", 0)
+                                        for source_stats in per_source.values()), default=0)
+        stats["merge"] = self.merger.get_stats()
+        stats["dropped"] += stats["merge"]["dropped"]
+        stats["sources"] = per_source
+        return stats
+
+    def add_entry_type(self, entry_name: str):
+        for source in self.sources.values():
+            source.add_entry_type(entry_name)
+
+    def disconnect(self):
+        for source in self.sources.values():
+            source.stop()
+            source.disconnect()
+        self.connected = False
+        self.on_connection_changed(False)
+
+
+def create_ingest(on_connection_changed: Optional[Callable[[bool], None]] = None,
+                  on_source_status: Optional[Callable[[str, bool], None]] = None):
+    # MultiSourceIngest over INGEST_SOURCES if there are any, otherwise the one IngestCore as always
+    if INGEST_SOURCES:
+        return MultiSourceIngest(on_connection_changed=on_connection_changed, on_source_status=on_source_status)
+    return IngestCore(on_connection_changed=on_connection_changed)
@@ -0,0 +1,165 @@
+# Background worker that compresses closed log segments and enforces the robot_logs retention policy,
+# so neither ever runs on the GUI thread or the log writer thread. A segment is only touched while holding its
+# SegmentLock, one being written by anyone (another process included) is left alone.
+
+import gzip
+import io
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+from SegmentLock import SegmentLock
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSED_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def compressed_path_for(path: Path, method: str) -> Path:
+    return path.with_name(path.name + COMPRESSED_SUFFIXES[method])
+
+
+def compress_file(path: Path, method: str) -> Path:
+    # writes to a temp name and renames, so a half-written archive never replaces the original
+    target = compressed_path_for(path, method)
+    temp = target.with_name(target.name + ".tmp")
+
+    with open(path, "rb") as source, open(temp, "wb") as raw_target:
+        if method == "zstd":
+            with zstandard.ZstdCompressor(level=6).stream_writer(raw_target) as compressed:
+                shutil.copyfileobj(source, compressed, 1024 * 1024)
+        else:
+            with gzip.GzipFile(filename=path.name, mode="wb", fileobj=raw_target, compresslevel=6) as compressed:
+                shutil.copyfileobj(source, compressed, 1024 * 1024)
+
+    temp.replace(target)
+    path.unlink()
+    return target
+
+
+def open_log_text(path: Path) -> io.TextIOBase:
+    # opens a plain, gzip or zstd text segment for reading, whichever it is
+    path = Path(path)
+    if path.name.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("Reading .zst logs needs the zstandard package")
+        stream = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def open_log_binary(path: Path) -> io.BufferedIOBase:
+    # same as open_log_text but bytes, for readers that keep byte offsets into the (uncompressed) text
+    path = Path(path)
+    if path.name.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("Reading .zst logs needs the zstandard package")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    return open(path, "rb")
+
+
+def apply_retention(files: List[Path], max_bytes: int, max_age_days: float,
+                    segment_for: Callable[[Path], Path] = Path) -> List[Path]:
+    # deletes the oldest files first until both limits hold, never touching one whose segment (segment_for, e.g.
+    # a sidecar index's log) is locked, i.e. still being written
+    removed = []
+    now = time.time()
+    entries = []
+    for path in files:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort()
+
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, path in entries:
+        too_old = max_age_days > 0 and now - mtime > max_age_days * 86400
+        too_big = max_bytes > 0 and total > max_bytes
+        if not (too_old or too_big):
+            continue
+        try:
+            lock = SegmentLock.acquire(segment_for(path))
+            if lock is None:
+                continue
+            try:
+                path.unlink()
+                removed.append(path)
+                total -= size
+            finally:
+                lock.release()
+        except FileNotFoundError:
+            total -= size  # someone else removed or compressed it meanwhile
+        except OSError as e:
+            print(f"Error removing old log file: {e}")
+    return removed
+
+
+class LogCompressor(threading.Thread):
+
+    def __init__(self,
+                 method: Optional[str],
+                 list_files: Callable[[], List[Path]],
+                 segment_for: Callable[[Path], Path],
+                 max_bytes: int,
+                 max_age_days: float):
+        super().__init__(name="LogCompressor", daemon=True)
+
+        if method == "zstd" and zstandard is None:
+            print("zstandard is not installed, compressing logs with gzip instead")
+            method = "gzip"
+        self.method = method  # None = don't compress, only apply retention
+
+        self.list_files = list_files    # every file retention should consider
+        self.segment_for = segment_for  # the segment a file belongs to (itself, or the log of a sidecar index)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+
+        self.jobs = queue.Queue()
+        self.compressed_count = 0
+        self.removed_count = 0
+
+    def compress(self, path: Path):
+        self.jobs.put(Path(path))
+
+    def enforce_retention(self):
+        self.jobs.put(None)
+
+    def run(self):
+        while True:
+            path = self.jobs.get()
+            try:
+                if path is not None and self.method:
+                    self._compress_locked(path)
+                self.removed_count += len(apply_retention(
+                    self.list_files(), self.max_bytes, self.max_age_days, self.segment_for
+                ))
+            except Exception as e:
+                print(f"Error compressing log file {path}: {e}")
+            finally:
+                self.jobs.task_done()
+
+    def _compress_locked(self, path: Path):
+        # under the segment's lock: skipped while someone writes it, and if someone else compressed it already
+        lock = SegmentLock.acquire(path)
+        if lock is None:
+            return
+        try:
+            if path.exists():
+                compress_file(path, self.method)
+                self.compressed_count += 1
+        finally:
+            lock.release()
+
+    def wait_idle(self):
+        self.jobs.join()
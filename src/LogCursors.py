@@ -0,0 +1,179 @@
+# Cursors over saved sessions, Qt-free so the replay window (ReplaySource.py) and replay ingest sources
+# (IngestSources.py) share them. Text logs are parsed straight out of an mmap (gzip and zstd segments are unpacked
+# to a temp file first), binary logs go through BinaryLogReader and SQLite logs through SqliteLogReader, nothing
+# is loaded whole. Each cursor has start_ns/end_ns, next() (None at the end), seek(timestamp_ns) and close().
+
+import mmap
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from models.LogMessage import LogMessage, to_ns, split_repeat, split_source, NS_PER_DAY
+from BinaryLogFormat import BinaryLogReader, BINARY_LOG_SUFFIX
+from SqliteLogBackend import SqliteLogReader, SQLITE_LOG_SUFFIX
+from LogCompressor import COMPRESSED_SUFFIXES, open_log_binary
+
+
+class _TextLogCursor:
+    # Walks "[HH:MM:SS.mmm] [entry] message" lines in an mmapped text log ("[entry@source]" for tagged ones)
+
+    def __init__(self, path: Path):
+        self.temp_file = None
+        if path.name.endswith(tuple(COMPRESSED_SUFFIXES.values())):
+            # mmap needs a real file, so inflate to a temp file rather than into memory, in 1 MB chunks.
+            # This is the slow part of opening a replay, the window does it on a ReplayOpenWorker
+            self.temp_file = tempfile.TemporaryFile()
+            with open_log_binary(path) as source:
+                shutil.copyfileobj(source, self.temp_file, 1024 * 1024)
+            self.temp_file.flush()
+            self.file_handle = None
+            fileno = self.temp_file.fileno()
+        else:
+            self.file_handle = open(path, "rb")
+            fileno = self.file_handle.fileno()
+        self.data = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+
+        # the header carries the session date, lines only carry the time of day
+        self.date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.body_start = 0
+        pos = 0
+        while pos < len(self.data):
+            end = self._line_end(pos)
+            line = self.data[pos:end]
+            if line.startswith(b"Started: "):
+                try:
+                    started = datetime.strptime(line[9:].decode("utf-8").strip(), "%Y-%m-%d %H:%M:%S")
+                    self.date = started.replace(hour=0, minute=0, second=0, microsecond=0)
+                except ValueError:
+                    pass
+            if line.startswith(b"["):
+                break
+            pos = end + 1
+        self.body_start = pos
+
+        self.pos = self.body_start
+        first = self._parse_at(self.body_start)
+        self.start_ns = to_ns(self.date) + first[0] if first else to_ns(self.date)
+        self.first_time_of_day = first[0] if first else 0
+        self.end_ns = self._last_timestamp()
+
+    def _line_end(self, pos: int) -> int:
+        end = self.data.find(b"\n", pos)
+        return len(self.data) if end < 0 else end
+
+    def _relative_ns(self, time_of_day_ns: int) -> int:
+        # ns since the first message, wrapping past midnight (sessions are shorter than a day)
+        return (time_of_day_ns - self.first_time_of_day) % NS_PER_DAY
+
+    def _parse_at(self, pos: int):
+        # returns (time of day ns, line end, LogMessage or None) for the line starting at pos
+        end = self._line_end(pos)
+        if pos >= len(self.data):
+            return None
+        line = self.data[pos:end]
+        if len(line) < 15 or line[0:1] != b"[" or line[13:14] != b"]":
+            return 0, end, None
+        try:
+            hours, minutes, rest = line[1:13].split(b":")
+            seconds, millis = rest.split(b".")
+            time_of_day = ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * 10**9 + int(millis) * 10**6
+        except ValueError:
+            return 0, end, None
+
+        text = line[15:].decode("utf-8", errors="replace")
+        if not text.startswith("["):
+            return time_of_day, end, None
+        entry_end = text.find("] ")
+        if entry_end < 0:
+            return time_of_day, end, None
+        return time_of_day, end, (text[1:entry_end], text[entry_end + 2:])
+
+    def _last_timestamp(self) -> int:
+        pos = len(self.data)
+        while pos > self.body_start:
+            start = self.data.rfind(b"\n", self.body_start, pos - 1) + 1
+            start = max(start, self.body_start)
+            parsed = self._parse_at(start)
+            if parsed and parsed[2]:
+                return self.start_ns + self._relative_ns(parsed[0])
+            pos = start
+        return self.start_ns
+
+    def next(self) -> Optional[LogMessage]:
+        while self.pos < len(self.data):
+            parsed = self._parse_at(self.pos)
+            if parsed is None:
+                return None
+            time_of_day, end, fields = parsed
+            self.pos = end + 1
+            if fields:
+                timestamp_ns = self.start_ns + self._relative_ns(time_of_day)
+                message, repeat = split_repeat(fields[1], timestamp_ns)
+                entry_name, source = split_source(fields[0])
+                return LogMessage(entry_name, message, timestamp_ns=timestamp_ns, repeat=repeat, source=source)
+        return None
+
+    def seek(self, timestamp_ns: int):
+        # binary search over byte offsets, each probe snaps to the next line start
+        target = timestamp_ns - self.start_ns
+        lo, hi = self.body_start, len(self.data)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            line_start = self.data.rfind(b"\n", self.body_start, mid) + 1
+            line_start = max(line_start, self.body_start)
+            parsed = self._parse_at(line_start)
+            if parsed is None:
+                hi = line_start
+                continue
+            if parsed[2] is not None and self._relative_ns(parsed[0]) >= target:
+                hi = line_start
+            else:
+                lo = parsed[1] + 1
+        self.pos = lo
+
+    def close(self):
+        self.data.close()
+        if self.file_handle:
+            self.file_handle.close()
+        if self.temp_file:
+            self.temp_file.close()
+
+
+class _BinaryLogCursor:
+
+    def __init__(self, path: Path):
+        self.reader = BinaryLogReader(path)
+        checkpoints = self.reader.checkpoints
+        self.start_ns = checkpoints[0][0] if checkpoints else self.reader.start_ns
+        self.end_ns = max((checkpoint[1] for checkpoint in checkpoints), default=self.start_ns)
+        self.iterator = iter(self.reader)
+
+    def next(self) -> Optional[LogMessage]:
+        return next(self.iterator, None)
+
+    def seek(self, timestamp_ns: int):
+        self.iterator = self.reader.iter_from_time(timestamp_ns)
+
+    def close(self):
+        self.reader.close()
+
+
+class _SqliteLogCursor(_BinaryLogCursor):
+    # same reader interface, the time range comes off the database's time index
+
+    def __init__(self, path: Path):
+        self.reader = SqliteLogReader(path)
+        first_ns, last_ns = self.reader.time_range()
+        self.start_ns = first_ns if first_ns is not None else self.reader.start_ns
+        self.end_ns = last_ns if last_ns is not None else self.start_ns
+        self.iterator = iter(self.reader)
+
+
+def open_log_cursor(path: Path):
+    path = Path(path)
+    if path.suffix == BINARY_LOG_SUFFIX:
+        return _BinaryLogCursor(path)
+    if path.suffix == SQLITE_LOG_SUFFIX:
+        return _SqliteLogCursor(path)
+    return _TextLogCursor(path)
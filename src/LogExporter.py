@@ -0,0 +1,242 @@
+# Export of a snapshot of messages to text, CSV, JSON Lines or a columnar numpy .npz, written in chunks so
+# it can run on a worker thread with progress reporting and cancellation. Output goes to a temp file that only
+# replaces the target once the export finished, a cancelled or failed export leaves nothing behind.
+
+import csv
+import json
+import shutil
+import zipfile
+from array import array
+from importlib.util import find_spec
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+from models.LogMessage import LogMessage, from_ns
+from config import EXPORT_CHUNK_SIZE
+
+# numpy takes ~40 ms to import and only the npz export needs it, so it's only imported by that export
+NUMPY_AVAILABLE = find_spec("numpy") is not None
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class _FileExportWriter:
+    # writers that stream straight into a text file, subclasses add a header / write_chunk
+
+    def __init__(self, path: Path, total: int, newline: str = "\n"):
+        self.file = open(path, "w", encoding="utf-8", newline=newline)
+
+    def close(self):
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+
+
+class TextExportWriter(_FileExportWriter):
+    # the same layout as the old export: a short header then one "[time] [entry] message" line per message
+    suffix = ".txt"
+    description = "Text Files (*.txt)"
+
+    def __init__(self, path: Path, total: int):
+        super().__init__(path, total)
+        self.file.write("Robot Log Export\n")
+        self.file.write(f"Exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        self.file.write(f"Total Messages: {total}\n")
+        self.file.write("=" * 80 + "\n\n")
+
+    def write_chunk(self, messages: Sequence[LogMessage]):
+        self.file.write("".join(f"{msg}\n" for msg in messages))
+
+
+class CsvExportWriter(_FileExportWriter):
+    suffix = ".csv"
+    description = "CSV Files (*.csv)"
+
+    def __init__(self, path: Path, total: int):
+        super().__init__(path, total, newline="")  # the csv module writes its own line endings
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["timestamp", "entry_name", "message", "server_time", "repeat_count", "first_timestamp",
+                              "source"])
+
+    def write_chunk(self, messages: Sequence[LogMessage]):
+        self.writer.writerows(
+            (msg.timestamp.isoformat(timespec="milliseconds"), msg.entry_name, msg.message,
+             "" if msg.server_time is None else msg.server_time,
+             msg.repeat_count, from_ns(msg.first_ns).isoformat(timespec="milliseconds") if msg.repeat else "",
+             msg.source or "")
+            for msg in messages
+        )
+
+
+class JsonlExportWriter(_FileExportWriter):
+    # one LogMessage.to_dict() per line, LogMessage.from_dict() reads them back
+    suffix = ".jsonl"
+    description = "JSON Lines (*.jsonl)"
+
+    def write_chunk(self, messages: Sequence[LogMessage]):
+        dumps = json.dumps
+        self.file.write("".join(dumps(msg.to_dict(), ensure_ascii=False) + "\n" for msg in messages))
+
+
+# the per-message .npz columns: (array typecode, numpy dtype), spooled to a file each while the export runs
+_NPZ_COLUMNS = {
+    "timestamp_ns": ("q", "int64"),
+    "entry_id": ("H", "uint16"),
+    "server_time": ("q", "int64"),
+    "repeat_count": ("I", "uint32"),
+    "first_ns": ("q", "int64"),
+    "source_id": ("H", "uint16"),
+    "message_offsets": ("q", "int64"),
+    "message_data": ("B", "uint8"),
+}
+
+
+class NpzExportWriter:
+    # Arrow-style columns: timestamp_ns (int64), entry_id (uint16) into entry_names, server_time (int64, -1 = none),
+    # repeat_count (uint32) and first_ns (int64, = timestamp_ns unless coalesced), source_id (uint16) into
+    # source_names ("" = untagged) and the messages as one utf-8 blob (message_data) cut up by message_offsets
+    # (int64, length + 1). Every chunk is appended to one file per column and close() zips them up as .npy
+    # members (what numpy.savez writes), so memory doesn't grow with the size of the export
+    suffix = ".npz"
+    description = "NumPy Columns (*.npz)"
+
+    def __init__(self, path: Path, total: int):
+        self.path = Path(path)
+        self.entry_ids: Dict[str, int] = {}
+        self.source_ids: Dict[Optional[str], int] = {None: 0}
+        self.data_size = 0
+        self.columns = {}
+        for name in _NPZ_COLUMNS:
+            self.columns[name] = open(self._column_path(name), "w+b")
+        array("q", [0]).tofile(self.columns["message_offsets"])
+
+    def _column_path(self, name: str) -> Path:
+        return self.path.with_name(f"{self.path.name}.{name}")
+
+    def write_chunk(self, messages: Sequence[LogMessage]):
+        entry_ids = self.entry_ids
+        source_ids = self.source_ids
+        chunk = {name: array(typecode) for name, (typecode, _) in _NPZ_COLUMNS.items() if name != "message_data"}
+        entries, sources, offsets = chunk["entry_id"], chunk["source_id"], chunk["message_offsets"]
+        timestamps, server_times = chunk["timestamp_ns"], chunk["server_time"]
+        repeat_counts, first_ns = chunk["repeat_count"], chunk["first_ns"]
+        data = bytearray()
+        size = self.data_size
+        for msg in messages:
+            entry_id = entry_ids.get(msg.entry_name)
+            if entry_id is None:
+                entry_id = entry_ids[msg.entry_name] = len(entry_ids)
+            entries.append(entry_id)
+            source_id = source_ids.get(msg.source)
+            if source_id is None:
+                source_id = source_ids[msg.source] = len(source_ids)
+            sources.append(source_id)
+            timestamps.append(msg.timestamp_ns)
+            server_times.append(-1 if msg.server_time is None else msg.server_time)
+            repeat_counts.append(msg.repeat_count)
+            first_ns.append(msg.first_ns)
+            encoded = msg.message.encode("utf-8")
+            data += encoded
+            size += len(encoded)
+            offsets.append(size)
+        self.data_size = size
+
+        for name, values in chunk.items():
+            values.tofile(self.columns[name])
+        self.columns["message_data"].write(data)
+
+    def abort(self):
+        self._remove_columns()
+
+    def close(self):
+        import numpy
+        from numpy.lib import format as npy_format
+
+        try:
+            with zipfile.ZipFile(self.path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for name, (_, dtype_name) in _NPZ_COLUMNS.items():
+                    dtype = numpy.dtype(dtype_name)
+                    column = self.columns[name]
+                    length = column.tell() // dtype.itemsize
+                    column.seek(0)
+                    with archive.open(f"{name}.npy", "w", force_zip64=True) as member:
+                        npy_format.write_array_header_1_0(member, {
+                            "descr": npy_format.dtype_to_descr(dtype), "fortran_order": False, "shape": (length,)
+                        })
+                        shutil.copyfileobj(column, member, 1024 * 1024)
+
+                # the name tables are tiny, straight from memory
+                for name, values in (("entry_names", list(self.entry_ids)),
+                                     ("source_names", [source or "" for source in self.source_ids])):
+                    with archive.open(f"{name}.npy", "w") as member:
+                        npy_format.write_array(member, numpy.array(values, dtype=str))
+        finally:
+            self._remove_columns()
+
+    def _remove_columns(self):
+        for name, column in self.columns.items():
+            column.close()
+            self._column_path(name).unlink(missing_ok=True)
+        self.columns = {}
+
+
+EXPORT_WRITERS = {
+    "text": TextExportWriter,
+    "csv": CsvExportWriter,
+    "jsonl": JsonlExportWriter,
+}
+if NUMPY_AVAILABLE:
+    EXPORT_WRITERS["npz"] = NpzExportWriter
+
+
+def format_for_path(path: Path, default: str = "text") -> str:
+    suffix = Path(path).suffix.lower()
+    for name, writer_class in EXPORT_WRITERS.items():
+        if writer_class.suffix == suffix:
+            return name
+    return default
+
+
+def export_messages(path: Path,
+                    messages: Sequence[LogMessage],
+                    export_format: Optional[str] = None,
+                    progress: Optional[Callable[[int, int], None]] = None,
+                    cancelled: Optional[Callable[[], bool]] = None,
+                    chunk_size: int = EXPORT_CHUNK_SIZE) -> int:
+    # messages should be a snapshot (e.g. a list taken on the GUI thread), it's read from the calling thread.
+    # Returns the number of messages written, raises ExportCancelled if cancelled() turned True on the way.
+    path = Path(path)
+    writer_class = EXPORT_WRITERS[export_format or format_for_path(path)]
+    temp = path.with_name(path.name + ".part")
+    total = len(messages)
+
+    writer = writer_class(temp, total)
+    try:
+        for start in range(0, total, chunk_size):
+            if cancelled and cancelled():
+                raise ExportCancelled()
+            writer.write_chunk(messages[start:start + chunk_size])
+            if progress:
+                progress(min(start + chunk_size, total), total)
+        writer.close()
+        temp.replace(path)
+    except BaseException:
+        writer.abort()
+        temp.unlink(missing_ok=True)
+        raise
+
+    return total
+
+
+def dialog_filters() -> List[str]:
+    return [writer_class.description for writer_class in EXPORT_WRITERS.values()]
+
+
+def format_for_filter(selected_filter: str) -> Optional[str]:
+    for name, writer_class in EXPORT_WRITERS.items():
+        if writer_class.description == selected_filter:
+            return name
+    return None
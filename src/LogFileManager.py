@@ -1,101 +1,410 @@
+import os
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List
-from models.LogMessage import LogMessage
-from config import LOG_FILE_DIRECTORY, LOG_FILE_NAME_FORMAT
+from typing import Iterator, Optional, List, Set, Tuple
+from models.LogMessage import LogMessage, to_ns
+from models.MessageStore import MessageStore
+from models.LogFilter import LogFilter
+from LogWriter import LogWriter
+from LogCompressor import LogCompressor, COMPRESSED_SUFFIXES, open_log_text
+from SegmentLock import SegmentLock, segment_in_use
+from BinaryLogFormat import BinaryLogWriter, BinaryLogReader, BINARY_LOG_SUFFIX, INDEX_SUFFIX, index_path_for
+from SqliteLogBackend import SqliteLogWriter, SqliteLogReader, SQLITE_LOG_SUFFIX
+from LogExporter import export_messages
+from SessionCatalog import SessionCatalog, SessionInfo, SegmentStats, segment_key
+from config import (
+    LOG_FILE_DIRECTORY,
+    LOG_FILE_NAME_FORMAT,
+    LOG_FILE_FORMAT,
+    AUTO_SAVE_INTERVAL,
+    LOG_BACKGROUND_WRITER,
+    LOG_WRITER_QUEUE_MAX,
+    LOG_WRITER_BLOCK_WHEN_FULL,
+    LOG_FLUSH_INTERVAL_MS,
+    LOG_FLUSH_MAX_MESSAGES,
+    LOG_FSYNC,
+    LOG_ROTATE_MAX_BYTES,
+    LOG_ROTATE_INTERVAL_S,
+    LOG_COMPRESSION,
+    LOG_RETENTION_MAX_BYTES,
+    LOG_RETENTION_MAX_AGE_DAYS,
+    SESSION_CATALOG_ENABLED,
+    SESSION_CATALOG_FILE,
+    SESSION_CATALOG_UPDATE_S
+)
+
+# every kind of file a session can leave in the logs directory (sidecar indexes are handled with their .grtlog,
+# a .grtdb's -wal/-shm only exist while it's open)
+LOG_FILE_PATTERNS = ["*.txt", f"*{BINARY_LOG_SUFFIX}", f"*{SQLITE_LOG_SUFFIX}"] + [f"*.txt{suffix}" for suffix in COMPRESSED_SUFFIXES.values()]
 
 
 class LogFileManager:
 
-    def __init__(self):
+    def __init__(self, background_writer: bool = LOG_BACKGROUND_WRITER, log_format: str = LOG_FILE_FORMAT,
+                 shared_with: Optional["LogFileManager"] = None):
+        # shared_with: a second writer in the same process (a replay next to the live log) borrows that manager's
+        # catalog and compressor instead of opening its own and sweeping robot_logs again
         #Initialize the log file manager
         self.current_log_file: Optional[Path] = None
         self.file_handle = None
+        self.binary_log: Optional[BinaryLogWriter] = None
+        self.sqlite_log: Optional[SqliteLogWriter] = None
+        self.segment_lock: Optional[SegmentLock] = None  # held while the current segment is written
+        # what _open_files hands out, rotation changes it on the writer thread while the GUI thread reads it
+        self.open_paths: Set[Path] = set()
+        self.open_paths_lock = threading.Lock()
+        self.log_format = log_format  # "text", "binary" or "sqlite"
         self.logs_directory = Path(LOG_FILE_DIRECTORY)
         self.logs_directory.mkdir(exist_ok=True)
+        
+        # with a background writer the GUI thread only queues messages, the LogWriter thread does the file I/O
+        self.background_writer = background_writer
+        self.writer: Optional[LogWriter] = None
+        self.write_errors = 0  # failed writes on the synchronous path, the LogWriter counts its own
+        
+        # a session is split into segments by size / wall clock time, see _rotate_if_needed
+        self.segment_started = 0.0
+        self.segment_bytes = 0  # for text also the byte offset the next write starts at
+        self.segment_number = 0
+        
+        # per-segment metadata for browsing old sessions, kept current while writing (see SessionCatalog.py)
+        self.segment_stats: Optional[SegmentStats] = None
+        self.catalog_saved = 0.0
+        if shared_with:
+            self.catalog = shared_with.catalog
+            self.compressor = shared_with.compressor
+            return
+        self.catalog = SessionCatalog(self.logs_directory / SESSION_CATALOG_FILE)
+        
+        # compression of closed segments + retention run on their own thread
+        self.compressor = LogCompressor(
+            LOG_COMPRESSION,
+            self._retention_files,
+            self._segment_for,
+            max_bytes=LOG_RETENTION_MAX_BYTES,
+            max_age_days=LOG_RETENTION_MAX_AGE_DAYS
+        )
+        self.compressor.start()
+        
+        # text segments left uncompressed by an earlier run (e.g. it was killed) get picked up here, ones another
+        # writer still holds (recorder.py next to the GUI) are skipped by the compressor
+        if LOG_COMPRESSION:
+            for path in self.logs_directory.glob("*.txt"):
+                self.compressor.compress(path)
+        self.compressor.enforce_retention()
     
     def create_new_log_file(self) -> Path:
         
         # Close existing file if open
         self.close_current_file()
         
-        # Generate filename with timestamp
-        timestamp = datetime.now()
-        filename = timestamp.strftime(LOG_FILE_NAME_FORMAT)
-        self.current_log_file = self.logs_directory / filename
+        self.segment_number = 0
+        self._open_segment(datetime.now())
         
-        # Open file and write header
-        self.file_handle = open(self.current_log_file, "w", encoding="utf-8")
-        self._write_header(timestamp)
+        if self.background_writer:
+            self.writer = LogWriter(
+                self._write_batch,
+                self._flush,
+                max_pending=LOG_WRITER_QUEUE_MAX,
+                flush_interval_ms=LOG_FLUSH_INTERVAL_MS,
+                flush_max_messages=LOG_FLUSH_MAX_MESSAGES,
+                fsync_interval_s=AUTO_SAVE_INTERVAL if LOG_FSYNC else 0,
+                block_when_full=LOG_WRITER_BLOCK_WHEN_FULL
+            )
+            self.writer.start()
         
         return self.current_log_file
     
-    def _write_header(self, timestamp: datetime):
-        if self.file_handle:
-            self.file_handle.write(f"FRC Robot Log\n")
-            self.file_handle.write(f"Started: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.file_handle.write("=" * 80 + "\n\n")
-            self.file_handle.flush()
+    def _new_log_path(self, timestamp: datetime) -> Tuple[Path, SegmentLock]:
+        # Generate filename with timestamp, segments rotated within the same second get a _N suffix.
+        # The name is locked before the file exists, so another writer can't pick it and nothing compresses it
+        path = self.logs_directory / timestamp.strftime(LOG_FILE_NAME_FORMAT)
+        if self.log_format == "binary":
+            path = path.with_suffix(BINARY_LOG_SUFFIX)
+        elif self.log_format == "sqlite":
+            path = path.with_suffix(SQLITE_LOG_SUFFIX)
+        
+        candidate = path
+        number = 1
+        while True:
+            if not self._segment_exists(candidate):
+                lock = SegmentLock.acquire(candidate)
+                if lock is not None:
+                    if not self._segment_exists(candidate):
+                        return candidate, lock
+                    lock.release()
+            candidate = path.with_name(f"{path.stem}_{number}{path.suffix}")
+            number += 1
     
-    def write_message(self, log_msg: LogMessage):
+    def _segment_exists(self, path: Path) -> bool:
+        # the stem counts as taken in any format, plain or compressed
+        candidates = [path.with_suffix(suffix) for suffix in (".txt", BINARY_LOG_SUFFIX, SQLITE_LOG_SUFFIX)]
+        candidates += [path.with_suffix(".txt" + suffix) for suffix in COMPRESSED_SUFFIXES.values()]
+        return any(candidate.exists() for candidate in candidates)
+    
+    def _open_segment(self, timestamp: datetime, previous: Optional[Path] = None):
+        self.current_log_file, self.segment_lock = self._new_log_path(timestamp)
+        self.segment_bytes = 0
+        
+        if self.log_format == "binary":
+            self.binary_log = BinaryLogWriter(self.current_log_file, timestamp)
+        elif self.log_format == "sqlite":
+            self.sqlite_log = SqliteLogWriter(self.current_log_file, timestamp)
+        else:
+            # Open file and write header
+            self.file_handle = open(self.current_log_file, "w", encoding="utf-8")
+            self._write_header(timestamp, previous)
+        
+        self.segment_started = time.monotonic()
+        self.segment_number += 1
+        with self.open_paths_lock:
+            self.open_paths = {self.current_log_file, index_path_for(self.current_log_file)}
+        
+        if SESSION_CATALOG_ENABLED:
+            self.segment_stats = SegmentStats(self.current_log_file, self.log_format, to_ns(timestamp),
+                                              segment_key(previous) if previous else None)
+            self._save_stats()
+    
+    def _close_segment(self) -> Optional[Path]:
+        closed = None
+        
         if self.file_handle:
             try:
-                self.file_handle.write(str(log_msg) + "\n")
-                self.file_handle.flush()
+                self.file_handle.close()
+                closed = self.current_log_file
+            except Exception as e:
+                print(f"Error closing log file: {e}")
+            finally:
+                self.file_handle = None
+        
+        if self.binary_log:
+            try:
+                self.binary_log.close()
+                closed = self.current_log_file
+            except Exception as e:
+                print(f"Error closing log file: {e}")
+            finally:
+                self.binary_log = None
+        
+        if self.sqlite_log:
+            try:
+                self.sqlite_log.close()
+                closed = self.current_log_file
             except Exception as e:
-                print(f"Error writing to log file: {e}")
+                print(f"Error closing log file: {e}")
+            finally:
+                self.sqlite_log = None
+        
+        if closed and self.segment_stats:
+            self.segment_stats.complete = True
+            self._save_stats()
+        self.segment_stats = None
+        
+        with self.open_paths_lock:
+            self.open_paths = set()
+        if self.segment_lock:
+            self.segment_lock.release()
+            self.segment_lock = None
+        return closed
     
-    def write_messages(self, messages: List[LogMessage]):
+    def _save_stats(self):
+        try:
+            self.catalog.save(self.segment_stats)
+        except Exception as e:
+            print(f"Error updating session catalog: {e}")
+        self.catalog_saved = time.monotonic()
+    
+    def _rotate_if_needed(self):
+        too_big = LOG_ROTATE_MAX_BYTES > 0 and self.segment_bytes >= LOG_ROTATE_MAX_BYTES
+        too_old = LOG_ROTATE_INTERVAL_S > 0 and time.monotonic() - self.segment_started >= LOG_ROTATE_INTERVAL_S
+        if not (too_big or too_old):
+            return
+        
+        # runs wherever the writes happen (the LogWriter thread normally), never blocks on compression
+        previous = self._close_segment()
+        self._open_segment(datetime.now(), previous)
+        self._compress_closed(previous)
+    
+    def _compress_closed(self, path: Optional[Path]):
+        # binary segments are compressed internally and sqlite ones are queried in place, only text segments get an
+        # outer gzip/zstd
+        if path and LOG_COMPRESSION and self.log_format == "text":
+            self.compressor.compress(path)
+        else:
+            self.compressor.enforce_retention()
+    
+    def _write_header(self, timestamp: datetime, previous: Optional[Path] = None):
         if self.file_handle:
+            header = f"FRC Robot Log\n"
+            header += f"Started: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            if previous:
+                header += f"Segment: {self.segment_number + 1} (continues {previous.name})\n"
+            header += "=" * 80 + "\n\n"
+            self.file_handle.write(header)
+            self.file_handle.flush()
+            self.segment_bytes += len(header.encode("utf-8"))
+    
+    def write_message(self, log_msg: LogMessage):
+        self.write_messages([log_msg])
+    
+    def write_messages(self, messages: List[LogMessage]):
+        if not messages:
+            return
+        
+        if self.writer:
+            self.writer.submit(messages)
+        elif self.file_handle or self.binary_log or self.sqlite_log:
             try:
-                for msg in messages:
-                    self.file_handle.write(str(msg) + "\n")
-                self.file_handle.flush()
+                # one write + one flush for the whole batch
+                self._write_batch(messages)
+                self._flush(False)
             except Exception as e:
+                self.write_errors += 1
                 print(f"Error writing messages to log file: {e}")
     
-    def export_to_file(self, filepath: Path, messages: List[LogMessage]) -> bool:
+    def _write_batch(self, messages: List[LogMessage]):
+        stats = self.segment_stats
+        if stats and stats.checkpoint_due(messages[0].timestamp_ns):
+            # where this batch starts: the chunk it goes into for binary, the row id for sqlite, the byte position
+            # for text (counted as it's written, a text handle's tell() is slow and opaque)
+            if self.binary_log:
+                offset = self.binary_log.offset
+            elif self.sqlite_log:
+                offset = self.sqlite_log.next_id
+            else:
+                offset = self.segment_bytes
+            stats.add_checkpoint(messages[0].timestamp_ns, offset)
+        
+        if self.binary_log:
+            before = self.binary_log.size()
+            self.binary_log.write_messages(messages)
+            self.segment_bytes += self.binary_log.size() - before
+        elif self.sqlite_log:
+            self.sqlite_log.write_messages(messages)
+            self.segment_bytes = self.sqlite_log.size()
+        elif self.file_handle:
+            data = "".join(f"{msg}\n" for msg in messages)
+            self.file_handle.write(data)
+            # bytes on disk, not characters ("°C"), isascii is a flag check so only non-ASCII batches get encoded
+            self.segment_bytes += len(data) if data.isascii() else len(data.encode("utf-8"))
+        else:
+            return
+        
+        if stats:
+            stats.add(messages)
+        self._rotate_if_needed()
+    
+    def _flush(self, fsync: bool):
+        if self.sqlite_log:
+            # a commit, and for fsync a WAL checkpoint (SQLite does the syncing)
+            if fsync:
+                self.sqlite_log.sync()
+            else:
+                self.sqlite_log.flush()
+        
+        if self.binary_log:
+            self.binary_log.flush()
+            if fsync:
+                self.binary_log.sync()  # the .grtidx too
+        elif self.file_handle:
+            self.file_handle.flush()
+            if fsync:
+                os.fsync(self.file_handle.fileno())
+        
+        # the open segment's catalog row follows what's been flushed, every few seconds
+        if self.segment_stats and time.monotonic() - self.catalog_saved >= SESSION_CATALOG_UPDATE_S:
+            self._save_stats()
+    
+    def get_writer_stats(self) -> dict:
+        if self.writer:
+            return self.writer.get_stats()
+        return {"errors": self.write_errors} if self.write_errors else {}
+    
+    def export_to_file(self, filepath: Path, messages: List[LogMessage], export_format: Optional[str] = None) -> bool:
+        # synchronous export, the format comes from the file suffix unless given (text if it's unknown)
         try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(f"Robot Log Export\n")
-                f.write(f"Exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Total Messages: {len(messages)}\n")
-                f.write("=" * 80 + "\n\n")
-                
-                # write ALL messages
-                for msg in messages:
-                    f.write(str(msg) + "\n")
-            
+            export_messages(filepath, messages, export_format)
             return True
             
         except Exception as e:
             print(f"Error exporting log file: {e}")
             return False
     
-    def export_filtered(self, filepath: Path, messages: List[LogMessage], 
-                       entry_filter: str) -> bool:
-        # Filter messages if necessary
-        if entry_filter != "All":
-            filtered_messages = [msg for msg in messages if msg.entry_name == entry_filter]
-        else:
-            filtered_messages = messages
+    def export_filtered(self, filepath: Path, store: MessageStore, 
+                       log_filter: LogFilter, now_ns: Optional[int] = None,
+                       export_format: Optional[str] = None) -> bool:
+        # same compiled filter as the view, now_ns is what a time window counts back from
+        if now_ns is None:
+            now_ns = to_ns(datetime.now())
+        filtered_messages = log_filter.select_messages(store, now_ns)
         
-        return self.export_to_file(filepath, filtered_messages)
+        return self.export_to_file(filepath, filtered_messages, export_format)
     
     def close_current_file(self):
-        if self.file_handle:
-            try:
-                self.file_handle.close()
-            except Exception as e:
-                print(f"Error closing log file: {e}")
-            finally:
-                self.file_handle = None
+        # stop the writer first, it drains and flushes everything still queued
+        if self.writer:
+            self.writer.stop()
+            self.writer = None
+        
+        self._compress_closed(self._close_segment())
     
     def get_current_filepath(self) -> Optional[Path]:
         return self.current_log_file
     
+    def _open_files(self) -> Set[Path]:
+        with self.open_paths_lock:
+            return set(self.open_paths)
+    
+    def _segment_for(self, path: Path) -> Path:
+        # the segment whose lock covers path, a binary log's sidecar index goes with its log
+        return path.with_suffix(BINARY_LOG_SUFFIX) if path.suffix == INDEX_SUFFIX else path
+    
+    def _retention_files(self) -> List[Path]:
+        files = []
+        for pattern in LOG_FILE_PATTERNS + [f"*{INDEX_SUFFIX}"]:
+            files.extend(self.logs_directory.glob(pattern))
+        return files
+    
     def get_log_files(self) -> List[Path]:
-        return sorted(self.logs_directory.glob("*.txt"), reverse=True)
+        # every segment, plain or compressed, newest first
+        files = []
+        for pattern in LOG_FILE_PATTERNS:
+            files.extend(self.logs_directory.glob(pattern))
+        return sorted(files, key=lambda path: path.name, reverse=True)
+    
+    def refresh_catalog(self, progress=None, cancelled=None) -> int:
+        # catalogs segments it hasn't seen or that changed on disk, see SessionCatalog.refresh. Ones being written,
+        # here or by another process (recorder.py), keep their own rows current
+        files = self.get_log_files()
+        open_files = self._open_files() | {path for path in files if segment_in_use(path)}
+        return self.catalog.refresh(files, open_files, progress, cancelled)
+    
+    def get_sessions(self, refresh: bool = True) -> List[SessionInfo]:
+        # every segment's catalog row, newest first, without opening any log the catalog is up to date on
+        if refresh:
+            self.refresh_catalog()
+        return self.catalog.sessions()
+    
+    def read_log_lines(self, path: Path) -> Iterator[str]:
+        # text lines of any segment from get_log_files, decompressing / decoding as needed
+        path = Path(path)
+        if path.suffix in (BINARY_LOG_SUFFIX, SQLITE_LOG_SUFFIX):
+            reader = BinaryLogReader(path) if path.suffix == BINARY_LOG_SUFFIX else SqliteLogReader(path)
+            try:
+                yield "FRC Robot Log\n"
+                yield f"Started: {reader.started.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                yield "=" * 80 + "\n"
+                yield "\n"
+                for log_msg in reader:
+                    yield f"{log_msg}\n"
+            finally:
+                reader.close()
+            return
+        
+        with open_log_text(path) as f:
+            yield from f
     
     def __del__(self):
         self.close_current_file()
\ No newline at end of file
@@ -0,0 +1,164 @@
+# Background thread that does the actual log file writes. The GUI thread only hands it batches through a bounded
+# queue, the thread coalesces whatever has piled up into one big write and flushes/fsyncs on the durability policy.
+
+import threading
+import time
+from collections import deque
+from typing import Callable, List
+from models.LogMessage import LogMessage
+
+
+class LogWriter(threading.Thread):
+
+    def __init__(self,
+                 write_batch: Callable[[List[LogMessage]], None],
+                 flush: Callable[[bool], None],
+                 max_pending: int,
+                 flush_interval_ms: int,
+                 flush_max_messages: int,
+                 fsync_interval_s: float,
+                 block_when_full: bool):
+        super().__init__(name="LogWriter", daemon=True)
+
+        self.write_batch = write_batch  # writes a list of messages, no flushing
+        self.flush = flush              # flush(fsync) pushes buffered data to the OS and optionally to disk
+
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_messages = flush_max_messages
+        self.fsync_interval = fsync_interval_s  # 0 = never fsync
+        self.block_when_full = block_when_full
+
+        self.condition = threading.Condition()
+        self.pending = deque()
+        self.pending_count = 0
+        self.stopping = False
+        self.flush_requested = False
+
+        # submitted/written counters let drain() know when everything handed over so far is on disk
+        self.submitted_count = 0
+        self.written_count = 0
+        self.flushed_count = 0
+        self.dropped_count = 0
+        self.error_count = 0  # failed writes and flushes
+        self.max_pending_seen = 0
+        self.write_calls = 0
+
+    def submit(self, messages: List[LogMessage]):
+        # Called from the GUI thread, only ever costs a lock and a deque append
+        if not messages:
+            return
+
+        with self.condition:
+            if self.pending_count + len(messages) > self.max_pending:
+                if self.block_when_full:
+                    # backpressure: hold the caller until the writer catches up. A batch bigger than max_pending
+                    # could never fit, it goes in once the queue is empty
+                    while (self.pending_count and self.pending_count + len(messages) > self.max_pending
+                           and not self.stopping):
+                        self.condition.wait(0.1)
+                else:
+                    room = max(self.max_pending - self.pending_count, 0)
+                    self.dropped_count += len(messages) - room
+                    messages = messages[:room]
+                    if not messages:
+                        return
+
+            self.pending.append(messages)
+            self.pending_count += len(messages)
+            self.submitted_count += len(messages)
+            self.max_pending_seen = max(self.max_pending_seen, self.pending_count)
+
+            if self.pending_count >= self.flush_max_messages:
+                self.condition.notify_all()
+
+    def run(self):
+        last_flush = time.monotonic()
+        last_fsync = last_flush
+        unflushed = 0
+
+        while True:
+            with self.condition:
+                deadline = last_flush + self.flush_interval
+                while (not self.stopping and not self.flush_requested
+                       and self.pending_count < self.flush_max_messages):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+
+                batches = self.pending
+                self.pending = deque()
+                count = self.pending_count
+                self.pending_count = 0
+                force_flush = self.flush_requested or self.stopping
+                self.flush_requested = False
+                stopping = self.stopping
+                self.condition.notify_all()  # wake any submitter waiting for room
+
+            if count:
+                # group commit: everything that piled up goes out in a single write
+                messages = batches[0] if len(batches) == 1 else [msg for batch in batches for msg in batch]
+                try:
+                    self.write_batch(messages)
+                except Exception as e:
+                    self.error_count += 1
+                    print(f"Error writing messages to log file: {e}")
+                self.write_calls += 1
+                unflushed += count
+
+            now = time.monotonic()
+            if unflushed and (force_flush or unflushed >= self.flush_max_messages
+                              or now - last_flush >= self.flush_interval):
+                do_fsync = self.fsync_interval > 0 and (force_flush or now - last_fsync >= self.fsync_interval)
+                try:
+                    self.flush(do_fsync)
+                except Exception as e:
+                    self.error_count += 1
+                    print(f"Error flushing log file: {e}")
+                if do_fsync:
+                    last_fsync = now
+                unflushed = 0
+                last_flush = now
+            elif not unflushed:
+                last_flush = now
+
+            with self.condition:
+                self.written_count += count
+                if not unflushed:
+                    self.flushed_count = self.written_count
+                self.condition.notify_all()
+
+            if stopping and not count:
+                return
+
+    def drain(self, timeout: float = 10.0) -> bool:
+        # Blocks until everything submitted so far has been written and flushed
+        with self.condition:
+            target = self.submitted_count
+            self.flush_requested = True
+            self.condition.notify_all()
+            end = time.monotonic() + timeout
+            while self.flushed_count < target and self.is_alive():
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def stop(self, timeout: float = 10.0):
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.join(timeout)
+
+    def get_stats(self) -> dict:
+        with self.condition:
+            return {
+                "pending": self.pending_count,
+                "max_pending": self.max_pending_seen,
+                "written": self.written_count,
+                "dropped": self.dropped_count,
+                "errors": self.error_count,
+                "write_calls": self.write_calls,
+            }
@@ -0,0 +1,111 @@
+# Replays a saved session back through the same interface as NetworkTablesListener, so the window, the display
+# and the file writer can't tell a replay from a live robot. The files are read through the cursors in
+# LogCursors.py (text, binary and SQLite logs), nothing is loaded whole.
+
+import time
+from pathlib import Path
+from typing import Optional
+from PySide6.QtCore import QObject, Signal
+from models.LogMessage import LogMessage
+from LogCursors import open_log_cursor
+from config import BATCH_INGESTION, REPLAY_MAX_BATCH
+
+
+class ReplaySource(QObject):
+    message_received = Signal(LogMessage)
+    messages_received = Signal(list)
+    connection_status_changed = Signal(bool)  # "connected" while there is still something to replay
+
+    def __init__(self, path: Path, speed: float = 1.0, cursor=None):
+        super().__init__()
+
+        self.path = Path(path)
+        self.cursor = cursor or open_log_cursor(self.path)  # already opened on a ReplayOpenWorker, or opened here
+
+        self.speed = speed  # 1.0 = real time, 0 = as fast as possible
+        self.paused = False
+        self.finished = False
+        self.replayed_count = 0
+
+        # playback clock: session time (ns) that has been replayed up to, and when we last advanced it
+        self.play_ns = self.cursor.start_ns
+        self.last_tick = time.monotonic()
+        self.pending: Optional[LogMessage] = None  # first message that is not due yet
+
+    @property
+    def duration(self) -> float:
+        return (self.cursor.end_ns - self.cursor.start_ns) / 1e9
+
+    @property
+    def position(self) -> float:
+        return (self.play_ns - self.cursor.start_ns) / 1e9
+
+    def set_speed(self, speed: float):
+        self._advance_clock()
+        self.speed = speed
+
+    def set_paused(self, paused: bool):
+        self._advance_clock()
+        self.paused = paused
+
+    def seek(self, seconds: float):
+        seconds = min(max(seconds, 0.0), self.duration)
+        self.play_ns = self.cursor.start_ns + int(seconds * 1e9)
+        self.cursor.seek(self.play_ns)
+        self.pending = None
+        self.last_tick = time.monotonic()
+        if self.finished:
+            self.finished = False
+            self.connection_status_changed.emit(True)
+
+    def _advance_clock(self):
+        now = time.monotonic()
+        if not self.paused and self.speed > 0:
+            self.play_ns += int((now - self.last_tick) * self.speed * 1e9)
+        self.last_tick = now
+
+    def check_for_messages(self):
+        if self.paused or self.finished:
+            self.last_tick = time.monotonic()
+            return
+
+        self._advance_clock()
+        as_fast_as_possible = self.speed <= 0
+
+        batch = []
+        while len(batch) < REPLAY_MAX_BATCH:
+            log_msg = self.pending or self.cursor.next()
+            self.pending = None
+            if log_msg is None:
+                self.finished = True
+                break
+            if not as_fast_as_possible and log_msg.timestamp_ns > self.play_ns:
+                self.pending = log_msg  # not due yet, keep it for the next tick
+                break
+            batch.append(log_msg)
+
+        if as_fast_as_possible and batch:
+            self.play_ns = batch[-1].timestamp_ns
+
+        self.replayed_count += len(batch)
+        if batch:
+            if BATCH_INGESTION:
+                self.messages_received.emit(batch)
+            else:
+                for log_msg in batch:
+                    self.message_received.emit(log_msg)
+
+        if self.finished:
+            self.play_ns = max(self.play_ns, self.cursor.end_ns)
+            self.connection_status_changed.emit(False)
+
+    def get_ingest_stats(self) -> dict:
+        return {"received": self.replayed_count, "dropped": 0, "queue_depth": 0, "max_queue_depth": 0}
+
+    def add_entry_type(self, entry_name: str):
+        pass  # a replay always contains whatever entries were recorded
+
+    def disconnect(self):
+        self.finished = True
+        self.cursor.close()
+        self.connection_status_changed.emit(False)
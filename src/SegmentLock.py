@@ -0,0 +1,102 @@
+# Lock file next to a log segment (robot_log_....txt.lock) held by whoever is writing, compressing or deleting it,
+# so the GUI running beside recorder.py (or two managers in one process) never touches a segment someone else holds.
+# It's an OS lock, a lock file left behind by a crashed run doesn't hold anything.
+
+import os
+from pathlib import Path
+from typing import Optional
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+LOCK_SUFFIX = ".lock"
+
+
+def lock_path_for(path: Path) -> Path:
+    return Path(path).with_name(Path(path).name + LOCK_SUFFIX)
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if os.name == "nt":
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd: int):
+    try:
+        if os.name == "nt":
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    except OSError:
+        pass
+
+
+def segment_in_use(path: Path) -> bool:
+    # someone holds the segment's lock right now, only looks and never leaves a lock file behind
+    try:
+        fd = os.open(lock_path_for(path), os.O_RDWR)
+    except FileNotFoundError:
+        return False
+    except OSError:
+        return True  # can't tell, better left alone
+    try:
+        if _try_lock(fd):
+            _unlock(fd)
+            return False
+        return True
+    finally:
+        os.close(fd)
+
+
+class SegmentLock:
+
+    def __init__(self, path: Path, fd: int):
+        self.path = path
+        self.fd: Optional[int] = fd
+
+    @classmethod
+    def acquire(cls, segment: Path) -> Optional["SegmentLock"]:
+        # the lock, or None if someone else holds it. Errors opening the lock file are raised like open() would
+        path = lock_path_for(segment)
+        while True:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            if not _try_lock(fd):
+                os.close(fd)
+                return None
+            try:
+                if os.stat(path).st_ino == os.fstat(fd).st_ino:
+                    return cls(path, fd)
+            except FileNotFoundError:
+                pass
+            # whoever had it removed the file between our open and lock, what we locked is gone, try a fresh one
+            _unlock(fd)
+            os.close(fd)
+
+    def release(self):
+        if self.fd is None:
+            return
+        # removed while still locked so nobody can lock the old file after us, Windows only lets it go once closed
+        removed = _remove(self.path)
+        _unlock(self.fd)
+        os.close(self.fd)
+        self.fd = None
+        if not removed:
+            _remove(self.path)
+
+
+def _remove(path: Path) -> bool:
+    try:
+        path.unlink()
+        return True
+    except FileNotFoundError:
+        return True
+    except OSError:
+        return False
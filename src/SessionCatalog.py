@@ -0,0 +1,461 @@
+# Catalog of the segments in the logs directory (times, counts per entry, errors, checkpoints) in one SQLite file,
+# so listing sessions is one query.  List / refresh a directory with:  python -m SessionCatalog [directory]
+
+import re
+import sys
+import threading
+from collections import Counter
+from operator import attrgetter
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from models.LogMessage import LogMessage, to_ns, from_ns, split_source, NS_PER_DAY, REPEAT_SUFFIX_PATTERN
+from BinaryLogFormat import BinaryLogReader, BINARY_LOG_SUFFIX
+from SqliteLogBackend import SqliteLogReader, SQLITE_LOG_SUFFIX
+from LogCompressor import open_log_binary, COMPRESSED_SUFFIXES
+from config import LOG_FILE_DIRECTORY, SESSION_CATALOG_FILE, SESSION_CHECKPOINT_INTERVAL_S, SESSION_ERROR_ENTRIES
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    key TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    format TEXT NOT NULL,
+    started_ns INTEGER NOT NULL,
+    first_ns INTEGER,
+    last_ns INTEGER,
+    message_count INTEGER NOT NULL,
+    error_count INTEGER NOT NULL,
+    file_size INTEGER NOT NULL,
+    file_mtime REAL NOT NULL,
+    previous TEXT,
+    complete INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entry_counts (
+    key TEXT NOT NULL,
+    entry_name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (key, entry_name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS checkpoints (
+    key TEXT NOT NULL,
+    timestamp_ns INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    PRIMARY KEY (key, timestamp_ns)
+) WITHOUT ROWID;
+"""
+
+CHECKPOINT_INTERVAL_NS = int(SESSION_CHECKPOINT_INTERVAL_S * 1e9)
+
+# "Segment: 2 (continues robot_log_20250101_120000.txt)" in a text segment's header
+PREVIOUS_PATTERN = re.compile(rb"\(continues ([^)]+)\)")
+# the repeat suffix of a coalesced record at the end of a raw text line (its $ also matches before the newline)
+REPEAT_BYTES_PATTERN = re.compile(REPEAT_SUFFIX_PATTERN.pattern.encode())
+
+_entry_name = attrgetter("entry_name")
+_repeat = attrgetter("repeat")
+
+
+def segment_key(path: Path) -> str:
+    # robot_log_20250101_120000.txt.gz -> robot_log_20250101_120000.txt, only compression changes the name of a
+    # segment, the same stem in another format (a converted copy, another writer's) is a segment of its own
+    name = Path(path).name
+    for suffix in COMPRESSED_SUFFIXES.values():
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+class SegmentStats:
+    # running totals for one segment, kept by whoever writes (or scans) it and saved with SessionCatalog.save
+
+    def __init__(self, path: Path, log_format: str, started_ns: int, previous: Optional[str] = None):
+        self.path = Path(path)
+        self.key = segment_key(path)
+        self.log_format = log_format
+        self.started_ns = started_ns
+        self.previous = previous  # key of the segment this one continues, if it was rotated out of one
+        self.first_ns: Optional[int] = None
+        self.last_ns: Optional[int] = None
+        self.message_count = 0
+        self.entry_counts: Dict[str, int] = Counter()
+        self.checkpoints: List[Tuple[int, int]] = []  # (timestamp ns, byte offset)
+        self.next_checkpoint_ns: Optional[int] = None
+        self.saved_checkpoints = -1  # how many of them the catalog has, -1 = never saved
+        self.complete = False  # the writer closed it (or it was scanned as it is), nothing more will come
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.entry_counts.get(entry_name, 0) for entry_name in SESSION_ERROR_ENTRIES)
+
+    def checkpoint_due(self, timestamp_ns: int) -> bool:
+        return self.next_checkpoint_ns is None or timestamp_ns >= self.next_checkpoint_ns
+
+    def add_checkpoint(self, timestamp_ns: int, offset: int):
+        self.checkpoints.append((timestamp_ns, offset))
+        self.next_checkpoint_ns = timestamp_ns + CHECKPOINT_INTERVAL_NS
+
+    def add(self, messages: List[LogMessage]):
+        # runs on the writer thread for every batch: entries are counted by Counter in C, only batches with a
+        # coalesced record in them take a Python loop for its count
+        if not messages:
+            return
+        self.entry_counts.update(map(_entry_name, messages))
+        self.message_count += len(messages)
+        if any(map(_repeat, messages)):
+            for log_msg in messages:
+                if log_msg.repeat:
+                    self.entry_counts[log_msg.entry_name] += log_msg.repeat[0] - 1
+                    self.message_count += log_msg.repeat[0] - 1
+
+        if self.first_ns is None:
+            self.first_ns = messages[0].first_ns
+        last_ns = messages[-1].timestamp_ns
+        if self.last_ns is None or last_ns > self.last_ns:
+            self.last_ns = last_ns
+
+
+class SessionInfo:
+    # one row of the catalog as the session browser shows it
+    __slots__ = ("key", "path", "log_format", "started_ns", "first_ns", "last_ns", "message_count", "error_count",
+                 "file_size", "previous", "complete", "entry_counts")
+
+    def __init__(self, directory: Path, key: str, file_name: str, log_format: str, started_ns: int,
+                 first_ns: Optional[int], last_ns: Optional[int], message_count: int, error_count: int,
+                 file_size: int, previous: Optional[str], complete: int):
+        self.key = key
+        self.path = directory / file_name
+        self.log_format = log_format
+        self.started_ns = started_ns
+        self.first_ns = first_ns
+        self.last_ns = last_ns
+        self.message_count = message_count
+        self.error_count = error_count
+        self.file_size = file_size
+        self.previous = previous
+        self.complete = bool(complete)
+        self.entry_counts: Dict[str, int] = {}
+
+    @property
+    def started(self) -> datetime:
+        return from_ns(self.started_ns)
+
+    @property
+    def duration_s(self) -> float:
+        if self.first_ns is None or self.last_ns is None:
+            return 0.0
+        return (self.last_ns - self.first_ns) / 1e9
+
+
+def _time_of_day_ns(line: bytes) -> int:
+    # "[HH:MM:SS.mmm] ..." -> ns since midnight
+    return (((int(line[1:3]) * 60 + int(line[4:6])) * 60 + int(line[7:9])) * 1000 + int(line[10:13])) * 10**6
+
+
+def _scan_text(path: Path) -> SegmentStats:
+    # one pass over the raw lines. The time is only parsed when its seconds change (for checkpoints and day
+    # wraps) and at the ends, entry names are counted as bytes and decoded once at the end
+    started = None
+    previous = None
+    counts: Dict[bytes, int] = {}
+    checkpoints = []
+    day_ns = None
+    first_ns = None
+    last_line = None
+    last_second = None
+    last_time_of_day = 0
+    next_checkpoint_ns = None
+    offset = 0
+
+    with open_log_binary(path) as f:
+        for line in f:
+            line_offset = offset
+            offset += len(line)
+            if line[:1] != b"[" or line[13:16] != b"] [":
+                if last_line is None:
+                    if line.startswith(b"Started: "):
+                        try:
+                            started = datetime.strptime(line[9:].decode("utf-8").strip(), "%Y-%m-%d %H:%M:%S")
+                        except ValueError:
+                            pass
+                    elif line.startswith(b"Segment: "):
+                        match = PREVIOUS_PATTERN.search(line)
+                        if match:
+                            previous = segment_key(match.group(1).decode("utf-8"))
+                continue
+
+            entry_end = line.find(b"] ", 16)
+            if entry_end < 0:
+                continue
+            entry_name = line[16:entry_end]
+            records = 1
+            if line.endswith(b"]\n"):
+                match = REPEAT_BYTES_PATTERN.search(line)
+                if match:
+                    records = int(match.group(1))
+            counts[entry_name] = counts.get(entry_name, 0) + records
+            last_line = line
+
+            second = line[1:9]
+            if second != last_second:
+                last_second = second
+                try:
+                    time_of_day = _time_of_day_ns(line)
+                except ValueError:
+                    continue
+                if day_ns is None:
+                    if started is None:
+                        started = datetime.fromtimestamp(path.stat().st_mtime)
+                    day_ns = to_ns(started.replace(hour=0, minute=0, second=0, microsecond=0))
+                    first_ns = day_ns + time_of_day
+                elif time_of_day < last_time_of_day - NS_PER_DAY // 2:
+                    day_ns += NS_PER_DAY  # past midnight
+                last_time_of_day = time_of_day
+                timestamp_ns = day_ns + time_of_day
+                if next_checkpoint_ns is None or timestamp_ns >= next_checkpoint_ns:
+                    checkpoints.append((timestamp_ns, line_offset))
+                    next_checkpoint_ns = timestamp_ns + CHECKPOINT_INTERVAL_NS
+
+    if started is None:
+        started = datetime.fromtimestamp(path.stat().st_mtime)
+    stats = SegmentStats(path, "text", to_ns(started), previous)
+    # counted per entry like the live stats, whichever source it came from ("drivetrain@robotA" -> drivetrain)
+    for name, count in counts.items():
+        stats.entry_counts[split_source(name.decode("utf-8", errors="replace"))[0]] += count
+    stats.message_count = sum(counts.values())
+    stats.checkpoints = checkpoints
+    stats.first_ns = first_ns
+    if last_line is not None and day_ns is not None:
+        try:
+            stats.last_ns = day_ns + _time_of_day_ns(last_line)
+        except ValueError:
+            stats.last_ns = day_ns + last_time_of_day
+    return stats
+
+
+def _scan_binary(path: Path) -> SegmentStats:
+    reader = BinaryLogReader(path)
+    try:
+        stats = SegmentStats(path, "binary", reader.start_ns)
+        batch = []
+        for log_msg in reader:
+            batch.append(log_msg)
+            if len(batch) >= 10000:
+                stats.add(batch)
+                batch = []
+        stats.add(batch)
+        # the reader's index already has a checkpoint per chunk, keep one per interval of them
+        for first_ts, _, chunk_offset, _ in reader.checkpoints:
+            if stats.checkpoint_due(first_ts):
+                stats.add_checkpoint(first_ts, chunk_offset)
+    finally:
+        reader.close()
+    return stats
+
+
+def _scan_sqlite(path: Path) -> SegmentStats:
+    # all of it comes out of SQL, checkpoints are one index lookup per interval
+    reader = SqliteLogReader(path)
+    try:
+        stats = SegmentStats(path, "sqlite", reader.start_ns)
+        stats.entry_counts = reader.entry_counts()
+        stats.message_count = sum(stats.entry_counts.values())
+        stats.first_ns, stats.last_ns = reader.time_range()
+        timestamp_ns = stats.first_ns
+        while timestamp_ns is not None:
+            row = reader.connection.execute(
+                "SELECT timestamp_ns, id FROM messages WHERE timestamp_ns >= ? ORDER BY timestamp_ns LIMIT 1",
+                (timestamp_ns,)
+            ).fetchone()
+            if row is None:
+                break
+            stats.add_checkpoint(*row)
+            timestamp_ns = stats.next_checkpoint_ns
+    finally:
+        reader.close()
+    return stats
+
+
+def scan_segment(path: Path) -> SegmentStats:
+    # rebuilds a segment's stats from the file itself, plain, compressed, binary or SQLite
+    path = Path(path)
+    if path.suffix == BINARY_LOG_SUFFIX:
+        stats = _scan_binary(path)
+    elif path.suffix == SQLITE_LOG_SUFFIX:
+        stats = _scan_sqlite(path)
+    else:
+        stats = _scan_text(path)
+    stats.complete = True
+    return stats
+
+
+class SessionCatalog:
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.directory = self.path.parent
+        # the writer thread saves, the GUI (or a browser's worker) reads, so one connection behind a lock
+        self.lock = threading.Lock()
+        self.connection = None  # opened on first use
+
+    def _connect(self):
+        if self.connection is None:
+            import sqlite3  # here, not at the top: every LogFileManager import would pay for it
+            connection = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False)
+            # WAL: a viewer reading the catalog doesn't hold up a recorder saving to it, and commits skip the fsync
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                # the catalog only caches what's in the logs, one from another version is rebuilt from them
+                with connection:
+                    connection.executescript(
+                        "DROP TABLE IF EXISTS segments; DROP TABLE IF EXISTS entry_counts; "
+                        "DROP TABLE IF EXISTS checkpoints;" + SCHEMA
+                    )
+                    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.connection = connection
+        return self.connection
+
+    def save(self, stats: SegmentStats):
+        # adds or updates the segment's row, only checkpoints the catalog doesn't have yet are written
+        stat = stats.path.stat()
+        new_checkpoints = stats.checkpoints[max(stats.saved_checkpoints, 0):]
+        with self.lock:
+            connection = self._connect()
+            with connection:
+                if stats.saved_checkpoints < 0:
+                    # first save of these stats, whatever was there for the key before is out of date
+                    connection.execute("DELETE FROM entry_counts WHERE key = ?", (stats.key,))
+                    connection.execute("DELETE FROM checkpoints WHERE key = ?", (stats.key,))
+                connection.execute(
+                    "INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (stats.key, stats.path.name, stats.log_format, stats.started_ns, stats.first_ns, stats.last_ns,
+                     stats.message_count, stats.error_count, stat.st_size, stat.st_mtime, stats.previous,
+                     int(stats.complete))
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO entry_counts VALUES (?, ?, ?)",
+                    [(stats.key, entry_name, count) for entry_name, count in stats.entry_counts.items()]
+                )
+                connection.executemany(
+                    "INSERT OR IGNORE INTO checkpoints VALUES (?, ?, ?)",
+                    [(stats.key, timestamp_ns, offset) for timestamp_ns, offset in new_checkpoints]
+                )
+            stats.saved_checkpoints = len(stats.checkpoints)
+
+    def refresh(self, files: Iterable[Path], open_files: Set[Path] = frozenset(),
+                progress: Optional[Callable[[int, int], None]] = None,
+                cancelled: Optional[Callable[[], bool]] = None) -> int:
+        # brings the catalog in line with files (every log segment there is): scans the ones it hasn't seen or
+        # that changed since, follows compression renames and forgets segments whose files are gone. open_files
+        # are being written by someone who keeps their rows current already. Returns how many files were scanned
+        with self.lock:
+            known = {
+                row[0]: row[1:] for row in
+                self._connect().execute("SELECT key, file_name, file_size, file_mtime, complete FROM segments")
+            }
+
+        present = {segment_key(path): Path(path) for path in files}
+        to_scan = []
+        renamed = []
+        for key, path in present.items():
+            if path in open_files:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # compressed or removed just now, the next refresh sees what took its place
+            row = known.get(key)
+            if row is None:
+                to_scan.append(path)
+            elif row[0] == path.name:
+                if (row[1], row[2]) != (stat.st_size, stat.st_mtime):
+                    to_scan.append(path)
+            elif row[3]:
+                # a closed segment that got compressed since, same messages in a new file
+                renamed.append((path.name, stat.st_size, stat.st_mtime, key))
+            else:
+                to_scan.append(path)
+        gone = [(key,) for key in known if key not in present]
+
+        if renamed or gone:
+            with self.lock:
+                connection = self._connect()
+                with connection:
+                    connection.executemany(
+                        "UPDATE segments SET file_name = ?, file_size = ?, file_mtime = ? WHERE key = ?", renamed
+                    )
+                    for table in ("segments", "entry_counts", "checkpoints"):
+                        connection.executemany(f"DELETE FROM {table} WHERE key = ?", gone)
+
+        # scanning happens outside the lock, the writer keeps saving meanwhile
+        scanned = 0
+        for path in to_scan:
+            if cancelled and cancelled():
+                break
+            try:
+                self.save(scan_segment(path))
+            except Exception as e:
+                print(f"Error cataloging log file {path.name}: {e}")
+            scanned += 1
+            if progress:
+                progress(scanned, len(to_scan))
+        return scanned
+
+    def sessions(self) -> List[SessionInfo]:
+        # every cataloged segment, newest first
+        with self.lock:
+            connection = self._connect()
+            rows = connection.execute(
+                "SELECT key, file_name, format, started_ns, first_ns, last_ns, message_count, error_count, "
+                "file_size, previous, complete FROM segments ORDER BY started_ns DESC, key DESC"
+            ).fetchall()
+            counts = connection.execute("SELECT key, entry_name, count FROM entry_counts").fetchall()
+
+        sessions = [SessionInfo(self.directory, *row) for row in rows]
+        by_key = {info.key: info for info in sessions}
+        for key, entry_name, count in counts:
+            info = by_key.get(key)
+            if info:
+                info.entry_counts[entry_name] = count
+        return sessions
+
+    def checkpoints(self, key: str) -> List[Tuple[int, int]]:
+        # (timestamp ns, byte offset) of a segment, oldest first
+        with self.lock:
+            return self._connect().execute(
+                "SELECT timestamp_ns, offset FROM checkpoints WHERE key = ? ORDER BY timestamp_ns", (key,)
+            ).fetchall()
+
+    def close(self):
+        with self.lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+
+
+def main(argv: List[str]) -> int:
+    from LogFileManager import LOG_FILE_PATTERNS
+    from SegmentLock import segment_in_use
+
+    directory = Path(argv[1]) if len(argv) > 1 else Path(LOG_FILE_DIRECTORY)
+    if not directory.is_dir():
+        print(f"usage: python -m SessionCatalog [logs directory]  ({directory} is not a directory)")
+        return 1
+
+    files = [path for pattern in LOG_FILE_PATTERNS for path in directory.glob(pattern)]
+    catalog = SessionCatalog(directory / SESSION_CATALOG_FILE)
+    # segments a running logger holds keep their own rows current
+    scanned = catalog.refresh(files, {path for path in files if segment_in_use(path)})
+    sessions = catalog.sessions()
+    print(f"{len(sessions)} segments in {directory} ({scanned} scanned)")
+    for info in sessions:
+        print(f"{info.started.strftime('%Y-%m-%d %H:%M:%S')} {info.duration_s:>8.0f} s {info.message_count:>10} msgs "
+              f"{info.error_count:>6} errors {info.file_size / 1e6:>8.1f} MB  {info.path.name}")
+    catalog.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,211 @@
+# SQLite session format (.grtdb): one WAL-mode database per segment (tables session and messages) for SQL over a match.
+# Query with:  python -m SqliteLogBackend session.grtdb [--from S] [--to S] [--entry error] [--text brownout] [--sql Q]
+
+import argparse
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from models.LogMessage import LogMessage, to_ns, from_ns
+
+SQLITE_LOG_SUFFIX = ".grtdb"
+FORMAT_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS session (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    timestamp_ns INTEGER NOT NULL,
+    entry_name TEXT NOT NULL,
+    message TEXT NOT NULL,
+    repeat_count INTEGER,
+    first_ns INTEGER,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_time ON messages (timestamp_ns);
+CREATE INDEX IF NOT EXISTS messages_entry_time ON messages (entry_name, timestamp_ns);
+"""
+
+INSERT = ("INSERT INTO messages (timestamp_ns, entry_name, message, repeat_count, first_ns, source) "
+          "VALUES (?, ?, ?, ?, ?, ?)")
+
+NO_REPEAT = (None, None)
+
+
+class SqliteLogWriter:
+
+    def __init__(self, path: Path, started: datetime):
+        import sqlite3  # here, not at the top: text and binary logging never load it
+
+        self.path = Path(path)
+        # made on the GUI thread, written from the LogWriter thread. isolation_level=None: transactions are ours
+        self.connection = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.executemany("INSERT OR REPLACE INTO session VALUES (?, ?)", [
+            ("format_version", str(FORMAT_VERSION)),
+            ("started_ns", str(to_ns(started))),
+        ])
+        self.in_transaction = False
+        self.next_id = 1  # row id the next message gets, one writer so they're handed out in order
+
+    def write_messages(self, messages: List[LogMessage]):
+        if not self.in_transaction:
+            self.connection.execute("BEGIN")
+            self.in_transaction = True
+        self.connection.executemany(INSERT, [
+            (log_msg.timestamp_ns, log_msg.entry_name, log_msg.message, *(log_msg.repeat or NO_REPEAT), log_msg.source)
+            for log_msg in messages
+        ])
+        self.next_id += len(messages)
+
+    def flush(self):
+        # commits everything written since the last flush as one transaction
+        if self.in_transaction:
+            self.connection.execute("COMMIT")
+            self.in_transaction = False
+
+    def sync(self):
+        # commits don't fsync (synchronous=NORMAL), a checkpoint syncs the WAL and copies it into the database
+        self.flush()
+        self.connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def size(self) -> int:
+        size = 0
+        for path in (self.path, self.path.with_name(self.path.name + "-wal")):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.connection.close()  # the last connection out checkpoints and removes the WAL
+
+
+class SqliteLogReader:
+
+    def __init__(self, path: Path):
+        import sqlite3
+
+        self.path = Path(path)
+        if not self.path.is_file():
+            raise FileNotFoundError(f"No such log file: {self.path}")
+        # not mode=ro: a read-only connection can't clean up the -wal/-shm files it makes on a closed segment.
+        # A segment that's still being written can be read at the same time (WAL)
+        self.connection = sqlite3.connect(str(self.path))
+        try:
+            session = dict(self.connection.execute("SELECT key, value FROM session"))
+        except sqlite3.DatabaseError:
+            self.connection.close()
+            raise ValueError(f"{self.path} is not a SQLite robot log")
+        self.version = int(session.get("format_version", 0))
+        if self.version not in READABLE_VERSIONS:
+            self.connection.close()
+            raise ValueError(f"Unsupported SQLite log version {session.get('format_version')}")
+        self.start_ns = int(session["started_ns"])
+        self.source_column = "source" if self.version >= 2 else "NULL"
+
+    @property
+    def started(self) -> datetime:
+        return from_ns(self.start_ns)
+
+    def time_range(self) -> Tuple[Optional[int], Optional[int]]:
+        # (first, last) message time, both off the time index
+        return self.connection.execute("SELECT min(timestamp_ns), max(timestamp_ns) FROM messages").fetchone()
+
+    @staticmethod
+    def _where(start_ns: Optional[int], end_ns: Optional[int], entries: Optional[Iterable[str]],
+               text: Optional[str]) -> Tuple[str, list]:
+        clauses = []
+        params = []
+        if start_ns is not None:
+            clauses.append("timestamp_ns >= ?")
+            params.append(start_ns)
+        if end_ns is not None:
+            clauses.append("timestamp_ns < ?")
+            params.append(end_ns)
+        if entries is not None:
+            entries = list(entries)
+            clauses.append(f"entry_name IN ({', '.join('?' * len(entries))})")
+            params.extend(entries)
+        if text:
+            clauses.append("instr(lower(message), ?) > 0")  # case-insensitive contains, like the search box
+            params.append(text.lower())
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None,
+              entries: Optional[Iterable[str]] = None, text: Optional[str] = None,
+              limit: Optional[int] = None) -> Iterator[LogMessage]:
+        # messages in [start_ns, end_ns) on any of entries whose text contains text, oldest first
+        where, params = self._where(start_ns, end_ns, entries, text)
+        sql = (f"SELECT timestamp_ns, entry_name, message, repeat_count, first_ns, {self.source_column} "
+               f"FROM messages{where} ORDER BY timestamp_ns, id")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for timestamp_ns, entry_name, message, repeat_count, first_ns, source in self.connection.execute(sql, params):
+            yield LogMessage(entry_name, message, timestamp_ns=timestamp_ns,
+                             repeat=(repeat_count, first_ns) if repeat_count else None, source=source)
+
+    def count(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None,
+              entries: Optional[Iterable[str]] = None, text: Optional[str] = None) -> int:
+        # how many records query() would return (a coalesced record counts once)
+        where, params = self._where(start_ns, end_ns, entries, text)
+        return self.connection.execute(f"SELECT count(*) FROM messages{where}", params).fetchone()[0]
+
+    def entry_counts(self) -> Dict[str, int]:
+        # messages per entry, coalesced records counted as the messages they stand for
+        return dict(self.connection.execute(
+            "SELECT entry_name, sum(coalesce(repeat_count, 1)) FROM messages GROUP BY entry_name"
+        ))
+
+    def __iter__(self) -> Iterator[LogMessage]:
+        return self.query()
+
+    def iter_from_time(self, timestamp_ns: int) -> Iterator[LogMessage]:
+        return self.query(start_ns=timestamp_ns)
+
+    def close(self):
+        self.connection.close()
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m SqliteLogBackend", description="Query a .grtdb robot log")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--from", dest="start", type=float, help="seconds into the session")
+    parser.add_argument("--to", dest="end", type=float, help="seconds into the session")
+    parser.add_argument("--entry", nargs="*", help="only these entries")
+    parser.add_argument("--text", help="message contains this (case-insensitive)")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--sql", help="run this SQL instead and print the rows")
+    args = parser.parse_args(argv[1:])
+
+    reader = SqliteLogReader(args.path)
+    try:
+        if args.sql:
+            for row in reader.connection.execute(args.sql):
+                print("\t".join(str(value) for value in row))
+            return 0
+
+        first_ns = reader.time_range()[0] or reader.start_ns
+        start_ns = first_ns + int(args.start * 1e9) if args.start is not None else None
+        end_ns = first_ns + int(args.end * 1e9) if args.end is not None else None
+        for log_msg in reader.query(start_ns, end_ns, args.entry, args.text, args.limit):
+            print(log_msg)
+    finally:
+        reader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,37 @@
+# Runs an export on its own thread so a big export doesn't freeze the window. The messages are a snapshot
+# taken on the GUI thread before start(), the store keeps changing while this runs.
+
+from pathlib import Path
+from typing import List, Optional
+from PySide6.QtCore import QThread, Signal
+from models.LogMessage import LogMessage
+from LogExporter import export_messages, ExportCancelled
+
+
+class ExportWorker(QThread):
+    progress = Signal(int, int)  # written, total
+    export_finished = Signal(bool, str)  # success, message for the status bar
+
+    def __init__(self, filepath: Path, messages: List[LogMessage], export_format: Optional[str] = None, parent=None):
+        super().__init__(parent)
+        self.filepath = Path(filepath)
+        self.messages = messages
+        self.export_format = export_format
+
+    def run(self):
+        try:
+            count = export_messages(
+                self.filepath,
+                self.messages,
+                self.export_format,
+                progress=self.progress.emit,
+                cancelled=self.isInterruptionRequested
+            )
+            self.export_finished.emit(True, f"Exported {count} messages to: {self.filepath}")
+        except ExportCancelled:
+            self.export_finished.emit(False, "Export cancelled")
+        except Exception as e:
+            print(f"Error exporting log file: {e}")
+            self.export_finished.emit(False, "Export failed :(")
+        finally:
+            self.messages = None  # let go of the snapshot
@@ -1,64 +1,101 @@
-# Custom widget for displaying color coded log messages with time stamps AND formats + renders messages in the UI
+# Custom widget for displaying color coded log messages with time stamps. It's a virtualized view over the
+# MessageStore, so only the rows on screen are ever formatted and painted no matter how many messages are kept.
+# A single column QTableView is used instead of QListView because QListView lays out every row on reset/insert,
+# while fixed-height table rows cost the same at 1k or 1M messages.
 
-from PySide6.QtWidgets import QTextEdit
-from PySide6.QtGui import QTextCursor, QTextCharFormat, QFont, QColor
-from models.LogMessage import LogMessage
-from config import (ENTRY_COLORS, DEFAULT_ENTRY_COLOR, TIMESTAMP_COLOR, LOG_DISPLAY_FONT_FAMILY,LOG_DISPLAY_FONT_SIZE)
+from typing import Callable, Optional
+from PySide6.QtWidgets import QTableView, QHeaderView, QAbstractItemView, QApplication
+from PySide6.QtGui import QFont, QFontMetrics, QKeySequence
+from PySide6.QtCore import QTimer, Signal
+from models.MessageStore import MessageStore
+from models.SearchIndex import SearchIndex, SearchQuery
+from models.LogFilter import LogFilter
+from UI.LogListModel import LogListModel, wall_clock_ns
+from UI.LogItemDelegate import LogItemDelegate
+from config import (LOG_DISPLAY_FONT_FAMILY, LOG_DISPLAY_FONT_SIZE)
 
 
-class LogDisplay(QTextEdit):
-    
-    def __init__(self):
+class LogDisplay(QTableView):
+    search_progress = Signal(int, bool)  # matches so far, whether the search has finished scanning
+
+    def __init__(self, store: MessageStore, search_index: Optional[SearchIndex] = None):
         super().__init__()
-        
+
         # Configure widget properties
-        self.setReadOnly(True)
-        self.setFont(QFont(LOG_DISPLAY_FONT_FAMILY, LOG_DISPLAY_FONT_SIZE))
-        self.setLineWrapMode(QTextEdit.WidgetWidth)
+        font = QFont(LOG_DISPLAY_FONT_FAMILY, LOG_DISPLAY_FONT_SIZE)
+        self.setFont(font)
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
         
-        self.document().setMaximumBlockCount(10000)  # Limit for optimal performance
-    
-    def append_message(self, log_msg: LogMessage, auto_scroll: bool = True): #append the formatted msg to display
-        cursor = self.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        
-        self._insert_timestamp(cursor, log_msg)
-        self._insert_entry_name(cursor, log_msg)
-        self._insert_message_content(cursor, log_msg)
-        
-        cursor.insertText("\n")
+        self.horizontalHeader().hide()
+        self.horizontalHeader().setStretchLastSection(True)
         
+        # row heights are fixed so they never have to be measured, keeps 1M+ rows cheap
+        self.verticalHeader().hide()
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(QFontMetrics(font).height() + 2)
+
+        self.log_model = LogListModel(store, search_index)
+        self.setModel(self.log_model)
+        self.setItemDelegate(LogItemDelegate(font, self))
+
+        # searches stream their results in, one step of the history per event loop pass
+        self.search_timer = QTimer(self)
+        self.search_timer.setInterval(0)
+        self.search_timer.timeout.connect(self._continue_search)
+
+    def sync(self, auto_scroll: bool = True):
+        # picks up whatever was appended to / evicted from the store since the last call
+        self.log_model.sync()
+
         if auto_scroll:
-            self.setTextCursor(cursor)
-            self.ensureCursorVisible()
-    
-    def _insert_timestamp(self, cursor: QTextCursor, log_msg: LogMessage):
-        fmt = QTextCharFormat()
-        fmt.setForeground(TIMESTAMP_COLOR)
-        
-        timestamp_text = f"[{log_msg.formatted_time()}] "
-        cursor.insertText(timestamp_text, fmt)
-    
-    def _insert_entry_name(self, cursor: QTextCursor, log_msg: LogMessage):
-        fmt = QTextCharFormat()
-
-        color = ENTRY_COLORS.get(log_msg.entry_name, DEFAULT_ENTRY_COLOR)
-        fmt.setForeground(color)
-        fmt.setFontWeight(QFont.Bold)
-        
-        entry_text = f"[{log_msg.entry_name}] "
-        cursor.insertText(entry_text, fmt)
-    
-    def _insert_message_content(self, cursor: QTextCursor, log_msg: LogMessage):
-        fmt = QTextCharFormat()
-        fmt.setForeground(QColor(255, 255, 255))
-        
-        cursor.insertText(log_msg.message, fmt)
-    
+            self.scrollToBottom()
+
+    def set_store(self, store: MessageStore, search_index: Optional[SearchIndex] = None):
+        self.log_model.set_store(store, search_index)
+        self._search_started()
+
+    def set_filter(self, log_filter: LogFilter):
+        self.log_model.set_filter(log_filter)
+        self._search_started()
+
+    def set_clock(self, clock: Optional[Callable[[], int]]):
+        # what time window filters count back from (ns), None = the wall clock
+        self.log_model.clock = clock or wall_clock_ns
+
+    def set_search(self, query: Optional[SearchQuery]):
+        self.log_model.set_search(query)
+        self._search_started()
+
+    def _search_started(self):
+        if self.log_model.scanning:
+            self.search_timer.start()
+        else:
+            self.search_timer.stop()
+        if self.log_model.search is not None:
+            self.search_progress.emit(self.log_model.rowCount(), not self.log_model.scanning)
+
+    def _continue_search(self):
+        done = self.log_model.scan_step()
+        self.log_model.sync()
+        if done:
+            self.search_timer.stop()
+        self.search_progress.emit(self.log_model.rowCount(), done)
+
+    def keyPressEvent(self, event):
+        # Ctrl+C copies the selected rows as plain log lines
+        if event.matches(QKeySequence.Copy):
+            rows = sorted(index.row() for index in self.selectedIndexes())
+            lines = [str(msg) for msg in (self.log_model.message_at(row) for row in rows) if msg is not None]
+            QApplication.clipboard().setText("\n".join(lines))
+            return
+        super().keyPressEvent(event)
+
     def scroll_to_bottom(self):
-        scrollbar = self.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
-    
+        self.scrollToBottom()
+
     def scroll_to_top(self):
-        scrollbar = self.verticalScrollBar()
-        scrollbar.setValue(scrollbar.minimum())
\ No newline at end of file
+        self.scrollToTop()
@@ -0,0 +1,82 @@
+# Paints one log row as [timestamp] [entry] message using the same colors the old rich-text display used.
+# Only rows the view asks for get painted, so cost depends on the window height and not the history size.
+# Parts of the message matching the active search get a highlight behind them.
+# A coalesced record (log_msg.repeat) gets an " (xN)" count right after its message.
+
+from PySide6.QtWidgets import QStyledItemDelegate, QStyle, QStyleOptionViewItem
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter
+from PySide6.QtCore import QModelIndex, QRect, QSize, Qt
+from UI.LogListModel import MESSAGE_ROLE
+from config import ENTRY_COLORS, DEFAULT_ENTRY_COLOR, TIMESTAMP_COLOR
+
+ENTRY_QCOLORS = {entry_name: QColor(*rgb) for entry_name, rgb in ENTRY_COLORS.items()}
+DEFAULT_ENTRY_QCOLOR = QColor(*DEFAULT_ENTRY_COLOR)
+TIMESTAMP_QCOLOR = QColor(*TIMESTAMP_COLOR)
+MESSAGE_COLOR = QColor(255, 255, 255)
+SEARCH_HIGHLIGHT_COLOR = QColor(255, 200, 0, 110)
+REPEAT_COUNT_COLOR = QColor(255, 170, 60)
+ROW_PADDING = 2
+
+
+class LogItemDelegate(QStyledItemDelegate):
+
+    def __init__(self, font: QFont, parent=None):
+        super().__init__(parent)
+
+        self.font = QFont(font)
+        self.bold_font = QFont(font)
+        self.bold_font.setBold(True)
+        self.metrics = QFontMetrics(self.font)
+        self.bold_metrics = QFontMetrics(self.bold_font)
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        # every row is one line high, which lets the view use uniform item sizes
+        return QSize(option.rect.width(), self.metrics.height() + ROW_PADDING)
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        log_msg = index.data(MESSAGE_ROLE)
+        if log_msg is None:
+            return
+
+        painter.save()
+
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+
+        rect = option.rect.adjusted(ROW_PADDING, 0, 0, 0)
+        flags = Qt.AlignLeft | Qt.AlignVCenter | Qt.TextSingleLine
+
+        timestamp_text = f"[{log_msg.formatted_time()}] "
+        painter.setFont(self.font)
+        painter.setPen(TIMESTAMP_QCOLOR)
+        painter.drawText(rect, flags, timestamp_text)
+        rect.setLeft(rect.left() + self.metrics.horizontalAdvance(timestamp_text))
+
+        entry_text = f"[{log_msg.qualified_name}] "
+        painter.setFont(self.bold_font)
+        painter.setPen(ENTRY_QCOLORS.get(log_msg.entry_name, DEFAULT_ENTRY_QCOLOR))
+        painter.drawText(rect, flags, entry_text)
+        rect.setLeft(rect.left() + self.bold_metrics.horizontalAdvance(entry_text))
+
+        repeat_text = f" (x{log_msg.repeat[0]})" if log_msg.repeat else ""
+        repeat_width = self.bold_metrics.horizontalAdvance(repeat_text) if repeat_text else 0
+        message_text = self.metrics.elidedText(log_msg.message, Qt.ElideRight, rect.width() - repeat_width)
+        search = index.model().search
+        if search is not None:
+            for match in search.highlight_pattern.finditer(message_text):
+                if match.end() > match.start():
+                    left = rect.left() + self.metrics.horizontalAdvance(message_text[:match.start()])
+                    width = self.metrics.horizontalAdvance(match.group())
+                    painter.fillRect(QRect(left, rect.top(), width, rect.height()), SEARCH_HIGHLIGHT_COLOR)
+
+        painter.setFont(self.font)
+        painter.setPen(MESSAGE_COLOR)
+        painter.drawText(rect, flags, message_text)
+
+        if repeat_text:
+            rect.setLeft(rect.left() + self.metrics.horizontalAdvance(message_text))
+            painter.setFont(self.bold_font)
+            painter.setPen(REPEAT_COUNT_COLOR)
+            painter.drawText(rect, flags, repeat_text)
+
+        painter.restore()
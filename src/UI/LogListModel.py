@@ -0,0 +1,203 @@
+# Qt list model over the MessageStore. Rows are never copied out of the store: a row is just a seq number,
+# either every retained message, the store's own SeqList for a single-entry filter, or a SeqList of the
+# messages that pass the current LogFilter and search.
+
+from datetime import datetime
+from typing import Callable, Optional
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+from models.LogMessage import LogMessage, to_ns
+from models.LogFilter import LogFilter
+from models.MessageStore import MessageStore, SeqList
+from models.SearchIndex import SearchIndex, SearchQuery
+from config import SEARCH_SCAN_CHUNK, SEARCH_INDEX_CHUNK
+
+MESSAGE_ROLE = Qt.UserRole + 1  # returns the LogMessage itself, used by the delegate
+
+
+def wall_clock_ns() -> int:
+    return to_ns(datetime.now())
+
+
+class _StoreRows:
+    # Row source for the unfiltered view, looks like a SeqList over every message in the store
+
+    def __init__(self, store: MessageStore):
+        self.store = store
+
+    @property
+    def removed(self) -> int:
+        return self.store.first_seq
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, index: int) -> int:
+        return self.store.first_seq + index
+
+
+class LogListModel(QAbstractListModel):
+
+    def __init__(self, store: MessageStore, search_index: Optional[SearchIndex] = None):
+        super().__init__()
+
+        self.store = store
+        self.search_index = search_index
+        self.log_filter = LogFilter()
+        self.search: Optional[SearchQuery] = None
+        self.rows = _StoreRows(store)
+
+        # "now" for time window filters, the wall clock unless something (a replay) says otherwise
+        self.clock: Callable[[], int] = wall_clock_ns
+
+        # searches and filters go through the history in steps (scan_step) instead of all at once
+        self.scanning = False
+
+        # what the view currently knows about, only changed inside sync() / _rebuild_rows()
+        self._row_count = len(store)
+        self._removed = self.rows.removed
+        self._scanned_seq = store.next_seq  # next store seq the search hasn't looked at yet
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._row_count
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        log_msg = self.message_at(index.row())
+        if log_msg is None:
+            return None
+
+        if role == MESSAGE_ROLE:
+            return log_msg
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return str(log_msg)
+        return None
+
+    def message_at(self, row: int) -> Optional[LogMessage]:
+        # rows evicted from the store but not yet removed from the view (before the next sync) return None
+        offset = row - (self.rows.removed - self._removed)
+        if offset < 0 or offset >= len(self.rows):
+            return None
+        seq = self.rows[offset]
+        if seq < self.store.first_seq:
+            return None
+        return self.store.get_seq(seq)
+
+    def set_store(self, store: MessageStore, search_index: Optional[SearchIndex] = None):
+        # shows another store (a replay's, or the live one again) under the same filter and search
+        self.store = store
+        self.search_index = search_index
+        self._rebuild_rows()
+
+    def set_filter(self, log_filter: LogFilter):
+        self.log_filter = log_filter
+        self._rebuild_rows()
+
+    def set_search(self, query: Optional[SearchQuery]):
+        self.search = query
+        self._rebuild_rows()
+
+    def _rebuild_rows(self):
+        # Swaps the row source, the view only re-lays out the rows that are visible
+        self.beginResetModel()
+
+        store = self.store
+        self.scanning = False
+        if self.log_filter.is_empty and self.search is None:
+            self.rows = _StoreRows(store)
+        elif self.log_filter.single_entry and self.search is None:
+            # the store keeps this list up to date itself, switching filters costs nothing
+            self.rows = store.entry_seqs(self.log_filter.single_entry)
+        else:
+            # results stream in step by step, the first step runs right away
+            self.rows = SeqList()
+            self._scanned_seq = store.first_seq
+            self.scanning = True
+            self.scan_step()
+
+        self._row_count = len(self.rows)
+        self._removed = self.rows.removed
+
+        self.endResetModel()
+
+    def _owns_rows(self) -> bool:
+        # False when the rows are the store's own (all messages or one entry's SeqList)
+        return self.search is not None or not (self.log_filter.is_empty or self.log_filter.single_entry)
+
+    def _uses_index(self) -> bool:
+        return self.search is not None and self.search_index is not None and self.search_index.can_answer(self.search)
+
+    def _step_size(self) -> Optional[int]:
+        if self.search is None:
+            # entry sets and time windows are cheap column work, only text needs to look at messages
+            return SEARCH_SCAN_CHUNK if self.log_filter.text else None
+        # a pure index lookup is much cheaper per message than a regex match, so it takes bigger steps
+        if self._uses_index() and not self.search.needs_verify:
+            return SEARCH_INDEX_CHUNK
+        return SEARCH_SCAN_CHUNK
+
+    def scan_step(self) -> bool:
+        # goes through the next part of the history, True once it has caught up with the store
+        if self.scanning:
+            self._scan_new_messages(self._step_size())
+            self.scanning = self._scanned_seq < self.store.next_seq
+        return not self.scanning
+
+    def _scan_new_messages(self, max_messages: Optional[int] = None):
+        if not self._owns_rows():
+            return  # nothing to scan for, the row source follows the store by itself
+
+        store = self.store
+        now_ns = self.clock()
+        from_seq = max(self._scanned_seq, store.first_seq)
+        to_seq = store.next_seq if max_messages is None else min(store.next_seq, from_seq + max_messages)
+
+        if self.search is None:
+            self.rows.extend(self.log_filter.select(store, now_ns, from_seq, to_seq))
+        elif self._uses_index():
+            seqs = self.search_index.lookup(self.search, from_seq, to_seq)
+            self.rows.extend(self.log_filter.keep(store, seqs, now_ns))
+        elif self.log_filter.is_empty:
+            matches = self.search.matches
+            for offset, log_msg in enumerate(store.messages_between(from_seq, to_seq)):
+                if matches(log_msg):
+                    self.rows.append(from_seq + offset)
+        else:
+            # only what passes the filter needs the regex
+            matches = self.search.matches
+            for seq in self.log_filter.select(store, now_ns, from_seq, to_seq):
+                if matches(store.get_seq(seq)):
+                    self.rows.append(seq)
+
+        self._scanned_seq = to_seq
+        self._trim_rows(now_ns)
+
+    def _trim_rows(self, now_ns: int):
+        # evicted messages, and messages that have aged out of the time window, come off the front
+        if self._owns_rows():
+            self.rows.trim_before(self.log_filter.first_seq(self.store, now_ns))
+
+    def sync(self):
+        # Bring the view up to date with the store: evicted rows come off the top, new rows go on the bottom
+        if self.scanning:
+            self._trim_rows(self.clock())  # scan_step picks up the new messages when it gets there
+        else:
+            self._scan_new_messages()
+
+        removed = self.rows.removed - self._removed
+        drop = min(removed, self._row_count)
+        if drop > 0:
+            self.beginRemoveRows(QModelIndex(), 0, drop - 1)
+            self._row_count -= drop
+            self._removed += drop
+            self.endRemoveRows()
+
+        # rows that were appended and evicted again between two syncs were never shown
+        self._removed = self.rows.removed
+
+        added = len(self.rows) - self._row_count
+        if added > 0:
+            self.beginInsertRows(QModelIndex(), self._row_count, self._row_count + added - 1)
+            self._row_count += added
+            self.endInsertRows()
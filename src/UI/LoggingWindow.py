@@ -1,11 +1,32 @@
-from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QComboBox, QCheckBox, QFileDialog)
+import re
+import time
+from datetime import datetime
+from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QComboBox, QCheckBox, QFileDialog, QSlider,
+                               QLineEdit, QProgressDialog)
 from PySide6.QtCore import QTimer, Qt
 
-from models.LogMessage import LogMessage
+from models.LogMessage import LogMessage, to_ns
+from models.LatencyStats import metrics_path_for
+from models.FrameStats import FrameStats
+from models.MessageStore import MessageStore
+from models.SearchIndex import SearchIndex, SearchQuery
+from models.LogFilter import LogFilter
 from NetworkTablesListener import NetworkTablesListener
+from ReplaySource import ReplaySource
 from LogFileManager import LogFileManager
+from LogExporter import dialog_filters, format_for_filter, format_for_path
 from UI.LogDisplay import LogDisplay
-from config import (PLACEHOLDER_MODE, UPDATE_INTERVAL_MS, DEFAULT_AUTO_SCROLL,DEFAULT_FILTER, ENTRY_TYPES, MAX_MESSAGES_IN_MEMORY)
+from UI.ExportWorker import ExportWorker
+from UI.ReplayOpenWorker import ReplayOpenWorker
+from config import (PLACEHOLDER_MODE, UPDATE_INTERVAL_MS, DEFAULT_AUTO_SCROLL,DEFAULT_FILTER, ENTRY_TYPES, MAX_MESSAGES_IN_MEMORY,
+                    REPLAY_WRITES_TO_DISK, REPLAY_SPEEDS, SEARCH_INDEX_ENABLED, SEARCH_DEBOUNCE_MS,
+                    METRICS_DUMP_INTERVAL_S, INGEST_SOURCES, RENDER_FPS)
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
 
 
 class LoggingWindow(QMainWindow):
@@ -19,27 +40,59 @@ class LoggingWindow(QMainWindow):
         
         # Initialize variables & components
         self.paused = False
-        self.log_messages = []
-        self.current_filter = DEFAULT_FILTER
+        self.live_store = MessageStore(MAX_MESSAGES_IN_MEMORY)
+        self.live_index = SearchIndex(self.live_store) if SEARCH_INDEX_ENABLED else None
+        self.message_store = self.live_store  # what the view shows: the live store, or a replay's while one runs
+        self.search_index = self.live_index
+        self.current_filter = LogFilter.parse(DEFAULT_FILTER, ENTRY_TYPES)
         self.auto_scroll = DEFAULT_AUTO_SCROLL
      
         self.file_manager = LogFileManager()
         self.nt_listener = NetworkTablesListener()
+        self.latency = self.nt_listener.core.latency  # live messages only, replayed ones have nothing to measure
+        self.replay = None  # ReplaySource while a saved session is being replayed, live ingestion carries on
+        self.replay_opener = None  # ReplayOpenWorker of the replay asked for last, while its file is being opened
+        self.replay_file_manager = None  # the replay's own log file with REPLAY_WRITES_TO_DISK
+        self.live_connected = None  # last live connection status, shown again when a replay stops
+        self.source_status = {}  # source id -> connected, with several ingest sources (INGEST_SOURCES)
+        self.export_worker = None  # ExportWorker of the running (or last) export
+        self.export_progress = None
         self.log_display = None  
+        self.render_pending = False  # the store has changed since the last frame
+        self.undisplayed = []  # live messages stored since the last frame, their display latency is taken on it
+        self.frame_stats = FrameStats()
+        self.last_frame_count = 0
     
         self.setup_ui()
         
         # Connect signals
         self.nt_listener.message_received.connect(self.handle_new_message)
+        self.nt_listener.messages_received.connect(self.handle_new_messages)
         self.nt_listener.connection_status_changed.connect(self.handle_connection_status)
+        self.nt_listener.source_status_changed.connect(self.handle_source_status)
         
         self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.nt_listener.check_for_messages)
+        self.update_timer.timeout.connect(self.poll_messages)
         self.update_timer.start(UPDATE_INTERVAL_MS)
+        QTimer.singleShot(0, self.poll_messages)  # first poll as soon as the window is up, not a tick later
+        
+        # the view catches up with the store once per frame, whatever the message rate
+        self.render_timer = QTimer()
+        self.render_timer.setTimerType(Qt.PreciseTimer)
+        self.render_timer.timeout.connect(self.render_frame)
+        self.render_timer.start(int(1000 / RENDER_FPS))
         
         # Create initial log file
         log_file = self.file_manager.create_new_log_file()
         self.update_status(f"Logging to: {log_file.name}")
+        
+        # latency percentiles in the status bar once a second, the metrics JSON every METRICS_DUMP_INTERVAL_S
+        self.metrics_path = metrics_path_for(log_file)
+        self.session_started = datetime.now()
+        self.last_metrics_dump = time.monotonic()
+        self.metrics_timer = QTimer()
+        self.metrics_timer.timeout.connect(self.update_latency)
+        self.metrics_timer.start(1000)
     
     def setup_ui(self):
 
@@ -49,7 +102,12 @@ class LoggingWindow(QMainWindow):
         
         main_layout.addLayout(self.create_control_bar()) 
         
-        self.log_display = LogDisplay() 
+        self.replay_bar = self.create_replay_bar()
+        self.replay_bar.hide()
+        main_layout.addWidget(self.replay_bar)
+        
+        self.log_display = LogDisplay(self.message_store, self.search_index)
+        self.log_display.search_progress.connect(self.handle_search_progress)
         main_layout.addWidget(self.log_display)
         
         main_layout.addLayout(self.create_status_bar())
@@ -57,26 +115,55 @@ class LoggingWindow(QMainWindow):
     def create_control_bar(self) -> QHBoxLayout:
         control_layout = QHBoxLayout()
         
-        # Mode indicator between passing live data and using placeholder values 
-        mode_text = "PLACEHOLDER MODE" if PLACEHOLDER_MODE else "LIVE MODE"
-        mode_color = "#ff6b6b" if PLACEHOLDER_MODE else "#51cf66"
-        
-        self.mode_label = QLabel(mode_text)
-        self.mode_label.setStyleSheet(
-            f"font-weight: 600; font-size: 32px; padding: 8px; color: {mode_color}; text-align: center;"
-        )
+        # Mode indicator between passing live data, using placeholder values and replaying a saved session
+        self.mode_label = QLabel()
+        self.update_mode_label()
         control_layout.addWidget(self.mode_label)
         
         control_layout.addStretch()
         
-        # Filter dropdown
+        # Filter dropdown, also takes typed expressions like "entry:error,system text:CAN|brownout last:30s"
         control_layout.addWidget(QLabel("Filter:"))
         self.filter_combo = QComboBox()
+        self.filter_combo.setEditable(True)
+        self.filter_combo.setInsertPolicy(QComboBox.NoInsert)
+        self.filter_combo.setMinimumContentsLength(24)
         self.filter_combo.addItems(["All"] + ENTRY_TYPES)
         self.filter_combo.setCurrentText(DEFAULT_FILTER)
-        self.filter_combo.currentTextChanged.connect(self.apply_filter)
+        self.filter_combo.setToolTip(
+            "Pick an entry or type a filter:\n"
+            "  entry:error,system   any of these entries\n"
+            "  text:CAN|brownout    message contains any of these\n"
+            "  last:30s             only the last 30 s (also m, h)\n"
+            "  source:robotA        only these sources (INGEST_SOURCES)"
+        )
+        self.filter_combo.currentTextChanged.connect(lambda: self.filter_timer.start())
+        self.filter_combo.lineEdit().returnPressed.connect(self.apply_filter)
         control_layout.addWidget(self.filter_combo)
         
+        self.filter_timer = QTimer()
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        
+        # Search box, searches as you type (after a short pause)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.setToolTip("Messages containing all of these words, or a regular expression if Regex is checked")
+        self.search_edit.textChanged.connect(lambda: self.search_timer.start())
+        self.search_edit.returnPressed.connect(self.apply_search)
+        control_layout.addWidget(self.search_edit)
+        
+        self.search_timer = QTimer()
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.apply_search)
+        
+        self.regex_check = QCheckBox("Regex")
+        self.regex_check.stateChanged.connect(self.apply_search)
+        control_layout.addWidget(self.regex_check)
+        
         # Auto-scroll checkbox
         self.autoscroll_check = QCheckBox("Auto-scroll")
         self.autoscroll_check.setChecked(DEFAULT_AUTO_SCROLL)
@@ -100,48 +187,343 @@ class LoggingWindow(QMainWindow):
         export_btn.clicked.connect(self.export_logs)
         export_btn.setToolTip("Export logs to chosen location")
         control_layout.addWidget(export_btn)
+        
+        # Replay button
+        replay_btn = QPushButton("REPLAY")
+        replay_btn.clicked.connect(self.open_replay)
+        replay_btn.setToolTip("Replay a saved log file")
+        control_layout.addWidget(replay_btn)
+        
+        # Sessions button
+        sessions_btn = QPushButton("SESSIONS")
+        sessions_btn.clicked.connect(self.open_sessions)
+        sessions_btn.setToolTip("Browse saved sessions (start, length, message and error counts)")
+        control_layout.addWidget(sessions_btn)
         return control_layout
     
+    def create_replay_bar(self) -> QWidget:
+        replay_bar = QWidget()
+        replay_layout = QHBoxLayout(replay_bar)
+        replay_layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.replay_pause_btn = QPushButton("⏸")
+        self.replay_pause_btn.clicked.connect(self.toggle_replay_pause)
+        self.replay_pause_btn.setToolTip("Pause / resume the replay")
+        replay_layout.addWidget(self.replay_pause_btn)
+        
+        # slider is in 1/1000ths of the session, seeking happens on release
+        self.replay_slider = QSlider(Qt.Horizontal)
+        self.replay_slider.setRange(0, 1000)
+        self.replay_slider.sliderReleased.connect(self.seek_replay)
+        replay_layout.addWidget(self.replay_slider)
+        
+        self.replay_position_label = QLabel("00:00 / 00:00")
+        replay_layout.addWidget(self.replay_position_label)
+        
+        replay_layout.addWidget(QLabel("Speed:"))
+        self.replay_speed_combo = QComboBox()
+        for speed in REPLAY_SPEEDS:
+            self.replay_speed_combo.addItem(f"{speed:g}x" if speed else "Max", speed)
+        self.replay_speed_combo.setCurrentIndex(REPLAY_SPEEDS.index(1))
+        self.replay_speed_combo.currentIndexChanged.connect(self.change_replay_speed)
+        replay_layout.addWidget(self.replay_speed_combo)
+        
+        stop_btn = QPushButton("STOP REPLAY")
+        stop_btn.clicked.connect(self.stop_replay)
+        stop_btn.setToolTip("Go back to live logging")
+        replay_layout.addWidget(stop_btn)
+        return replay_bar
+    
+    def update_mode_label(self):
+        if self.replay:
+            mode_text, mode_color = "REPLAY MODE", "#fcc419"
+        elif INGEST_SOURCES:
+            mode_text, mode_color = f"{len(INGEST_SOURCES)} SOURCES", "#51cf66"
+        elif PLACEHOLDER_MODE:
+            mode_text, mode_color = "PLACEHOLDER MODE", "#ff6b6b"
+        else:
+            mode_text, mode_color = "LIVE MODE", "#51cf66"
+        
+        self.mode_label.setText(mode_text)
+        self.mode_label.setStyleSheet(
+            f"font-weight: 600; font-size: 32px; padding: 8px; color: {mode_color}; text-align: center;"
+        )
+    
     def create_status_bar(self) -> QHBoxLayout:
         status_layout = QHBoxLayout()
         
         self.status_label = QLabel("Ready")
         self.message_count_label = QLabel("Messages: 0")
         self.connection_label = QLabel("Connecting...")
+        self.ingest_label = QLabel("")
+        self.latency_label = QLabel("")
         
         status_layout.addWidget(self.status_label)
         status_layout.addStretch()
+        status_layout.addWidget(self.latency_label)
+        status_layout.addWidget(self.ingest_label)
         status_layout.addWidget(self.connection_label)
         status_layout.addWidget(self.message_count_label)
         
         return status_layout
     
+    def poll_messages(self):
+        if self.replay:
+            self.replay.check_for_messages()
+            self.update_replay_position()
+        # the robot doesn't stop while a replay is on screen, live messages keep going to the live store and the log
+        self.nt_listener.check_for_messages()
+        
+        parts = []
+        if self.replay:
+            parts.append(f"Replayed: {self.replay.replayed_count} | Live: {len(self.live_store)}")
+        if not PLACEHOLDER_MODE or INGEST_SOURCES:
+            stats = self.nt_listener.get_ingest_stats()
+            parts.append(f"Queue: {stats['queue_depth']} (max {stats['max_queue_depth']}) | Dropped: {stats['dropped']}")
+            if stats.get("merge", {}).get("late"):
+                parts.append(f"Late: {stats['merge']['late']}")
+        
+        writer_stats = self.file_manager.get_writer_stats()
+        if writer_stats.get("pending") or writer_stats.get("dropped"):
+            parts.append(f"Disk queue: {writer_stats['pending']} | Disk dropped: {writer_stats['dropped']}")
+        
+        self.ingest_label.setText(" | ".join(parts))
+    
+    def handle_new_messages(self, messages: list):
+        # Batch path: one store update and one file write per tick, the view catches up on the next frame
+        if self.paused or not messages:
+            return
+        
+        self.live_store.extend(messages) #oldest messages are evicted once MAX_MESSAGES_IN_MEMORY is reached
+        self.file_manager.write_messages(messages)
+        
+        if not self.replay:
+            self.undisplayed.extend(messages)
+            self.render_pending = True
+    
     def handle_new_message(self, log_msg: LogMessage):
     
         if self.paused:
             return
         
-        self.log_messages.append(log_msg) #add to msg list
+        self.live_store.append(log_msg) #ring buffer evicts the oldest msg if the memory limit is reached
+        self.file_manager.write_message(log_msg)
+        
+        if not self.replay:
+            self.undisplayed.append(log_msg)
+            self.render_pending = True
     
-        if MAX_MESSAGES_IN_MEMORY > 0 and len(self.log_messages) > MAX_MESSAGES_IN_MEMORY:
-            self.log_messages.pop(0)
-        #enforces the memory limit if configured
+    def handle_replay_messages(self, messages: list):
+        # the replay's own store (and log file), the live ones never see replayed messages
+        if self.paused or not messages or not self.replay:
+            return
         
-        self.file_manager.write_message(log_msg)
+        self.message_store.extend(messages)
+        if self.replay_file_manager:
+            self.replay_file_manager.write_messages(messages)
+        self.render_pending = True
+    
+    def handle_replay_message(self, log_msg: LogMessage):
+        self.handle_replay_messages([log_msg])
+    
+    def render_frame(self):
+        # one view sync, one scroll and one counter update per frame, however many messages came in since the last
+        now_ns = to_ns(datetime.now())
+        self.frame_stats.tick(now_ns)
+        
+        # time windows move even when nothing new arrives
+        if not self.render_pending and not self.current_filter.last_seconds:
+            return
+        
+        started = time.perf_counter_ns()
+        self.render_pending = False
+        self.log_display.sync(self.auto_scroll) #view applies the current filter itself
+        self.message_count_label.setText(f"Messages: {len(self.message_store)}")
         
-        #update display with filter!
-        if self.current_filter == "All" or self.current_filter == log_msg.entry_name:
-            self.log_display.append_message(log_msg, self.auto_scroll)
+        if self.undisplayed:
+            self.latency.record_displayed(self.undisplayed, to_ns(datetime.now()))
+            self.undisplayed = []
         
-        self.message_count_label.setText(f"Messages: {len(self.log_messages)}")
+        self.frame_stats.record_frame(time.perf_counter_ns() - started, now_ns)
     
-    def handle_connection_status(self, connected: bool):
+    def update_latency(self):
+        now_ns = to_ns(datetime.now())
+        
+        # robot -> screen when the robot's time is known (live NT), otherwise just receive -> screen
+        stage = "total" if self.latency.has_data("total") else "display"
+        if self.latency.has_data(stage):
+            self.latency_label.setText(f"Latency p50/p95/p99: {self.latency.format_window(stage, now_ns)}")
+            tooltip = [f"{stage} latency, last {self.latency.window_s:g}s"]
+            for entry_name in sorted(self.latency.histograms[stage]):
+                tooltip.append(f"{entry_name}: {self.latency.format_window(stage, now_ns, entry_name)}")
+            if self.latency.has_data("network"):
+                tooltip.append(f"network (robot -> receive): {self.latency.format_window('network', now_ns)}")
+            self.latency_label.setToolTip("\n".join(tooltip))
+        
+        # frames actually drawn in the last second, next to the cap and what they cost
+        frames = self.frame_stats.frame_count - self.last_frame_count
+        self.last_frame_count = self.frame_stats.frame_count
+        self.message_count_label.setToolTip(
+            f"Rendering: {frames} fps (max {RENDER_FPS}) | Render p50/p95/p99: {self.frame_stats.format_window(now_ns)}"
+            f" | Dropped frames: {self.frame_stats.dropped_count}")
+        
+        if METRICS_DUMP_INTERVAL_S and time.monotonic() - self.last_metrics_dump >= METRICS_DUMP_INTERVAL_S:
+            self.dump_metrics()
+    
+    def dump_metrics(self) -> bool:
+        # everything needed to show the logger kept up: latency percentiles, drop counters and render times
+        self.last_metrics_dump = time.monotonic()
+        now_ns = to_ns(datetime.now())
+        return self.latency.dump(self.metrics_path, now_ns, {
+            "session_started": self.session_started.isoformat(),
+            "dumped": datetime.now().isoformat(),
+            "ingest": self.nt_listener.get_ingest_stats(),
+            "writer": self.file_manager.get_writer_stats(),
+            "messages_in_memory": len(self.live_store),
+            "render": self.frame_stats.to_dict(now_ns),
+        })
     
-        if connected:
+    def handle_connection_status(self, connected: bool):
+        
+        self.live_connected = connected
+        if self.replay:
+            return  # the label follows the replay until it stops
+        if self.source_status:
+            up = sum(self.source_status.values())
+            self.connection_label.setText(f"Connected {up}/{len(self.source_status)}" if up else "Disconnected")
+        elif connected:
             self.connection_label.setText("Connected")
         else:
             self.connection_label.setText("Disconnected")
     
+    def handle_source_status(self, source_id: str, connected: bool):
+        self.source_status[source_id] = connected
+        self.connection_label.setToolTip("\n".join(
+            f"{name}: {'connected' if up else 'disconnected'}" for name, up in sorted(self.source_status.items())
+        ))
+        self.handle_connection_status(any(self.source_status.values()))
+    
+    def handle_replay_status(self, connected: bool):
+        self.connection_label.setText("Replaying" if connected else "Replay finished")
+    
+    def open_replay(self):
+        filename, _ = QFileDialog.getOpenFileName(
+            self,
+            "Replay Log",
+            str(self.file_manager.logs_directory),
+            "Robot Logs (*.txt *.txt.gz *.txt.zst *.grtlog *.grtdb);;All Files (*)"
+        )
+        
+        if filename:
+            self.start_replay(filename)
+    
+    def open_sessions(self):
+        from UI.SessionBrowser import SessionBrowser  # only loaded when it's opened
+        
+        browser = SessionBrowser(self.file_manager, self)
+        browser.replay_requested.connect(self.start_replay)
+        browser.exec()
+    
+    def start_replay(self, filename: str):
+        self.stop_replay()
+        
+        # opening can mean unpacking a compressed segment, so it happens on a worker and the replay starts once
+        # it's done. Asking for another replay meanwhile makes this one's result go unused
+        worker = ReplayOpenWorker(filename, self)
+        worker.opened.connect(lambda cursor, worker=worker: self.begin_replay(worker, cursor))
+        worker.finished.connect(worker.deleteLater)
+        self.replay_opener = worker
+        worker.start()
+        self.update_status(f"Opening replay: {worker.path.name}...")
+    
+    def begin_replay(self, worker: ReplayOpenWorker, cursor):
+        if worker is not self.replay_opener:
+            if cursor:
+                cursor.close()
+            return
+        self.replay_opener = None
+        if cursor is None:
+            self.update_status("Could not open replay :(")
+            return
+        
+        replay = ReplaySource(worker.path, self.replay_speed_combo.currentData(), cursor)
+        replay.message_received.connect(self.handle_replay_message)
+        replay.messages_received.connect(self.handle_replay_messages)
+        replay.connection_status_changed.connect(self.handle_replay_status)
+        self.replay = replay
+        self.log_display.set_clock(lambda: replay.play_ns)  # "last:30s" means the last 30 s of the replay
+        
+        # the replay gets a store (and view) of its own so live and replayed messages never mix, the live history
+        # stays where it is and comes back on stop_replay
+        self.message_store = MessageStore(MAX_MESSAGES_IN_MEMORY)
+        self.search_index = SearchIndex(self.message_store) if SEARCH_INDEX_ENABLED else None
+        self.log_display.set_store(self.message_store, self.search_index)
+        self.undisplayed = []
+        self.message_count_label.setText("Messages: 0")
+        if REPLAY_WRITES_TO_DISK:
+            self.replay_file_manager = LogFileManager(shared_with=self.file_manager)
+            self.replay_file_manager.create_new_log_file()
+        
+        self.replay_pause_btn.setText("⏸")
+        self.replay_slider.setValue(0)
+        self.replay_bar.show()
+        self.update_mode_label()
+        self.handle_replay_status(True)
+        self.update_status(f"Replaying: {replay.path.name}")
+    
+    def stop_replay(self):
+        self.replay_opener = None  # one still being opened is dropped once it's done
+        if not self.replay:
+            return
+        
+        self.replay.disconnect()
+        self.replay = None
+        self.log_display.set_clock(None)
+        if self.replay_file_manager:
+            self.replay_file_manager.close_current_file()
+            self.replay_file_manager = None
+        
+        # back to the live history, including whatever arrived during the replay
+        self.message_store = self.live_store
+        self.search_index = self.live_index
+        self.log_display.set_store(self.live_store, self.live_index)
+        self.render_pending = True
+        
+        self.replay_bar.hide()
+        self.update_mode_label()
+        if self.live_connected is None and not self.source_status:
+            self.connection_label.setText("Connecting...")
+        else:
+            self.handle_connection_status(self.live_connected)
+        self.update_status(f"Logging to: {self.file_manager.get_current_filepath().name}")
+    
+    def toggle_replay_pause(self):
+        if not self.replay:
+            return
+        
+        self.replay.set_paused(not self.replay.paused)
+        self.replay_pause_btn.setText("▶" if self.replay.paused else "⏸")
+    
+    def change_replay_speed(self, index: int):
+        if self.replay:
+            self.replay.set_speed(self.replay_speed_combo.itemData(index))
+    
+    def seek_replay(self):
+        if not self.replay:
+            return
+        
+        # the view restarts from the seek point, otherwise seeking back would duplicate messages
+        self.replay.seek(self.replay.duration * self.replay_slider.value() / 1000)
+        self.message_store.clear()
+        self.log_display.sync(auto_scroll=False)
+        self.message_count_label.setText("Messages: 0")
+    
+    def update_replay_position(self):
+        position, duration = self.replay.position, self.replay.duration
+        self.replay_position_label.setText(f"{format_duration(position)} / {format_duration(duration)}")
+        if not self.replay_slider.isSliderDown() and duration > 0:
+            self.replay_slider.setValue(int(position / duration * 1000))
+    
     def toggle_pause(self):
         self.paused = not self.paused
         
@@ -153,46 +535,101 @@ class LoggingWindow(QMainWindow):
     def toggle_autoscroll(self, state):
         self.auto_scroll = (state == Qt.Checked)
     
-    def apply_filter(self, filter_text: str):
-        self.current_filter = filter_text
+    def apply_filter(self):
+        self.filter_timer.stop()
+        
+        try:
+            log_filter = LogFilter.parse(self.filter_combo.currentText(), ENTRY_TYPES)
+        except ValueError as e:
+            self.filter_combo.setStyleSheet("border: 1px solid #ff6b6b;")
+            self.update_status(f"Invalid filter: {e}")
+            return
+        
+        self.filter_combo.setStyleSheet("")
+        self.current_filter = log_filter
         self.refresh_display()
     
-    def refresh_display(self):
-        self.log_display.clear()
+    def apply_search(self):
+        self.search_timer.stop()
+        text = self.search_edit.text()
+        
+        query = None
+        if text.strip():
+            try:
+                query = SearchQuery(text, regex=self.regex_check.isChecked())
+            except re.error as e:
+                self.search_edit.setStyleSheet("border: 1px solid #ff6b6b;")
+                self.update_status(f"Invalid regex: {e}")
+                return
         
-        for log_msg in self.log_messages:
-            if self.current_filter == "All" or self.current_filter == log_msg.entry_name:
-                self.log_display.append_message(log_msg, auto_scroll=False)
+        self.search_edit.setStyleSheet("")
+        self.log_display.set_search(query)
+        if query is None:
+            self.update_status("Search cleared")
+        
+        if self.auto_scroll:
+            self.log_display.scroll_to_bottom()
+    
+    def handle_search_progress(self, matches: int, done: bool):
+        self.update_status(f"{matches} matches" if done else f"Searching... {matches} matches so far")
+    
+    def refresh_display(self):
+        # swaps the view's row index, nothing is re-rendered besides the visible rows
+        self.log_display.set_filter(self.current_filter)
         
         # Scroll to bottom after refresh if auto-scroll is enabled
         if self.auto_scroll:
             self.log_display.scroll_to_bottom()
     
     def clear_logs(self):
-        self.log_display.clear()
-        self.log_messages.clear()
+        self.message_store.clear()
+        self.undisplayed = []
+        self.render_pending = False
+        self.log_display.sync(auto_scroll=False)
         self.message_count_label.setText("Messages: 0")
         self.update_status("Logs cleared")
     
     def export_logs(self):
-        filename, _ = QFileDialog.getSaveFileName(
+        if self.export_worker and self.export_worker.isRunning():
+            self.update_status("An export is already running")
+            return
+        
+        filename, selected_filter = QFileDialog.getSaveFileName(
             self,
             "Export Logs",
             "",
-            "Text Files (*.txt);;CSV Files (*.csv);;All Files (*)"
+            ";;".join(dialog_filters() + ["All Files (*)"])
         )
         
-        if filename:
-            success = self.file_manager.export_filtered(
-                filename,
-                self.log_messages,
-                self.current_filter
-            )
-            
-            if success:
-                self.update_status(f"Exported to: {filename}")
-            else:
-                self.update_status("Export failed :(")
+        if not filename:
+            return
+        
+        # snapshot on this thread, the worker only ever sees this list
+        messages = self.current_filter.select_messages(self.message_store, self.log_display.log_model.clock())
+        export_format = format_for_filter(selected_filter) or format_for_path(filename)
+        
+        self.export_progress = QProgressDialog("Exporting logs...", "Cancel", 0, max(len(messages), 1), self)
+        self.export_progress.setWindowTitle("Export Logs")
+        self.export_progress.setWindowModality(Qt.WindowModal)
+        self.export_progress.setMinimumDuration(500)  # quick exports never show the dialog
+        
+        self.export_worker = ExportWorker(filename, messages, export_format, self)
+        self.export_worker.progress.connect(self.handle_export_progress)
+        self.export_worker.export_finished.connect(self.handle_export_finished)
+        self.export_progress.canceled.connect(self.export_worker.requestInterruption)
+        self.export_worker.start()
+        self.update_status(f"Exporting {len(messages)} messages...")
+    
+    def handle_export_progress(self, written: int, total: int):
+        if self.export_progress:
+            self.export_progress.setValue(written)
+    
+    def handle_export_finished(self, success: bool, message: str):
+        if self.export_progress:
+            self.export_progress.canceled.disconnect()
+            self.export_progress.close()
+            self.export_progress = None
+        self.update_status(message)
     
     def update_status(self, message: str):
         self.status_label.setText(message) #update status w message
@@ -200,6 +637,21 @@ class LoggingWindow(QMainWindow):
     def closeEvent(self, event):
         # Stop timer
         self.update_timer.stop()
+        self.render_timer.stop()
+        self.metrics_timer.stop()
+        self.dump_metrics()
+        
+        # a half-written export is thrown away rather than holding up the close
+        if self.export_worker and self.export_worker.isRunning():
+            self.export_worker.requestInterruption()
+            self.export_worker.wait()
+        
+        self.stop_replay()
+        for worker in self.findChildren(ReplayOpenWorker):
+            worker.wait()
+        
+        # repeat runs still being counted go to the file before it's closed
+        self.file_manager.write_messages(self.nt_listener.core.flush())
         
         # Disconnect from NetworkTables
         self.nt_listener.disconnect()
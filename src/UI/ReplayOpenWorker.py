@@ -0,0 +1,22 @@
+# Opens a replay's cursor on its own thread. A gzip or zstd text segment is unpacked to a temp file first
+# (see LogCursors.py), which for a long session would freeze the window.
+
+from pathlib import Path
+from PySide6.QtCore import QThread, Signal
+from LogCursors import open_log_cursor
+
+
+class ReplayOpenWorker(QThread):
+    opened = Signal(object)  # the cursor, or None if the file couldn't be opened
+
+    def __init__(self, path: Path, parent=None):
+        super().__init__(parent)
+        self.path = Path(path)
+
+    def run(self):
+        try:
+            cursor = open_log_cursor(self.path)
+        except Exception as e:
+            print(f"Error opening replay: {e}")
+            cursor = None
+        self.opened.emit(cursor)
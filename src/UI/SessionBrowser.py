@@ -0,0 +1,160 @@
+# Browser over the session catalog (SessionCatalog.py): every saved segment with when it started, how long it ran,
+# its message and error counts and size, newest first. The rows come straight out of the catalog so it opens
+# instantly no matter how many logs there are, segments the catalog hasn't seen yet are scanned on a worker
+# thread and show up once that's done. Double click (or Replay) replays the selected segment.
+
+from PySide6.QtCore import QThread, Signal, Qt
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QCheckBox, QLabel, QPushButton,
+                               QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView)
+from UI.LoggingWindow import format_duration
+
+
+class CatalogRefreshWorker(QThread):
+    progress = Signal(int, int)  # scanned, to scan
+    refresh_finished = Signal(int)  # how many files were scanned
+
+    def __init__(self, file_manager, parent=None):
+        super().__init__(parent)
+        self.file_manager = file_manager
+
+    def run(self):
+        scanned = 0
+        try:
+            scanned = self.file_manager.refresh_catalog(self.progress.emit, self.isInterruptionRequested)
+        except Exception as e:
+            print(f"Error refreshing session catalog: {e}")
+        self.refresh_finished.emit(scanned)
+
+
+class _SortItem(QTableWidgetItem):
+    # shows formatted text but sorts by the raw value kept under UserRole
+
+    def __init__(self, text: str, value):
+        super().__init__(text)
+        self.setData(Qt.UserRole, value)
+
+    def __lt__(self, other):
+        return self.data(Qt.UserRole) < other.data(Qt.UserRole)
+
+
+class SessionBrowser(QDialog):
+    replay_requested = Signal(str)  # path of the segment to replay
+
+    COLUMNS = ["Started", "Length", "Messages", "Errors", "Size", "File"]
+
+    def __init__(self, file_manager, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Sessions")
+        self.resize(900, 500)
+        self.file_manager = file_manager
+        self.sessions = []
+
+        layout = QVBoxLayout(self)
+
+        filter_layout = QHBoxLayout()
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by date or file name, e.g. 2025-03-15")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self.apply_filter)
+        filter_layout.addWidget(self.filter_edit)
+        self.errors_check = QCheckBox("Only with errors")
+        self.errors_check.stateChanged.connect(self.apply_filter)
+        filter_layout.addWidget(self.errors_check)
+        layout.addLayout(filter_layout)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.cellDoubleClicked.connect(lambda row, column: self.replay_selected())
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        button_layout.addWidget(self.status_label)
+        button_layout.addStretch()
+        replay_btn = QPushButton("Replay")
+        replay_btn.clicked.connect(self.replay_selected)
+        button_layout.addWidget(replay_btn)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.reject)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+        self.load_sessions()
+
+        # whatever the catalog doesn't know about yet gets scanned in the background
+        self.worker = CatalogRefreshWorker(file_manager, self)
+        self.worker.progress.connect(self.show_progress)
+        self.worker.refresh_finished.connect(self.handle_refresh_finished)
+        self.worker.start()
+
+    def load_sessions(self):
+        try:
+            self.sessions = self.file_manager.get_sessions(refresh=False)
+        except Exception as e:
+            print(f"Error reading session catalog: {e}")
+            self.sessions = []
+
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(self.sessions))
+        for row, info in enumerate(self.sessions):
+            lines = [f"{entry_name}: {count:,}" for entry_name, count in sorted(info.entry_counts.items())]
+            if info.previous:
+                lines.append(f"continues {info.previous}")
+            if not info.complete:
+                lines.append("still being written")
+            tooltip = "\n".join(lines)
+            items = [
+                _SortItem(info.started.strftime("%Y-%m-%d %H:%M:%S"), info.started_ns),
+                _SortItem(format_duration(info.duration_s), info.duration_s),
+                _SortItem(f"{info.message_count:,}", info.message_count),
+                _SortItem(f"{info.error_count:,}", info.error_count),
+                _SortItem(f"{info.file_size / 1e6:.1f} MB", info.file_size),
+                _SortItem(info.path.name, info.path.name),
+            ]
+            for column, item in enumerate(items):
+                if column in (1, 2, 3, 4):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                item.setToolTip(tooltip)
+                self.table.setItem(row, column, item)
+            items[0].setData(Qt.UserRole + 1, str(info.path))
+        self.table.setSortingEnabled(True)
+        self.apply_filter()
+
+    def apply_filter(self):
+        text = self.filter_edit.text().strip().lower()
+        errors_only = self.errors_check.isChecked()
+        shown = 0
+        for row in range(self.table.rowCount()):
+            started = self.table.item(row, 0).text()
+            name = self.table.item(row, 5).text()
+            hidden = bool(text) and text not in started.lower() and text not in name.lower()
+            hidden = hidden or (errors_only and self.table.item(row, 3).data(Qt.UserRole) == 0)
+            self.table.setRowHidden(row, hidden)
+            shown += not hidden
+        self.status_label.setText(f"{shown} of {self.table.rowCount()} segments")
+
+    def show_progress(self, scanned: int, total: int):
+        self.status_label.setText(f"Cataloging new log files... {scanned}/{total}")
+
+    def handle_refresh_finished(self, scanned: int):
+        # reloaded even if nothing was scanned, compressed segments have new file names
+        self.load_sessions()
+
+    def replay_selected(self):
+        rows = self.table.selectionModel().selectedRows()
+        if not rows:
+            return
+        self.replay_requested.emit(self.table.item(rows[0].row(), 0).data(Qt.UserRole + 1))
+        self.accept()
+
+    def done(self, result: int):
+        # closing mid-scan: stop after the file being scanned, what's done so far stays in the catalog
+        self.worker.requestInterruption()
+        self.worker.wait()
+        super().done(result)
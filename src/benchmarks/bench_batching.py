@@ -0,0 +1,86 @@
+# Throughput benchmark for the per-message (message_received) and batched (messages_received) paths.
+# Feeds one second of simulated traffic at each rate through a real LoggingWindow and reports how long it took,
+# with one render frame per tick (the frame timer is stopped so every run draws the same number of frames).
+#
+# Run from src/:  python -m benchmarks.bench_batching
+
+import os
+import sys
+import random
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtWidgets import QApplication
+
+from models.LogMessage import LogMessage
+from config import ENTRY_TYPES, UPDATE_INTERVAL_MS
+
+RATES = [1000, 10000, 50000]  # msgs/s
+TICKS_PER_SECOND = max(1, 1000 // UPDATE_INTERVAL_MS)
+
+
+class BenchSource(QObject):
+    message_received = Signal(LogMessage)
+    messages_received = Signal(list)
+
+
+def make_messages(count: int) -> list:
+    rng = random.Random(count)
+    return [
+        LogMessage(rng.choice(ENTRY_TYPES), f"Benchmark message {i} value={rng.random():.4f}")
+        for i in range(count)
+    ]
+
+
+def run_once(app, rate: int, batched: bool) -> float:
+    from UI.LoggingWindow import LoggingWindow
+    
+    window = LoggingWindow()
+    window.update_timer.stop()  # only the benchmark source feeds the window
+    window.render_timer.stop()
+    
+    source = BenchSource()
+    source.message_received.connect(window.handle_new_message)
+    source.messages_received.connect(window.handle_new_messages)
+    
+    messages = make_messages(rate)
+    per_tick = rate // TICKS_PER_SECOND
+    
+    start = time.perf_counter()
+    for tick in range(TICKS_PER_SECOND):
+        chunk = messages[tick * per_tick:(tick + 1) * per_tick]
+        if batched:
+            source.messages_received.emit(chunk)
+        else:
+            for log_msg in chunk:
+                source.message_received.emit(log_msg)
+        window.render_frame()
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+    
+    window.close()
+    return elapsed
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    
+    # keep benchmark log files out of the real robot_logs directory
+    workdir = tempfile.mkdtemp(prefix="grt_bench_")
+    os.chdir(workdir)
+    
+    print(f"{'rate (msg/s)':>12} {'path':>12} {'time for 1s (s)':>16} {'msg/s capacity':>16}")
+    for rate in RATES:
+        for batched in (False, True):
+            elapsed = run_once(app, rate, batched)
+            path = "batched" if batched else "per-message"
+            print(f"{rate:>12} {path:>12} {elapsed:>16.3f} {rate / elapsed:>16.0f}")
+    
+    print(f"\nlog files written to {workdir}")
+
+
+if __name__ == "__main__":
+    main()
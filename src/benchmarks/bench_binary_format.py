@@ -0,0 +1,135 @@
+# Size and seek benchmark for the binary session format vs the text log.
+# Writes a simulated 2 hour practice session both ways, then seeks to a few points in it. Fails (exit 1) if the
+# binary log doesn't read back exactly what was written, also with its index cut short like after a crash.
+#
+# Run from src/:  python -m benchmarks.bench_binary_format [--rate 150]
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from models.LogMessage import LogMessage, to_ns
+from placeholder_data import PlaceholderDataGenerator
+from config import ENTRY_TYPES
+
+SESSION_SECONDS = 2 * 60 * 60
+FLUSH_EVERY_S = 0.25  # matches LOG_FLUSH_INTERVAL_MS, one binary chunk per flush
+SEEK_POINTS = [("T+2:15", 135), ("T+1:00:00", 3600), ("T+1:59:00", 7140)]
+
+
+def make_session(rate: int) -> list:
+    generator = PlaceholderDataGenerator(seed=1234)
+    start = datetime(2026, 3, 14, 9, 0, 0)
+    count = rate * SESSION_SECONDS
+    messages = []
+    for i in range(count):
+        entry_name = generator.random.choice(ENTRY_TYPES)
+        text = generator.get_random_message(entry_name).split("] ", 1)[1]
+        messages.append(LogMessage(entry_name, text, start + timedelta(seconds=i / rate)))
+    return messages
+
+
+def write_session(manager, messages: list, rate: int) -> float:
+    per_flush = max(1, int(rate * FLUSH_EVERY_S))
+    t = time.perf_counter()
+    manager.create_new_log_file()
+    for start in range(0, len(messages), per_flush):
+        manager.write_messages(messages[start:start + per_flush])
+    path = manager.get_current_filepath()
+    manager.close_current_file()
+    return path, time.perf_counter() - t
+
+
+def text_seek(path, target: datetime) -> float:
+    # what finding a time in a text log costs today: parse lines until we get there
+    t = time.perf_counter()
+    target_str = target.strftime("%H:%M:%S.%f")[:-3]
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("[") and line[1:13] >= target_str:
+                break
+    return time.perf_counter() - t
+
+
+def check_round_trip(reader, messages: list, label: str) -> bool:
+    expected = [(m.entry_name, m.message, m.timestamp_ns) for m in messages]
+    read = [(m.entry_name, m.message, m.timestamp_ns) for m in reader]
+    if read == expected:
+        print(f"round trip {label}: ok, {len(read)} messages")
+        return True
+    mismatch = next((i for i, (got, want) in enumerate(zip(read, expected)) if got != want),
+                    min(len(read), len(expected)))
+    print(f"round trip {label}: FAILED, read {len(read)} of {len(expected)}, first difference at message {mismatch}")
+    return False
+
+
+def truncated_index_copy(binary_path, index_path):
+    # the same log with only the first half of its index, as if we crashed after the data flush but before the index
+    copy = binary_path.with_name("truncated" + binary_path.suffix)
+    shutil.copyfile(binary_path, copy)
+    data = index_path.read_bytes()
+    copy.with_suffix(index_path.suffix).write_bytes(data[:len(data) // 2])
+    return copy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=int, default=150, help="messages per second")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="grt_bench_"))
+    import LogFileManager as log_file_manager
+    from LogFileManager import LogFileManager
+    from BinaryLogFormat import BinaryLogReader, index_path_for
+    log_file_manager.LOG_COMPRESSION = None  # the text scan below reads the closed text log as it was written
+
+    print(f"building {SESSION_SECONDS // 3600}h session at {args.rate} msgs/s...")
+    messages = make_session(args.rate)
+    start = messages[0].timestamp
+
+    text_path, text_write = write_session(LogFileManager(background_writer=False, log_format="text"), messages, args.rate)
+    time.sleep(1)  # log file names have 1 s resolution
+    binary_path, binary_write = write_session(LogFileManager(background_writer=False, log_format="binary"), messages, args.rate)
+
+    text_size = os.path.getsize(text_path)
+    binary_size = os.path.getsize(binary_path) + os.path.getsize(binary_path.with_suffix(".grtidx"))
+    print(f"{len(messages)} messages")
+    print(f"text:   {text_size / 1e6:8.1f} MB  write {text_write:6.2f}s")
+    print(f"binary: {binary_size / 1e6:8.1f} MB  write {binary_write:6.2f}s  ({text_size / binary_size:.1f}x smaller)")
+
+    t = time.perf_counter()
+    reader = BinaryLogReader(binary_path)
+    open_ms = (time.perf_counter() - t) * 1000
+    print(f"\nopen binary + load index: {open_ms:.2f} ms")
+
+    for label, seconds in SEEK_POINTS:
+        target = start + timedelta(seconds=seconds)
+        t = time.perf_counter()
+        first = next(reader.iter_from_time(to_ns(target)))
+        binary_ms = (time.perf_counter() - t) * 1000
+        text_ms = text_seek(text_path, target) * 1000
+        print(f"seek {label:>10}: binary {binary_ms:7.2f} ms  text scan {text_ms:8.1f} ms  -> {first}")
+
+    print()
+    ok = check_round_trip(reader, messages, "full index")
+    reader.close()
+
+    reader = BinaryLogReader(truncated_index_copy(binary_path, index_path_for(binary_path)))
+    ok = check_round_trip(reader, messages, "truncated index") and ok
+    for label, seconds in SEEK_POINTS:
+        target_ns = to_ns(start + timedelta(seconds=seconds))
+        expected = next(m for m in messages if m.timestamp_ns >= target_ns)
+        first = next(reader.iter_from_time(target_ns), None)
+        if first is None or (first.timestamp_ns, first.message) != (expected.timestamp_ns, expected.message):
+            print(f"seek {label} with truncated index: FAILED, got {first} instead of {expected}")
+            ok = False
+    reader.close()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
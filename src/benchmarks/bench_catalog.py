@@ -0,0 +1,128 @@
+# Session catalog: how long listing a season's worth of logs takes once the catalog knows them (what opening
+# the session browser costs) against scanning them the first time, for text (gzipped like closed segments) and
+# binary logs, plus what keeping the open segment's row current costs the writer. Fails (exit 1) unless every
+# segment on disk, in whatever format, ends up with exactly one row holding all its messages.
+#
+# Run from src/:  python -m benchmarks.bench_catalog [--sessions 300] [--seconds 60] [--rate 1000]
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import LogFileManager
+from BinaryLogFormat import index_path_for, convert_to_text, BINARY_LOG_SUFFIX
+from models.LogMessage import LogMessage
+from placeholder_data import PlaceholderDataGenerator
+from config import ENTRY_TYPES, UPDATE_INTERVAL_MS
+
+
+def generated_messages(rate: float, seconds: float) -> list:
+    generator = PlaceholderDataGenerator(1, {entry_name: rate / len(ENTRY_TYPES) for entry_name in ENTRY_TYPES})
+    start_ns = time.time_ns()
+    generator.messages_until(start_ns)
+    return [LogMessage(entry_name, message_text, timestamp_ns=timestamp_ns)
+            for timestamp_ns, entry_name, message_text in generator.messages_until(start_ns + int(seconds * 1e9))]
+
+
+def write_segment(directory: str, messages: list, rate: float, log_format: str, catalog: bool) -> float:
+    # synchronous writer in tick sized batches, returns the seconds spent writing
+    os.makedirs(directory, exist_ok=True)
+    LogFileManager.LOG_FILE_DIRECTORY = directory
+    LogFileManager.SESSION_CATALOG_ENABLED = catalog
+    manager = LogFileManager.LogFileManager(background_writer=False, log_format=log_format)
+    manager.create_new_log_file()
+    per_tick = max(1, int(rate * UPDATE_INTERVAL_MS / 1000))
+    begin = time.perf_counter()
+    for start in range(0, len(messages), per_tick):
+        manager.write_messages(messages[start:start + per_tick])
+    elapsed = time.perf_counter() - begin
+    manager.close_current_file()
+    manager.compressor.wait_idle()
+    return elapsed
+
+
+def bench(workdir: str, messages: list, args, log_format: str) -> dict:
+    plain = write_segment(os.path.join(workdir, log_format, "plain"), messages, args.rate, log_format, False)
+    directory = os.path.join(workdir, log_format, "season")
+    cataloged = write_segment(directory, messages, args.rate, log_format, True)
+
+    # one real segment copied to a season's worth of sessions, the catalog only knows the original
+    template = LogFileManager.LogFileManager().get_log_files()[0]
+    stem = template.name.split(".")[0]
+    index = index_path_for(template)
+    for number in range(1, args.sessions):
+        copy_stem = f"{stem[:-6]}{number:06d}"
+        shutil.copy(template, template.with_name(template.name.replace(stem, copy_stem)))
+        if log_format == "binary":
+            shutil.copy(index, index.with_name(index.name.replace(stem, copy_stem)))
+
+    manager = LogFileManager.LogFileManager(background_writer=False)
+    begin = time.perf_counter()
+    scanned = manager.refresh_catalog()
+    cold = time.perf_counter() - begin
+
+    manager = LogFileManager.LogFileManager(background_writer=False)  # a new run, nothing cached in memory
+    begin = time.perf_counter()
+    sessions = manager.get_sessions()
+    warm = time.perf_counter() - begin
+
+    return {"scanned": scanned, "cold_s": cold, "warm_ms": warm * 1000, "listed": len(sessions),
+            "write_overhead": (cataloged - plain) / plain * 100, "size": template.stat().st_size}
+
+
+def check_mixed_formats(workdir: str, messages: list, rate: float) -> bool:
+    # text, binary and sqlite segments side by side plus the binary one converted to text (same stem, its own
+    # segment): one row per file on disk, each with every message
+    directory = os.path.join(workdir, "mixed")
+    for log_format in ("text", "binary", "sqlite"):
+        write_segment(directory, messages, rate, log_format, True)
+    for path in list(Path(directory).glob(f"*{BINARY_LOG_SUFFIX}")):
+        convert_to_text(path)
+
+    manager = LogFileManager.LogFileManager(background_writer=False)
+    manager.compressor.wait_idle()  # the converted copy is compressed like any closed text segment
+    on_disk = sorted(path.name for path in manager.get_log_files())
+    rows = {session.path.name: session.message_count for session in manager.get_sessions()}
+    wrong = [name for name, count in rows.items() if count != len(messages)]
+    if sorted(rows) != on_disk or wrong:
+        print(f"mixed formats: FAILED, {len(rows)} rows for {len(on_disk)} segments {on_disk}, "
+              f"wrong message counts: {[(name, rows[name]) for name in wrong]}")
+        return False
+    print(f"mixed formats: ok, {len(rows)} rows for {len(on_disk)} segments")
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=60.0, help="length of each session")
+    parser.add_argument("--rate", type=float, default=1000.0, help="msgs/s in each session")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="grt_bench_")
+    messages = generated_messages(args.rate, args.seconds)
+    print(f"{args.sessions} sessions of {args.seconds:g} s at {args.rate:g} msgs/s ({len(messages)} messages each)")
+    print(f"{'format':>7} {'file MB':>8} {'first scan s':>13} {'per file ms':>12} {'listing ms':>11} "
+          f"{'writer overhead':>16}")
+    ok = True
+    for log_format in ("text", "binary"):
+        r = bench(workdir, messages, args, log_format)
+        print(f"{log_format:>7} {r['size'] / 1e6:>8.2f} {r['cold_s']:>13.2f} "
+              f"{r['cold_s'] / max(r['scanned'], 1) * 1000:>12.1f} {r['warm_ms']:>11.1f} "
+              f"{r['write_overhead']:>15.1f}%")
+        if r["listed"] != args.sessions:
+            print(f"{log_format}: FAILED, listed {r['listed']} of {args.sessions} sessions")
+            ok = False
+
+    print()
+    ok = check_mixed_formats(workdir, messages, args.rate) and ok
+    print(f"\nlog files written to {workdir}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# Filter switch and filtered export cost against history size, for a rare entry (~0.1% of the traffic).
+# "scan" is the old way (compare every message's entry_name), "indexed" goes through the store's per-entry
+# SeqLists. The indexed numbers should stay flat as the history grows, the scan ones grow with it.
+# The scan filter column is only the comparison loop, the indexed one is a whole switch of a LogDisplay
+# including the model reset and repaint.
+#
+# Run from src/:  python -m benchmarks.bench_filter
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from models.LogMessage import LogMessage
+from models.MessageStore import MessageStore
+from models.LogFilter import LogFilter
+from config import ENTRY_TYPES
+
+HISTORY_SIZES = [10000, 100000, 1000000]
+RARE_ENTRY = "error"
+RARE_COUNT = 1000  # the same number of rare messages at every history size
+REPEATS = 5
+
+
+def make_store(size: int) -> MessageStore:
+    rng = random.Random(size)
+    common = [entry for entry in ENTRY_TYPES if entry != RARE_ENTRY]
+    rare_at = set(rng.sample(range(size), RARE_COUNT))
+
+    store = MessageStore(size)
+    store.extend([
+        LogMessage(RARE_ENTRY if i in rare_at else rng.choice(common), f"Benchmark message {i}")
+        for i in range(size)
+    ])
+    return store
+
+
+def best_of(func) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        t = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    os.chdir(tempfile.mkdtemp(prefix="grt_bench_"))
+
+    from UI.LogDisplay import LogDisplay
+    from LogFileManager import LogFileManager
+
+    manager = LogFileManager(background_writer=False)
+    export_path = "export.txt"
+    rare_filter = LogFilter(entries=frozenset([RARE_ENTRY]))
+
+    print(f"{RARE_COUNT} '{RARE_ENTRY}' messages in every history, best of {REPEATS}")
+    print(f"{'history':>9} {'scan filter ms':>15} {'indexed filter ms':>18} {'scan export ms':>15} {'indexed export ms':>18}")
+    for size in HISTORY_SIZES:
+        store = make_store(size)
+        display = LogDisplay(store)
+        display.resize(900, 600)
+        display.show()
+        app.processEvents()
+
+        def switch():
+            display.set_filter(rare_filter)
+            app.processEvents()
+            display.set_filter(LogFilter())
+            app.processEvents()
+
+        scan_filter = best_of(lambda: [msg for msg in store if msg.entry_name == RARE_ENTRY])
+        indexed_filter = best_of(switch) / 2
+        scan_export = best_of(lambda: manager.export_to_file(
+            export_path, [msg for msg in store if msg.entry_name == RARE_ENTRY]))
+        indexed_export = best_of(lambda: manager.export_filtered(export_path, store, rare_filter))
+
+        print(f"{size:>9} {scan_filter * 1000:>15.2f} {indexed_filter * 1000:>18.2f} "
+              f"{scan_export * 1000:>15.2f} {indexed_export * 1000:>18.2f}")
+
+        display.close()
+        display.deleteLater()
+
+
+if __name__ == "__main__":
+    main()
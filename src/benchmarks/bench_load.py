@@ -0,0 +1,219 @@
+# End-to-end load benchmark on the seeded placeholder load generator, no robot or network needed.
+# For each load configuration (per-entry rates and bursts, see LOAD_CONFIGS):
+#   - ingestion: IngestCore polled every UPDATE_INTERVAL_MS in real time, messages per second of CPU spent in poll()
+#   - GUI: a real LoggingWindow fed by the generator, how late a 5 ms probe timer fires on the event loop
+#     (p50/p99/max), how many messages made it in and how many were dropped on the way, and the render tick's
+#     frames per second, dropped frames and render time p99
+#   - file writes: the configuration's messages written with the synchronous writer in tick sized batches,
+#     text and binary, in messages/s and MB/s
+#   - memory: process RSS growth over the GUI run and per stored message (needs psutil or /proc)
+#
+# Run from src/:  python -m benchmarks.bench_load [--seconds 3] [--seed 1] [--configs steady-10k bursty-10k]
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import config
+config.PLACEHOLDER_MODE = True  # before anything imports it
+
+from PySide6.QtCore import QTimer, Qt
+from PySide6.QtWidgets import QApplication
+
+from models.LogMessage import LogMessage
+from placeholder_data import PlaceholderDataGenerator
+from config import ENTRY_TYPES, UPDATE_INTERVAL_MS
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PROBE_INTERVAL_MS = 5
+
+
+def even_rates(total: float) -> dict:
+    return {entry_name: total / len(ENTRY_TYPES) for entry_name in ENTRY_TYPES}
+
+
+LOAD_CONFIGS = {
+    # name: (rates, bursts)
+    "steady-1k": (even_rates(1000), {}),
+    "steady-10k": (even_rates(10000), {}),
+    "steady-100k": (even_rates(100000), {}),
+    # 10k/s with everything at 10x (100k/s) for 0.2 s out of every 2 s
+    "bursty-10k": (even_rates(10000), {entry_name: (2.0, 0.2, 10) for entry_name in ENTRY_TYPES}),
+    # one chatty subsystem on top of a quiet robot
+    "noisy-vision": ({**even_rates(800), "vision": 20000}, {"vision": (1.0, 0.1, 5)}),
+}
+
+
+def use_log_directory(workdir: str, *parts: str):
+    # log file names only go down to the second, so every run gets its own (absolute, compression of the last
+    # run's file can still be going on) log directory
+    import LogFileManager
+    path = os.path.join(workdir, *parts)
+    os.makedirs(path)
+    LogFileManager.LOG_FILE_DIRECTORY = path
+
+
+def rss_bytes():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def percentile(values: list, percent: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def bench_ingestion(generator: PlaceholderDataGenerator, seconds: float) -> dict:
+    from IngestCore import IngestCore
+
+    core = IngestCore()
+    core.placeholder_generator = generator
+    poll_time = 0.0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        t = time.perf_counter()
+        core.poll()
+        poll_time += time.perf_counter() - t
+        time.sleep(UPDATE_INTERVAL_MS / 1000)
+    received = core.received_count
+    return {"received": received, "per_cpu_s": received / poll_time if poll_time else 0.0,
+            "dropped": core.dropped_count}
+
+
+def bench_gui(app: QApplication, generator: PlaceholderDataGenerator, seconds: float) -> dict:
+    from UI.LoggingWindow import LoggingWindow
+
+    window = LoggingWindow()
+    window.nt_listener.core.placeholder_generator = generator
+    window.show()
+    app.processEvents()
+    gc.collect()
+    rss_before = rss_bytes()  # growth from here on is the messages, not the window itself
+
+    lateness = []
+    last = [time.perf_counter()]
+
+    def probe():
+        now = time.perf_counter()
+        lateness.append((now - last[0]) * 1000 - PROBE_INTERVAL_MS)
+        last[0] = now
+
+    timer = QTimer()
+    timer.setTimerType(Qt.PreciseTimer)
+    timer.timeout.connect(probe)
+    timer.start(PROBE_INTERVAL_MS)
+
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.001)
+    timer.stop()
+
+    core = window.nt_listener.core
+    stored = len(window.message_store)
+    render = window.frame_stats.to_dict(time.time_ns())
+    result = {
+        "stored": stored,
+        "dropped": core.dropped_count + window.file_manager.get_writer_stats().get("dropped", 0),
+        "p50_ms": percentile(lateness, 50),
+        "p99_ms": percentile(lateness, 99),
+        "max_ms": max(lateness, default=0.0),
+        "fps": render["frames"] / seconds,
+        "dropped_frames": render["dropped_frames"],
+        "render_p99_ms": render["render_p99_ms"] or 0.0,
+    }
+    rss_after = rss_bytes()
+    if rss_before is not None and rss_after is not None:
+        result["rss_mb"] = (rss_after - rss_before) / 1e6
+        result["bytes_per_msg"] = (rss_after - rss_before) / stored if stored else 0.0
+
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return result
+
+
+def bench_file_writes(messages: list, rate: float, log_format: str) -> dict:
+    from LogFileManager import LogFileManager
+
+    manager = LogFileManager(background_writer=False, log_format=log_format)
+    path = manager.create_new_log_file()
+    per_tick = max(1, int(rate * UPDATE_INTERVAL_MS / 1000))
+    t = time.perf_counter()
+    for start in range(0, len(messages), per_tick):
+        manager.write_messages(messages[start:start + per_tick])
+    elapsed = time.perf_counter() - t
+    size = path.stat().st_size  # every batch is flushed, and a few seconds stays well under LOG_ROTATE_MAX_BYTES
+    manager.close_current_file()
+    return {"msgs_per_s": len(messages) / elapsed, "mb_per_s": size / elapsed / 1e6}
+
+
+def generated_messages(seed: int, rates: dict, bursts: dict, seconds: float) -> list:
+    generator = PlaceholderDataGenerator(seed, rates, bursts)
+    start_ns = time.time_ns()
+    generator.messages_until(start_ns)
+    return [LogMessage(entry_name, message_text, timestamp_ns=timestamp_ns)
+            for timestamp_ns, entry_name, message_text in
+            generator.messages_until(start_ns + int(seconds * 1e9))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--configs", nargs="*", default=list(LOAD_CONFIGS))
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    # keep benchmark log files out of the real robot_logs directory
+    workdir = tempfile.mkdtemp(prefix="grt_bench_")
+    os.chdir(workdir)
+
+    print(f"{args.seconds:g} s per configuration, seed {args.seed}")
+    print(f"{'config':>13} | {'ingest msg/cpu-s':>16} | {'GUI stored':>10} {'dropped':>8} "
+          f"{'late p50/p99/max ms':>20} {'fps':>4} {'drop fr':>7} {'render p99':>10} {'RSS MB':>7} {'B/msg':>6} "
+          f"| {'text msg/s':>10} {'MB/s':>5} "
+          f"| {'binary msg/s':>12} {'MB/s':>5}")
+    for name in args.configs:
+        rates, bursts = LOAD_CONFIGS[name]
+        total_rate = sum(rates.values())
+
+        ingest = bench_ingestion(PlaceholderDataGenerator(args.seed, rates, bursts), args.seconds)
+        use_log_directory(workdir, name, "gui")
+        gui = bench_gui(app, PlaceholderDataGenerator(args.seed, rates, bursts), args.seconds)
+        messages = generated_messages(args.seed, rates, bursts, args.seconds)
+        use_log_directory(workdir, name, "text")
+        text = bench_file_writes(messages, total_rate, "text")
+        use_log_directory(workdir, name, "binary")
+        binary = bench_file_writes(messages, total_rate, "binary")
+        del messages
+
+        late = f"{gui['p50_ms']:.1f}/{gui['p99_ms']:.1f}/{gui['max_ms']:.0f}"
+        rss = f"{gui['rss_mb']:>7.1f} {gui['bytes_per_msg']:>6.0f}" if "rss_mb" in gui else f"{'n/a':>7} {'n/a':>6}"
+        frames = f"{gui['fps']:>4.0f} {gui['dropped_frames']:>7} {gui['render_p99_ms']:>10.1f}"
+        print(f"{name:>13} | {ingest['per_cpu_s']:>16,.0f} | {gui['stored']:>10} {gui['dropped']:>8} {late:>20} "
+              f"{frames} {rss} | {text['msgs_per_s']:>10,.0f} {text['mb_per_s']:>5.1f} "
+              f"| {binary['msgs_per_s']:>12,.0f} {binary['mb_per_s']:>5.1f}")
+
+    print(f"\nlog files written to {workdir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Bytes per retained message at MAX_MESSAGES_IN_MEMORY-sized histories, the old dataclass LogMessage (kept
+# below as LegacyLogMessage) against the current slotted one. Messages are parsed out of log lines the way a
+# replay reads them, so every entry name starts out as its own string like it does off a file.
+# "formatted" is after str() ran on every message once (what writing the log file does) and formatted_time()
+# on the last 100 (what painting the visible rows does).
+#
+# Run from src/:  python -m benchmarks.bench_memory [--messages 1000000]
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from models.LogMessage import LogMessage, to_ns
+from models.MessageStore import MessageStore
+from config import ENTRY_TYPES
+
+
+@dataclass
+class LegacyLogMessage:
+    # LogMessage as it was before __slots__ / int timestamps, for the comparison only
+    entry_name: str
+    message: str
+    timestamp: Optional[datetime] = None
+    server_time: Optional[int] = None
+
+    def __post_init__(self):
+        if self.timestamp is None:
+            self.timestamp = datetime.now()
+
+    @property
+    def timestamp_ns(self) -> int:
+        return to_ns(self.timestamp)  # what the store used to compute on append
+
+    def formatted_time(self):
+        return self.timestamp.strftime("%H:%M:%S.%f")[:-3]
+
+    def __str__(self):
+        time_str = self.timestamp.strftime("%H:%M:%S.%f")[:-3]
+        return f"[{time_str}] [{self.entry_name}] {self.message}"
+
+
+def make_lines(count: int) -> list:
+    rng = random.Random(count)
+    return [f"{rng.choice(ENTRY_TYPES)}\tBenchmark message {i} value={rng.random():.4f}" for i in range(count)]
+
+
+def measure(message_class, lines: list) -> tuple:
+    start = datetime(2026, 1, 1, 12)
+    step = timedelta(microseconds=500)
+    store = MessageStore(len(lines))
+
+    gc.collect()
+    tracemalloc.start()
+    began = time.perf_counter()
+    for i, line in enumerate(lines):
+        entry_name, message = line.split("\t", 1)
+        store.append(message_class(entry_name, message, start + i * step))
+    elapsed = time.perf_counter() - began
+    retained, _ = tracemalloc.get_traced_memory()
+
+    for log_msg in store:
+        str(log_msg)
+    for seq in range(max(store.first_seq, store.next_seq - 100), store.next_seq):
+        store.get_seq(seq).formatted_time()
+    formatted, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return retained / len(lines), formatted / len(lines), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1000000)
+    args = parser.parse_args()
+
+    lines = make_lines(args.messages)
+    print(f"{args.messages} retained messages (bytes per message, tracemalloc)")
+    print(f"{'LogMessage':>12} {'retained':>10} {'formatted':>10} {'build':>9}")
+    results = {}
+    for name, message_class in (("legacy", LegacyLogMessage), ("slotted", LogMessage)):
+        retained, formatted, elapsed = measure(message_class, lines)
+        results[name] = retained
+        print(f"{name:>12} {retained:>10.0f} {formatted:>10.0f} {elapsed:>8.2f}s")
+        gc.collect()
+
+    print(f"saved {results['legacy'] - results['slotted']:.0f} bytes/message "
+          f"({1 - results['slotted'] / results['legacy']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Deterministic load test: replays a generated session through a real LoggingWindow at "Max" speed
+# (REPLAY_MAX_BATCH messages per tick) and reports how fast the store, view and, optionally, the log writer keep up.
+# The session is generated from a fixed seed, so runs are comparable across machines and commits.
+#
+# Run from src/:  python -m benchmarks.bench_replay [--messages 500000] [--format text|binary] [--write-to-disk]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from models.LogMessage import LogMessage
+from config import ENTRY_TYPES, REPLAY_MAX_BATCH
+
+
+def write_session(count: int, log_format: str):
+    from LogFileManager import LogFileManager
+
+    rng = random.Random(8)
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    messages = [
+        LogMessage(rng.choice(ENTRY_TYPES), f"Replay message {i} value={rng.random():.4f}",
+                   start + timedelta(milliseconds=i))
+        for i in range(count)
+    ]
+
+    manager = LogFileManager(background_writer=False, log_format=log_format)
+    path = manager.create_new_log_file()
+    manager.write_messages(messages)
+    manager.close_current_file()
+    manager.compressor.wait_idle()
+
+    # text segments are compressed on close, replay whatever is left on disk
+    return next(manager.logs_directory.glob(path.stem + "*"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500000)
+    parser.add_argument("--format", choices=["text", "binary"], default="text")
+    parser.add_argument("--write-to-disk", action="store_true", help="also write replayed messages to a new log")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    os.chdir(tempfile.mkdtemp(prefix="grt_bench_"))
+
+    from UI.LoggingWindow import LoggingWindow
+    sys.modules[LoggingWindow.__module__].REPLAY_WRITES_TO_DISK = args.write_to_disk
+
+    session = write_session(args.messages, args.format)
+    print(f"{args.messages} messages from {session.name} ({session.stat().st_size / 1e6:.1f} MB), "
+          f"{REPLAY_MAX_BATCH} per tick, write to disk: {args.write_to_disk}")
+
+    window = LoggingWindow()
+    window.update_timer.stop()  # the benchmark drives the ticks itself
+    window.render_timer.stop()
+    window.replay_speed_combo.setCurrentIndex(window.replay_speed_combo.findText("Max"))
+
+    # the file is opened (a compressed one unpacked) on a ReplayOpenWorker, the replay starts when that's done
+    t = time.perf_counter()
+    window.start_replay(str(session))
+    blocked_time = time.perf_counter() - t
+    while window.replay is None:
+        app.processEvents()
+        time.sleep(0.001)
+    open_time = time.perf_counter() - t
+
+    tick_times = []
+    start = time.perf_counter()
+    while not window.replay.finished:
+        t = time.perf_counter()
+        window.poll_messages()
+        window.render_frame()
+        app.processEvents()
+        tick_times.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+
+    t = time.perf_counter()
+    window.close()
+    close_time = time.perf_counter() - t
+
+    tick_times.sort()
+    print(f"open:        {open_time * 1000:.1f} ms ({blocked_time * 1000:.1f} ms on the GUI thread)")
+    print(f"replay:      {elapsed:.2f} s, {args.messages / elapsed:.0f} msg/s over {len(tick_times)} ticks")
+    print(f"tick:        median {tick_times[len(tick_times) // 2] * 1000:.1f} ms, "
+          f"worst {tick_times[-1] * 1000:.1f} ms")
+    print(f"close:       {close_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
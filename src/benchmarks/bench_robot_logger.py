@@ -0,0 +1,134 @@
+# RobotLogger cost on the robot side, run against local ntcore instances (no robot needed):
+#   - log() call cost: direct vs buffered, text timestamps vs fast mode, lazy % formatting, calls below
+#     the level threshold and repeats that coalescing only counts
+#   - flush() cost per robot loop at different messages-per-loop counts (capped by MAX_BUFFERED_PER_FLUSH)
+#   - how many messages logged several to a 20 ms loop reach a subscriber set up like the viewer's, and in how
+#     many NT values
+#
+# Run from src/:  python -m benchmarks.bench_robot_logger
+
+import argparse
+import time
+
+from ntcore import NetworkTableInstance, PubSubOptions, EventFlags
+
+from robot_logger import RobotLogger
+from config import LOGGING_BATCH_TABLE
+
+PORT = 5815
+LOOP_S = 0.02
+
+
+LOG_CASES = [
+    # name, buffered, fast, level threshold, with % args, coalesce
+    ("direct", False, False, 0, False, False),
+    ("direct fast", False, True, 0, False, False),
+    ("direct fast %args", False, True, 0, True, False),
+    ("buffered", True, False, 0, False, False),
+    ("buffered fast", True, True, 0, False, False),
+    ("below threshold %args", False, True, RobotLogger.WARNING, True, False),
+    ("coalesced repeats", False, True, 0, False, True),
+]
+
+
+def time_log_calls(calls: int, buffered: bool, fast: bool, level: int, with_args: bool, coalesce: bool) -> float:
+    RobotLogger.initialize(NetworkTableInstance.create(), buffered=buffered, fast=fast, coalesce=coalesce)
+    RobotLogger.set_level(level)
+    log = RobotLogger.log_drivetrain
+    begin = time.perf_counter()
+    if with_args:
+        for i in range(calls):
+            log("Module %d angle %.2f", 3, 1.5)
+            if buffered and i % 10 == 9:
+                RobotLogger.flush()  # ~10 messages per loop
+    else:
+        for i in range(calls):
+            log("Brake mode engaged")
+            if buffered and i % 10 == 9:
+                RobotLogger.flush()
+    elapsed = time.perf_counter() - begin
+    RobotLogger.set_level(0)
+    RobotLogger.initialize(coalesce=False)
+    return elapsed / calls * 1e6
+
+
+def time_flush(per_loop: int, loops: int) -> float:
+    RobotLogger.initialize(NetworkTableInstance.create(), buffered=True, fast=False)
+    total = 0.0
+    for _ in range(loops):
+        for i in range(per_loop):
+            RobotLogger.log_drivetrain(f"Message {i}")
+        begin = time.perf_counter()
+        RobotLogger.flush()
+        total += time.perf_counter() - begin
+    return total / loops * 1e6
+
+
+def delivery(server: NetworkTableInstance, client: NetworkTableInstance, buffered: bool, loops: int, per_loop: int) -> tuple:
+    # subscribes and listens like the viewer does (sendAll + keepDuplicates), returns (messages, NT values) received
+    table = client.getTable("Logging")
+    options = PubSubOptions(sendAll=True, keepDuplicates=True)
+    single = table.getStringTopic("drivetrain").subscribe("", options)
+    batch = table.getSubTable(LOGGING_BATCH_TABLE).getStringArrayTopic("drivetrain").subscribe([], options)
+
+    RobotLogger.initialize(server, buffered=buffered, fast=False)
+    RobotLogger.log_drivetrain("warmup")
+    RobotLogger.flush()
+    time.sleep(0.5)
+
+    received = []
+    handles = [
+        client.addListener(single, EventFlags.kValueAll, lambda event: received.append(1)),
+        client.addListener(batch, EventFlags.kValueAll,
+                           lambda event: received.append(len(event.data.value.getStringArray()))),
+    ]
+    time.sleep(0.2)
+    received.clear()  # the warmup value again, listeners get the current value when they're added
+
+    for loop in range(loops):
+        for i in range(per_loop):
+            RobotLogger.log_drivetrain(f"loop {loop} message {i}")
+        RobotLogger.flush()
+        time.sleep(LOOP_S)
+    time.sleep(0.5)
+
+    for handle in handles:
+        client.removeListener(handle)
+    single.close()
+    batch.close()
+    return sum(received), len(received)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--loops", type=int, default=50)
+    args = parser.parse_args()
+
+    print("log_drivetrain() call cost")
+    for name, buffered, fast, level, with_args, coalesce in LOG_CASES:
+        print(f"  {name:>22}: {time_log_calls(args.calls, buffered, fast, level, with_args, coalesce):6.2f} us/call")
+
+    print(f"flush() cost per loop (cap {RobotLogger.MAX_BUFFERED_PER_FLUSH}/entry)")
+    for per_loop in (1, 10, 100, 1000):
+        print(f"  {per_loop:>5} msgs/loop: {time_flush(per_loop, 200):8.1f} us")
+
+    server = NetworkTableInstance.create()
+    server.startServer(persist_filename="", listen_address="127.0.0.1", port4=PORT)
+    client = NetworkTableInstance.create()
+    client.setServer("127.0.0.1", PORT)
+    client.startClient4("bench")
+    while not client.isConnected():
+        time.sleep(0.01)
+
+    per_loop = 5
+    print(f"delivered to a sendAll subscriber, {per_loop} messages per {LOOP_S * 1000:.0f} ms loop")
+    for buffered in (False, True):
+        received, values = delivery(server, client, buffered, args.loops, per_loop)
+        print(f"  {'buffered' if buffered else 'direct':>9}: {received} of {args.loops * per_loop} in {values} NT values")
+
+    client.stopClient()
+    server.stopServer()
+
+if __name__ == "__main__":
+    main()
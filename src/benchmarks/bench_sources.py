@@ -0,0 +1,159 @@
+# Multi-source ingestion (IngestSources.py) on placeholder load generators, no robot needed: 1, 2, 4... sources
+# each sending --rate msgs/s on their own threads, merged and polled every UPDATE_INTERVAL_MS like the window does.
+# Per source count: what each source delivered (adding sources shouldn't slow the others down), whether the merged
+# feed came out in time order, how old messages were when a poll handed them out (p50/p99/max, the poll tick and
+# the source's own poll interval included) and the merge's CPU per message.
+# One more run stalls one of the sources for --stall seconds, the others should wait at most the reorder window.
+# Before any of that SourceMerger gets a scripted run on a virtual clock (sources lagging by different amounts,
+# batches pushed in random order), which has to come out in order, complete and with nothing late.
+# Exits with 1 if the feed was ever out of order or a source delivered less than --min-share of its rate.
+#
+# Run from src/:  python -m benchmarks.bench_sources [--sources 1 2 4] [--rate 5000] [--seconds 3]
+
+import argparse
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+from IngestSources import MultiSourceIngest, CoreSource
+from models.LogMessage import LogMessage, to_ns
+from models.SourceMerger import SourceMerger
+from placeholder_data import PlaceholderDataGenerator
+from config import ENTRY_TYPES, UPDATE_INTERVAL_MS, MERGE_REORDER_WINDOW_MS
+
+
+class _StallingSource(CoreSource):
+    # a placeholder source whose poll blocks once, like a source stuck on a slow network call
+
+    def __init__(self, source_id: str, merger: SourceMerger, stall_s: float, **core_args):
+        super().__init__(source_id, merger, **core_args)
+        self.stall_s = stall_s
+        self.stalled = threading.Event()
+
+    def poll(self):
+        if not self.stalled.is_set() and self.stall_s:
+            self.stalled.set()
+            time.sleep(self.stall_s)
+        return super().poll()
+
+
+def source_configs(count: int, rate: float) -> list:
+    return [{"id": f"src{number}", "type": "placeholder", "seed": number,
+             "rates": {entry_name: rate / len(ENTRY_TYPES) for entry_name in ENTRY_TYPES}}
+            for number in range(count)]
+
+
+def generator_for(source_config: dict) -> PlaceholderDataGenerator:
+    return PlaceholderDataGenerator(source_config["seed"], source_config["rates"])
+
+
+def percentile(values: list, percent: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def check_merger_order(sources: int = 4, steps: int = 500, step_ms: int = 10) -> bool:
+    # every source lags the clock by its own amount under the window, so nothing may come out late or out of order
+    rng = random.Random(42)
+    merger = SourceMerger()
+    lags_ns = {f"src{number}": rng.randrange(merger.window_ns // 2) for number in range(sources)}
+    for source_id in lags_ns:
+        merger.add_source(source_id)
+
+    sent = []
+    merged = []
+    step_ns = step_ms * 10**6
+    start_ns = to_ns(datetime.now())
+    for step in range(1, steps + 1):
+        now_ns = start_ns + step * step_ns
+        for source_id in rng.sample(list(lags_ns), len(lags_ns)):
+            watermark_ns = now_ns - lags_ns[source_id]
+            times = sorted(rng.randrange(watermark_ns - step_ns, watermark_ns) for _ in range(rng.randrange(20)))
+            batch = [LogMessage("system", f"{source_id} {step} {i}", timestamp_ns=timestamp_ns, source=source_id)
+                     for i, timestamp_ns in enumerate(times)]
+            sent.extend(log_msg.message for log_msg in batch)
+            merger.push(source_id, batch, watermark_ns)
+        merged.extend(merger.pop_ready(now_ns))
+    merged.extend(merger.flush())
+
+    in_order = all(a.timestamp_ns <= b.timestamp_ns for a, b in zip(merged, merged[1:]))
+    complete = sorted(log_msg.message for log_msg in merged) == sorted(sent)
+    ok = in_order and complete and merger.late_count == 0
+    print(f"merger order check: {'ok' if ok else 'FAILED'}, {len(merged)} of {len(sent)} messages, "
+          f"ordered {in_order}, {merger.late_count} late")
+    return ok
+
+
+def run(ingest: MultiSourceIngest, seconds: float) -> dict:
+    delivered = {}
+    age_ms = []
+    in_order = True
+    last_ns = 0
+    cpu = 0.0
+    total = 0
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        time.sleep(UPDATE_INTERVAL_MS / 1000)
+        begin = time.thread_time()
+        batch = ingest.poll()
+        cpu += time.thread_time() - begin
+        now_ns = to_ns(datetime.now())
+        for log_msg in batch:
+            if log_msg.timestamp_ns < last_ns:
+                in_order = False
+            last_ns = log_msg.timestamp_ns
+            delivered[log_msg.source] = delivered.get(log_msg.source, 0) + 1
+        age_ms.extend((now_ns - log_msg.timestamp_ns) / 1e6 for log_msg in batch[::10])
+        total += len(batch)
+    ingest.flush()
+    ingest.disconnect()
+    return {"delivered": delivered, "in_order": in_order, "late": ingest.merger.late_count,
+            "p50": percentile(age_ms, 50), "p99": percentile(age_ms, 99), "max": max(age_ms, default=0.0),
+            "us_per_msg": cpu / max(total, 1) * 1e6}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sources", type=int, nargs="*", default=[1, 2, 4])
+    parser.add_argument("--rate", type=float, default=5000, help="msgs/s per source")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--stall", type=float, default=1.0, help="seconds one source stalls for in the last run")
+    parser.add_argument("--min-share", type=float, default=0.9, help="fraction of --rate every source has to deliver")
+    args = parser.parse_args()
+
+    failed = not check_merger_order()
+    print()
+    print(f"{args.rate:g} msgs/s per source, {args.seconds:g} s, reorder window {MERGE_REORDER_WINDOW_MS} ms")
+    print(f"{'sources':>7} {'per source msg/s (min/max)':>27} {'ordered':>8} {'late':>5} "
+          f"{'age p50/p99/max ms':>20} {'merge us/msg':>13}")
+
+    for count in args.sources:
+        r = run(MultiSourceIngest(source_configs(count, args.rate)), args.seconds)
+        rates = [r["delivered"].get(f"src{number}", 0) / args.seconds for number in range(count)]
+        print(f"{count:>7} {min(rates):>13,.0f} / {max(rates):<11,.0f} {str(r['in_order']):>8} {r['late']:>5} "
+              f"{r['p50']:>7.0f}/{r['p99']:.0f}/{r['max']:<6.0f} {r['us_per_msg']:>13.2f}")
+        if not r["in_order"] or min(rates) < args.rate * args.min_share:
+            failed = True
+
+    # one of two sources stuck for a while: the other's messages shouldn't wait much longer than the window
+    ingest = MultiSourceIngest([])
+    ingest.add_source(CoreSource("src0", ingest.merger, placeholder=True,
+                                 generator=generator_for(source_configs(1, args.rate)[0])))
+    ingest.add_source(_StallingSource("stuck", ingest.merger, args.stall, placeholder=True,
+                                      generator=generator_for(source_configs(2, args.rate)[1])))
+    r = run(ingest, args.seconds)
+    print(f"\none source stalled {args.stall:g} s: message age p50/p99/max "
+          f"{r['p50']:.0f}/{r['p99']:.0f}/{r['max']:.0f} ms, {r['late']} late, ordered {r['in_order']}")
+    failed = failed or not r["in_order"]
+
+    if failed:
+        print("merged feed out of order or a source fell behind")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
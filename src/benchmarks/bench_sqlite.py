@@ -0,0 +1,111 @@
+# SQLite log backend against the text (and binary) writer: write throughput through LogFileManager, both with
+# the synchronous writer committing every UPDATE_INTERVAL_MS tick and with the background LogWriter's group
+# commit (time until everything is on disk and the segment closed), size on disk (text is gzipped once closed,
+# as LOG_COMPRESSION does) and how long the review queries take on the finished database.
+# Exits with 1 if SQLite writes fewer than --min-rate msgs/s.
+#
+# Run from src/:  python -m benchmarks.bench_sqlite [--messages 500000] [--rate 10000] [--min-rate 50000]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import LogFileManager
+from SqliteLogBackend import SqliteLogReader
+from models.LogMessage import LogMessage
+from placeholder_data import PlaceholderDataGenerator
+from config import ENTRY_TYPES, UPDATE_INTERVAL_MS
+
+FORMATS = ["text", "binary", "sqlite"]
+
+
+def generated_messages(count: int, rate: float) -> list:
+    generator = PlaceholderDataGenerator(1, {entry_name: rate / len(ENTRY_TYPES) for entry_name in ENTRY_TYPES})
+    start_ns = time.time_ns()
+    generator.messages_until(start_ns)
+    due = generator.messages_until(start_ns + int(count / rate * 1e9))
+    return [LogMessage(entry_name, message_text, timestamp_ns=timestamp_ns)
+            for timestamp_ns, entry_name, message_text in due[:count]]
+
+
+def write(workdir: str, messages: list, rate: float, log_format: str, background: bool) -> dict:
+    directory = os.path.join(workdir, f"{log_format}-{'background' if background else 'sync'}")
+    os.makedirs(directory)
+    LogFileManager.LOG_FILE_DIRECTORY = directory
+    LogFileManager.LOG_WRITER_BLOCK_WHEN_FULL = True  # backpressure instead of drops, every message gets written
+    manager = LogFileManager.LogFileManager(background_writer=background, log_format=log_format)
+    path = manager.create_new_log_file()
+
+    per_tick = max(1, int(rate * UPDATE_INTERVAL_MS / 1000))
+    begin = time.perf_counter()
+    for start in range(0, len(messages), per_tick):
+        manager.write_messages(messages[start:start + per_tick])
+    manager.close_current_file()  # the background writer drains everything first
+    elapsed = time.perf_counter() - begin
+    manager.compressor.wait_idle()
+
+    size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+               if not name.startswith("sessions.db"))
+    return {"path": path, "msgs_per_s": len(messages) / elapsed, "mb": size / 1e6}
+
+
+def timed(function) -> tuple:
+    begin = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - begin) * 1000
+
+
+def bench_queries(path, messages: list):
+    reader = SqliteLogReader(path)
+    first_ns = messages[0].timestamp_ns
+    middle_ns = messages[len(messages) // 2].timestamp_ns
+    queries = {
+        "10 s window": lambda: list(reader.query(middle_ns, middle_ns + 10 * 10**9)),
+        "one entry": lambda: list(reader.query(entries=["error"])),
+        "entry + 10 s": lambda: list(reader.query(middle_ns, middle_ns + 10 * 10**9, ["error", "system"])),
+        "text match": lambda: list(reader.query(text="brownout")),
+        "count by entry": reader.entry_counts,
+        "first 1000": lambda: list(reader.query(first_ns, limit=1000)),
+    }
+    print(f"\n{'query':>16} {'rows':>8} {'ms':>8}")
+    for name, query in queries.items():
+        result, ms = timed(query)
+        print(f"{name:>16} {len(result):>8} {ms:>8.1f}")
+    reader.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500000)
+    parser.add_argument("--rate", type=float, default=10000,
+                        help="msgs/s the messages are spread over, sets the tick batch size")
+    parser.add_argument("--min-rate", type=float, default=50000, help="SQLite msgs/s below which the run fails")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="grt_bench_")
+    messages = generated_messages(args.messages, args.rate)
+    print(f"{len(messages)} messages, {max(1, int(args.rate * UPDATE_INTERVAL_MS / 1000))} per tick")
+    print(f"{'format':>7} | {'sync msg/s':>11} | {'background msg/s':>16} | {'MB on disk':>10}")
+
+    results = {}
+    for log_format in FORMATS:
+        sync = write(workdir, messages, args.rate, log_format, False)
+        background = write(workdir, messages, args.rate, log_format, True)
+        results[log_format] = (sync, background)
+        print(f"{log_format:>7} | {sync['msgs_per_s']:>11,.0f} | {background['msgs_per_s']:>16,.0f} "
+              f"| {sync['mb']:>10.1f}")
+
+    bench_queries(results["sqlite"][0]["path"], messages)
+    print(f"\nlog files written to {workdir}")
+
+    slowest = min(results["sqlite"][0]["msgs_per_s"], results["sqlite"][1]["msgs_per_s"])
+    if slowest < args.min_rate:
+        print(f"SQLite wrote {slowest:,.0f} msgs/s, less than --min-rate {args.min_rate:,.0f}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
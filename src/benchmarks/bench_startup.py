@@ -0,0 +1,129 @@
+# Startup time against a budget, every case in a fresh interpreter (best of --repeat runs):
+#   - import time of the modules tools and the headless recorder use, which must not load PySide6, numpy or
+#     ntcore (placeholder mode), and of the GUI
+#   - time to first message: from the first line of the process to the first placeholder message written to
+#     the log (headless: IngestCore + LogFileManager like recorder.py) or in the window's store (GUI)
+# Exits with 1 if a case is over its budget or loaded something it shouldn't, so a slow import that sneaks in
+# gets noticed.
+#
+# Run from src/:  python -m benchmarks.bench_startup [--repeat 5]
+
+T0 = __import__("time").perf_counter()  # before anything else is imported
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HEAVY_MODULES = ["PySide6", "numpy", "ntcore"]
+HEADLESS_ALLOWED = []
+GUI_ALLOWED = ["PySide6"]
+
+# case: (what it does, budget in ms, heavy modules it may load). Budgets are about twice what a dev laptop
+# measures, tighten them when something gets faster
+CASES = {
+    "import LogMessage": ("import models.LogMessage", 30, HEADLESS_ALLOWED),
+    "import LogFileManager": ("import LogFileManager", 40, HEADLESS_ALLOWED),
+    "import IngestCore": ("import IngestCore", 40, HEADLESS_ALLOWED),
+    "import recorder": ("import recorder", 45, HEADLESS_ALLOWED),
+    "import GUI": ("import UI.LoggingWindow", 200, GUI_ALLOWED),
+    "first message headless": ("headless", 50, HEADLESS_ALLOWED),
+    "first message GUI": ("gui", 260, GUI_ALLOWED),
+}
+
+
+def first_message_headless():
+    from IngestCore import IngestCore
+    from LogFileManager import LogFileManager
+
+    file_manager = LogFileManager(background_writer=False)
+    file_manager.create_new_log_file()
+    core = IngestCore()
+    while True:
+        batch = core.poll()
+        if batch:
+            file_manager.write_messages(batch)
+            break
+    file_manager.close_current_file()
+
+
+def first_message_gui():
+    from PySide6.QtWidgets import QApplication
+    from UI.LoggingWindow import LoggingWindow
+
+    app = QApplication(sys.argv)
+    window = LoggingWindow()
+    window.show()
+    while not len(window.message_store):
+        app.processEvents()
+        time.sleep(0.001)
+    window.close()
+
+
+def child(case: str) -> dict:
+    import config
+    config.PLACEHOLDER_MODE = True  # offline, and a message on every poll
+    config.PLACEHOLDER_RATES = {"system": 10}
+    os.chdir(tempfile.mkdtemp(prefix="grt_bench_"))
+
+    what = CASES[case][0]
+    if what == "headless":
+        first_message_headless()
+    elif what == "gui":
+        first_message_gui()
+    else:
+        __import__(what.split()[1])
+    return {
+        "ms": (time.perf_counter() - T0) * 1000,
+        "loaded": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child)))
+        return 0
+
+    src = Path(__file__).resolve().parent.parent
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+
+    print(f"best of {args.repeat} fresh processes, times from the first line of the process")
+    print(f"{'case':>24} {'ms':>7} {'budget':>7} {'process ms':>11}  {'heavy modules loaded':<22}")
+    failed = False
+    for case, (_, budget, allowed) in CASES.items():
+        best = None
+        best_process = None
+        for _ in range(args.repeat):
+            begin = time.perf_counter()
+            output = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child", case], cwd=src,
+                                    env=env, capture_output=True, text=True, check=True).stdout
+            process_ms = (time.perf_counter() - begin) * 1000
+            result = json.loads(output.strip().splitlines()[-1])
+            if best is None or result["ms"] < best["ms"]:
+                best = result
+            best_process = process_ms if best_process is None else min(best_process, process_ms)
+
+        unexpected = [name for name in best["loaded"] if name not in allowed]
+        problems = []
+        if best["ms"] > budget:
+            problems.append("OVER BUDGET")
+        if unexpected:
+            problems.append(f"shouldn't load {', '.join(unexpected)}")
+        failed = failed or bool(problems)
+        print(f"{case:>24} {best['ms']:>7.1f} {budget:>7} {best_process:>11.0f}  "
+              f"{', '.join(best['loaded']) or '-':<22} {' '.join(problems)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# GUI-thread cost of LogFileManager.write_messages with the synchronous writer (write + flush on the caller)
+# and with the background LogWriter thread. A simulated slow drive adds a delay to every flush, like a cheap
+# USB stick on the driver station laptop. Exits with 1 if the writer reported any errors, the numbers mean
+# nothing then.
+#
+# Run from src/:  python -m benchmarks.bench_writer [--slow-flush-ms 5]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from models.LogMessage import LogMessage
+from config import ENTRY_TYPES
+
+TOTAL_MESSAGES = 100000
+BATCH_SIZE = 100  # roughly one UPDATE_INTERVAL_MS tick at 1k msgs/s
+
+
+class SlowFile:
+    # wraps a real file handle, every flush pretends the drive took flush_delay seconds
+
+    def __init__(self, handle, flush_delay: float):
+        self.handle = handle
+        self.flush_delay = flush_delay
+
+    def write(self, data):
+        return self.handle.write(data)
+
+    def flush(self):
+        self.handle.flush()
+        if self.flush_delay:
+            time.sleep(self.flush_delay)
+
+    def fileno(self):
+        return self.handle.fileno()
+
+    def close(self):
+        self.handle.close()
+
+
+def run(background: bool, flush_delay: float) -> dict:
+    from LogFileManager import LogFileManager
+
+    manager = LogFileManager(background_writer=background)
+    manager.create_new_log_file()
+    manager.file_handle = SlowFile(manager.file_handle, flush_delay)
+
+    messages = [LogMessage(ENTRY_TYPES[i % len(ENTRY_TYPES)], f"Benchmark message {i}") for i in range(TOTAL_MESSAGES)]
+
+    gui_time = 0.0
+    worst_call = 0.0
+    for start in range(0, TOTAL_MESSAGES, BATCH_SIZE):
+        batch = messages[start:start + BATCH_SIZE]
+        t = time.perf_counter()
+        manager.write_messages(batch)
+        elapsed = time.perf_counter() - t
+        gui_time += elapsed
+        worst_call = max(worst_call, elapsed)
+
+    writer = manager.writer
+    t = time.perf_counter()
+    manager.close_current_file()  # drains the queue
+    close_time = time.perf_counter() - t
+    stats = writer.get_stats() if writer else manager.get_writer_stats()
+
+    return {
+        "us_per_msg": gui_time / TOTAL_MESSAGES * 1e6,
+        "worst_call_ms": worst_call * 1000,
+        "close_ms": close_time * 1000,
+        "write_calls": stats.get("write_calls", TOTAL_MESSAGES // BATCH_SIZE),
+        "dropped": stats.get("dropped", 0),
+        "errors": stats.get("errors", 0),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slow-flush-ms", type=float, nargs="*", default=[0, 5])
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="grt_bench_"))
+
+    print(f"{TOTAL_MESSAGES} messages in batches of {BATCH_SIZE}")
+    print(f"{'flush delay':>12} {'writer':>11} {'GUI us/msg':>11} {'worst call ms':>14} "
+          f"{'close ms':>9} {'writes':>7} {'dropped':>8} {'errors':>7}")
+    errors = 0
+    for delay_ms in args.slow_flush_ms:
+        for background in (False, True):
+            r = run(background, delay_ms / 1000)
+            name = "background" if background else "sync"
+            print(f"{delay_ms:>10.1f}ms {name:>11} {r['us_per_msg']:>11.2f} {r['worst_call_ms']:>14.2f} "
+                  f"{r['close_ms']:>9.1f} {r['write_calls']:>7} {r['dropped']:>8} {r['errors']:>7}")
+            errors += r["errors"]
+
+    if errors:
+        print(f"{errors} write errors, see above")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+# Live-mode test harness over a loopback NetworkTables connection, no robot needed. A local ntcore server stands
+# in for the roboRIO and RobotLogger publishes on it at each configured rate (spread over ENTRY_TYPES, in 20 ms
+# robot loops), while IngestCore connects to it at 127.0.0.1 exactly as the viewer and recorder connect to the
+# robot. Every message carries a per-entry sequence number, so the report can tell:
+#   published / delivered, lost, duplicated and out-of-order messages, what the viewer's queue dropped,
+#   what RobotLogger's per-loop cap dropped (buffered mode), delivered msgs/s and the network latency
+#   percentiles (robot set() -> listener callback, from the NT timestamps)
+#
+# The robot side runs in a thread by default, or with --subprocess in a process of its own (its own GIL and
+# ntcore instance, closer to the real thing). Exits with 1 if any rate loses more than --max-loss percent,
+# so it can gate changes to the NT path.
+#
+# Run from src/:  python -m benchmarks.nt_loopback [--rates 1000 10000] [--seconds 3] [--buffered] [--fast]
+#                                                    [--subprocess] [--max-loss 0]
+
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import config
+config.PLACEHOLDER_MODE = False  # before anything imports it
+config.NETWORKTABLES_SERVER = "127.0.0.1"
+
+from ntcore import NetworkTableInstance
+from models.LatencyStats import LatencyStats
+from models.LogMessage import to_ns
+from config import ENTRY_TYPES, UPDATE_INTERVAL_MS
+
+NT_PORT = 5810  # the NT4 default, what IngestCore connects to
+LOOP_S = 0.02
+SETTLE_S = 1.0  # a run is over once the robot is done and nothing new has arrived for this long
+CONNECT_TIMEOUT_S = 10.0
+WARMUP_S = 0.5
+DROPPED_NOTICE = "[logger] "
+
+
+def start_server() -> NetworkTableInstance:
+    server = NetworkTableInstance.create()
+    server.startServer(persist_filename="", listen_address="127.0.0.1", port4=NT_PORT)
+    return server
+
+
+def publish(server: NetworkTableInstance, rate: float, seconds: float, buffered: bool, fast: bool) -> dict:
+    # the robot: rate msgs/s spread over the entries in LOOP_S loops, returns how many went out per entry
+    from robot_logger import RobotLogger
+
+    RobotLogger.initialize(server, buffered=buffered, fast=fast)
+    # values set before the client has heard about a new topic don't reach it, so every topic (batch ones are
+    # made on the first flush) is announced before counting starts
+    for entry_name in ENTRY_TYPES:
+        RobotLogger.log(entry_name, "warmup")
+    RobotLogger.flush()
+    time.sleep(WARMUP_S)
+
+    per_loop = rate * LOOP_S / len(ENTRY_TYPES)
+    published = {entry_name: 0 for entry_name in ENTRY_TYPES}
+    owed = 0.0
+    next_loop = time.perf_counter()
+    for _ in range(int(seconds / LOOP_S)):
+        owed += per_loop
+        count = int(owed)
+        owed -= count
+        for entry_name in ENTRY_TYPES:
+            first = published[entry_name]
+            for seq in range(first, first + count):
+                RobotLogger.log(entry_name, "seq %d", seq)
+            published[entry_name] = first + count
+        RobotLogger.flush()
+
+        next_loop += LOOP_S
+        delay = next_loop - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    return published
+
+
+def robot_main(args) -> int:
+    # --robot: the subprocess side, serves until the harness has connected, publishes, reports on stdout
+    server = start_server()
+    deadline = time.monotonic() + CONNECT_TIMEOUT_S
+    while not server.getConnections():
+        if time.monotonic() > deadline:
+            print(json.dumps({"error": "nobody connected"}), flush=True)
+            return 1
+        time.sleep(0.05)
+    time.sleep(0.5)  # let the subscriptions reach the server
+
+    published = publish(server, args.robot, args.seconds, args.buffered, args.fast)
+    time.sleep(SETTLE_S)  # keep serving while the last values go out
+    print(json.dumps({"published": published}), flush=True)
+    server.stopServer()
+    return 0
+
+
+class Tally:
+    # what came out of IngestCore.poll(), checked against the sequence numbers
+
+    def __init__(self):
+        self.next_seq = {entry_name: 0 for entry_name in ENTRY_TYPES}
+        self.seen = {entry_name: set() for entry_name in ENTRY_TYPES}
+        self.duplicates = 0
+        self.reordered = 0
+        self.capped = 0
+        self.last_message = 0.0
+
+    def add(self, messages: list):
+        if messages:
+            self.last_message = time.monotonic()
+        for log_msg in messages:
+            text = log_msg.message
+            if text.startswith(DROPPED_NOTICE):
+                # "[logger] N more messages dropped this loop"
+                self.capped += int(text[len(DROPPED_NOTICE):].split(" ", 1)[0])
+                continue
+            if not text.startswith("seq "):
+                continue  # a value left over on the server from an earlier run
+            seq = int(text[4:])
+            seen = self.seen[log_msg.entry_name]
+            if seq in seen:
+                self.duplicates += 1
+                continue
+            if seq < self.next_seq[log_msg.entry_name]:
+                self.reordered += 1
+            else:
+                self.next_seq[log_msg.entry_name] = seq + 1
+            seen.add(seq)
+
+    @property
+    def delivered(self) -> int:
+        return sum(len(seen) for seen in self.seen.values())
+
+
+def wait_connected(core) -> bool:
+    deadline = time.monotonic() + CONNECT_TIMEOUT_S
+    while time.monotonic() < deadline:
+        core.poll()
+        if core.connected:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def run(core, server, rate: float, args) -> dict:
+    tally = Tally()
+    core.latency = LatencyStats()
+    dropped_before = core.dropped_count
+    result = {}
+
+    if args.subprocess:
+        command = [sys.executable, "-m", "benchmarks.nt_loopback", "--robot", str(rate), "--seconds",
+                   str(args.seconds)] + (["--buffered"] if args.buffered else []) + (["--fast"] if args.fast else [])
+        robot = subprocess.Popen(command, cwd=Path(__file__).resolve().parent.parent, stdout=subprocess.PIPE, text=True)
+        if not wait_connected(core):
+            robot.kill()
+            raise RuntimeError("couldn't connect to the robot process")
+        robot_done = lambda: robot.poll() is not None
+    else:
+        robot = threading.Thread(target=lambda: result.update(published=publish(server, rate, args.seconds,
+                                                                                 args.buffered, args.fast)))
+        robot.start()
+        robot_done = lambda: not robot.is_alive()
+
+    begin = time.monotonic()
+    tally.last_message = begin
+    while not robot_done() or time.monotonic() - tally.last_message < SETTLE_S:
+        tally.add(core.poll())
+        time.sleep(UPDATE_INTERVAL_MS / 1000)
+    tally.add(core.poll())
+
+    if args.subprocess:
+        report = json.loads(robot.stdout.read().strip().splitlines()[-1])
+        if "error" in report:
+            raise RuntimeError(report["error"])
+        published = report["published"]
+    else:
+        robot.join()
+        published = result["published"]
+
+    published_total = sum(published.values())
+    network = core.latency.to_dict(to_ns(datetime.now()))["stages"]["network"]["all"]
+    return {
+        "published": published_total,
+        "delivered": tally.delivered,
+        "lost": published_total - tally.delivered - tally.capped,
+        "duplicates": tally.duplicates,
+        "reordered": tally.reordered,
+        "queue_dropped": core.dropped_count - dropped_before,
+        "capped": tally.capped,
+        "msgs_per_s": tally.delivered / args.seconds,
+        "network": network,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rates", type=float, nargs="*", default=[1000, 10000, 40000], help="msgs/s, all entries")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--buffered", action="store_true", help="RobotLogger buffered mode (one array per loop)")
+    parser.add_argument("--fast", action="store_true", help="RobotLogger fast mode (NT timestamps, no text time)")
+    parser.add_argument("--subprocess", action="store_true", help="run the robot side in its own process")
+    parser.add_argument("--max-loss", type=float, default=0.0, help="percent lost before the run counts as failed")
+    parser.add_argument("--robot", type=float, help=argparse.SUPPRESS)  # subprocess side, publishes at this rate
+    args = parser.parse_args()
+
+    if args.robot is not None:
+        return robot_main(args)
+
+    from IngestCore import IngestCore
+
+    server = None if args.subprocess else start_server()
+    core = IngestCore()
+    if not args.subprocess and not wait_connected(core):
+        print("couldn't connect to the loopback server")
+        return 1
+
+    mode = "buffered" if args.buffered else "direct"
+    if args.fast:
+        mode += " fast"
+    print(f"RobotLogger {mode}, robot in a {'subprocess' if args.subprocess else 'thread'}, "
+          f"{args.seconds:g} s per rate, {len(ENTRY_TYPES)} entries")
+    print(f"{'rate':>7} {'published':>10} {'delivered':>10} {'lost':>6} {'dup':>4} {'reord':>6} {'q drop':>7} "
+          f"{'capped':>7} {'msg/s':>8} {'net p50/p95/p99/max ms':>24}")
+
+    failed = False
+    for rate in args.rates:
+        r = run(core, server, rate, args)
+        net = r["network"]
+        latency = "/".join("-" if net[key] is None else f"{net[key]:.0f}"
+                           for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms"))
+        loss = r["lost"] / r["published"] * 100 if r["published"] else 0.0
+        print(f"{rate:>7.0f} {r['published']:>10} {r['delivered']:>10} {r['lost']:>6} {r['duplicates']:>4} "
+              f"{r['reordered']:>6} {r['queue_dropped']:>7} {r['capped']:>7} {r['msgs_per_s']:>8.0f} {latency:>24}")
+        if loss > args.max_loss:
+            print(f"  lost {loss:.2f}% (more than --max-loss {args.max_loss:g}%)")
+            failed = True
+
+    core.disconnect()
+    if server:
+        server.stopServer()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# Runs the whole benchmark suite, each benchmark in its own process (a fresh Qt app and no state left over
+# from the one before), and says which ones failed. Everything runs offline: the placeholder load generator
+# and local ntcore instances stand in for the robot.
+#
+# Run from src/:  python -m benchmarks.run_all [--quick] [names...]
+#   names are module names without the bench_ prefix, e.g. load writer nt_loopback
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# module, arguments for --quick (smaller runs for a sanity check, not for comparing numbers)
+BENCHMARKS = [
+    ("bench_load", ["--seconds", "1"]),
+    ("bench_batching", []),
+    ("bench_writer", ["--slow-flush-ms", "0"]),
+    ("bench_binary_format", ["--rate", "20"]),
+    ("bench_replay", ["--messages", "50000"]),
+    ("bench_filter", []),
+    ("bench_memory", ["--messages", "100000"]),
+    ("bench_robot_logger", ["--calls", "10000", "--loops", "10"]),
+    ("bench_startup", ["--repeat", "1"]),
+    ("bench_catalog", ["--sessions", "20", "--seconds", "10"]),
+    ("bench_sqlite", ["--messages", "50000"]),
+    ("bench_sources", ["--sources", "1", "4", "--seconds", "1"]),
+    ("nt_loopback", ["--seconds", "1", "--rates", "1000", "10000"]),
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quick", action="store_true", help="smaller runs, just to check everything still works")
+    parser.add_argument("names", nargs="*", help="only these, e.g. load writer")
+    args = parser.parse_args()
+
+    src = Path(__file__).resolve().parent.parent
+    selected = [(module, quick_args) for module, quick_args in BENCHMARKS
+                if not args.names or module[len("bench_"):] in args.names or module in args.names]
+
+    failed = []
+    for module, quick_args in selected:
+        print(f"=== {module}", flush=True)
+        begin = time.perf_counter()
+        command = [sys.executable, "-m", f"benchmarks.{module}"] + (quick_args if args.quick else [])
+        result = subprocess.run(command, cwd=src)
+        print(f"=== {module}: {'ok' if result.returncode == 0 else f'FAILED ({result.returncode})'} "
+              f"in {time.perf_counter() - begin:.1f} s\n", flush=True)
+        if result.returncode != 0:
+            failed.append(module)
+
+    if failed:
+        print(f"failed: {', '.join(failed)}")
+        return 1
+    print(f"all {len(selected)} benchmarks ran")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
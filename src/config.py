@@ -1,6 +1,4 @@
-#configuration settings for the UI
-
-from PySide6.QtGui import QColor
+#configuration settings for the UI and the headless recorder (no Qt imports here, the recorder doesn't load Qt)
 
 
 # Placeholder mode (for testing) and live NetworkTables connection toggle
@@ -12,22 +10,110 @@ NETWORKTABLES_SERVER = "10.19.2.2"
 
 
 LOGGING_TABLE_NAME = "Logging" #networks table name for loggin
+LOGGING_BATCH_TABLE = "batch" #subtable RobotLogger's buffered mode publishes string arrays to (Logging/batch/<entry>)
 
 LOG_FILE_DIRECTORY = "robot_logs"
 
 # Log file name strftime format
 LOG_FILE_NAME_FORMAT = "robot_log_%Y%m%d_%H%M%S.txt"
 
+# "text" = one str(LogMessage) line per message, "binary" = compact indexed .grtlog (see BinaryLogFormat.py),
+# "sqlite" = a .grtdb database per segment that can be queried with SQL (see SqliteLogBackend.py)
+LOG_FILE_FORMAT = "text"
+
+# Start a new log segment once the current one is this big / this old (0 = never)
+LOG_ROTATE_MAX_BYTES = 50 * 1024 * 1024
+LOG_ROTATE_INTERVAL_S = 60 * 60
+
+# Compression for closed text segments: "gzip", "zstd" (needs the zstandard package) or None
+LOG_COMPRESSION = "gzip"
+
+# Oldest logs in LOG_FILE_DIRECTORY are deleted past these limits (0 = no limit)
+LOG_RETENTION_MAX_BYTES = 5 * 1024 * 1024 * 1024
+LOG_RETENTION_MAX_AGE_DAYS = 0
+
+# Per-session metadata (times, per-entry counts, time -> byte offset checkpoints) kept in a SQLite file in
+# LOG_FILE_DIRECTORY so browsing past sessions never has to open the logs themselves (see SessionCatalog.py)
+SESSION_CATALOG_ENABLED = True       # False = segments only get cataloged by a scan when sessions are browsed
+SESSION_CATALOG_FILE = "sessions.db"
+SESSION_CATALOG_UPDATE_S = 5         # how often the open segment's row is brought up to date
+SESSION_CHECKPOINT_INTERVAL_S = 10   # one checkpoint per this many seconds of log
+SESSION_ERROR_ENTRIES = ["error"]    # messages on these entries count as errors
+
+# Seconds between fsyncs of the current log file (only used when LOG_FSYNC is on)
 AUTO_SAVE_INTERVAL = 5
 
-# Max messages to keep in memory
-MAX_MESSAGES_IN_MEMORY = 10000
+# Write log files from a background thread so a slow drive never stalls the UI
+LOG_BACKGROUND_WRITER = True
+LOG_WRITER_QUEUE_MAX = 200000        # messages waiting to be written before backpressure/drops
+LOG_WRITER_BLOCK_WHEN_FULL = False   # True = GUI waits for the writer, False = drop and count
+LOG_FLUSH_INTERVAL_MS = 250          # flush to the OS at least this often...
+LOG_FLUSH_MAX_MESSAGES = 5000        # ...or once this many messages are unflushed
+LOG_FSYNC = True                     # also fsync every AUTO_SAVE_INTERVAL seconds and on close
+
+# Max messages to keep in memory (the list view only renders visible rows, so this can be large)
+MAX_MESSAGES_IN_MEMORY = 1000000
 
 UPDATE_INTERVAL_MS = 100
 
+# The view, the message counter and the scroll position are updated at most RENDER_FPS times a second (30 or 60),
+# new messages only go into the store in between, so drawing costs the same at any message rate
+RENDER_FPS = 30
+
+# Max NetworkTables updates buffered between GUI ticks before new ones are counted as dropped
+INGEST_QUEUE_MAX_SIZE = 100000
+
+# Several ingest sources at once (two robots, a coprocessor publishing its own Logging table, a replay file, a
+# generator), each on its own thread and merged into one time-ordered feed with every message tagged with its
+# source id (see IngestSources.py). Empty = the one source above (PLACEHOLDER_MODE / NETWORKTABLES_SERVER), untagged.
+#   {"id": "robotA", "type": "nt", "server": "10.19.2.2"}
+#   {"id": "coproc", "type": "nt", "server": "10.19.2.11", "table": "Logging"}   (table defaults to LOGGING_TABLE_NAME)
+#   {"id": "sim", "type": "placeholder", "rates": {"drivetrain": 200}}          (rates/seed default to PLACEHOLDER_*)
+#   {"id": "lastmatch", "type": "replay", "path": "robot_logs/robot_log_20250315_101500.txt"}
+INGEST_SOURCES = []
+INGEST_SOURCE_POLL_MS = 20  # how often each source's thread drains it
+# A message is held back until every source has caught up to its time, or MERGE_REORDER_WINDOW_MS has passed
+# (a stalled or disconnected source can't hold the others up longer than that). Once MERGE_MAX_PENDING are held
+# back they all go out early, and new ones are dropped while nothing takes them (e.g. during a replay)
+MERGE_REORDER_WINDOW_MS = 200
+MERGE_MAX_PENDING = 100000
+
+# Hand messages to the window as one list per tick (messages_received) instead of one signal per message
+BATCH_INGESTION = True
+
+# Collapse identical consecutive messages per entry into one "(xN)" record on the way in (memory, display and
+# the log file all get the record). A run is handed out when it's broken or COALESCE_WINDOW_MS after it started.
+# Records RobotLogger coalesced on the robot are always understood, this only adds the viewer side.
+COALESCE_REPEATS = False
+COALESCE_WINDOW_MS = 1000
+
+# Robot-to-screen latency: the status bar percentiles cover the last LATENCY_WINDOW_S seconds (rolled over in
+# LATENCY_WINDOW_SLICES steps), and a metrics JSON next to the log file is rewritten every
+# METRICS_DUMP_INTERVAL_S seconds and on close (0 = only on close)
+LATENCY_WINDOW_S = 30
+LATENCY_WINDOW_SLICES = 6
+METRICS_DUMP_INTERVAL_S = 60
+
+# Session replay: messages handed to the window per tick at most (also the batch size at "Max" speed),
+# and whether replayed messages are written to a new log file like live ones
+REPLAY_MAX_BATCH = 5000
+REPLAY_WRITES_TO_DISK = False
+REPLAY_SPEEDS = [0.25, 0.5, 1, 2, 5, 10, 0]  # 0 = as fast as possible
+
 DEFAULT_AUTO_SCROLL = True
 
-DEFAULT_FILTER = "All"
+# Exports run on a worker thread and write (and report progress) this many messages at a time
+EXPORT_CHUNK_SIZE = 50000
+
+DEFAULT_FILTER = "All"  # "All", an entry name or a filter expression (see models/LogFilter.py)
+
+# Search: keep a word index of the store (costs some memory and CPU per message), how many messages a
+# search goes through per step while streaming results in (regex scan / index lookup), and how long to wait
+# after typing before searching
+SEARCH_INDEX_ENABLED = True
+SEARCH_SCAN_CHUNK = 10000
+SEARCH_INDEX_CHUNK = 100000
+SEARCH_DEBOUNCE_MS = 250
 
 LOG_DISPLAY_FONT_FAMILY = "Courier New"
 LOG_DISPLAY_FONT_SIZE = 10
@@ -44,25 +130,33 @@ ENTRY_TYPES = [
     "error"
 ]
 
-# RGB colors for diff entry types
+# RGB colors for diff entry types (turned into QColors by the UI)
 ENTRY_COLORS = {
-    "drivetrain": QColor(100, 150, 255),  # Light blue
-    "intake": QColor(100, 255, 150),      # Light green
-    "shooter": QColor(255, 150, 100),     # Light orange
-    "elevator": QColor(255, 200, 100),     # Yellow-orange
-    "vision": QColor(200, 100, 255),      # Purple
-    "auto": QColor(150, 255, 255),        # Cyan
-    "system": QColor(200, 200, 200),      # Light gray
-    "error": QColor(255, 100, 100),       # Light red
+    "drivetrain": (100, 150, 255),  # Light blue
+    "intake": (100, 255, 150),      # Light green
+    "shooter": (255, 150, 100),     # Light orange
+    "elevator": (255, 200, 100),     # Yellow-orange
+    "vision": (200, 100, 255),      # Purple
+    "auto": (150, 255, 255),        # Cyan
+    "system": (200, 200, 200),      # Light gray
+    "error": (255, 100, 100),       # Light red
 }
 
 # Default color for unknown entry types
-DEFAULT_ENTRY_COLOR = QColor(255, 255, 255)
+DEFAULT_ENTRY_COLOR = (255, 255, 255)
 
-TIMESTAMP_COLOR = QColor(150, 150, 150)
+TIMESTAMP_COLOR = (150, 150, 150)
 
 PLACEHOLDER_MESSAGE_PROBABILITY = 0.3
 
+# Placeholder load generator (stress testing). With PLACEHOLDER_RATES set (entry -> msgs/s, up to ~100k in total)
+# every entry sends at its own rate instead of PLACEHOLDER_MESSAGE_PROBABILITY per tick. PLACEHOLDER_BURSTS
+# (entry -> (every_s, length_s, multiplier)) multiplies an entry's rate for length_s out of every every_s seconds.
+# The same PLACEHOLDER_SEED gives the same messages (None = different every run)
+PLACEHOLDER_SEED = None
+PLACEHOLDER_RATES = {}
+PLACEHOLDER_BURSTS = {}
+
 # Constant placehodler message templates for each entry type (FOR TESTING)
 PLACEHOLDER_MESSAGES = {
     "drivetrain": [
@@ -0,0 +1,52 @@
+# Bookkeeping for the window's render tick (LoggingWindow.render_frame): how long each frame took, in a
+# LatencyHistogram so it gets the same rolling window and percentiles as the latency stats, and how many frames
+# were dropped, i.e. ticks that came one or more whole frames late because the event loop was busy elsewhere.
+
+from typing import Optional
+from models.LatencyStats import LatencyHistogram, PERCENTILES, percentiles_ns, _format_ms
+from config import RENDER_FPS, LATENCY_WINDOW_S, LATENCY_WINDOW_SLICES
+
+
+class FrameStats:
+
+    def __init__(self, fps: float = RENDER_FPS, window_s: float = LATENCY_WINDOW_S,
+                 slices: int = LATENCY_WINDOW_SLICES):
+        self.frame_ns = int(1e9 / fps)
+        self.window_s = window_s
+        self.render_time = LatencyHistogram(window_s, slices)
+        self.frame_count = 0  # frames that had something to draw
+        self.tick_count = 0
+        self.dropped_count = 0
+        self.last_tick_ns: Optional[int] = None
+
+    def tick(self, now_ns: int):
+        # every render tick, drawn or not, so a late tick counts as dropped frames either way
+        if self.last_tick_ns is not None:
+            missed = (now_ns - self.last_tick_ns) // self.frame_ns - 1
+            if missed > 0:
+                self.dropped_count += missed
+        self.last_tick_ns = now_ns
+        self.tick_count += 1
+
+    def record_frame(self, render_ns: int, now_ns: int):
+        self.render_time.record((render_ns,), now_ns)
+        self.frame_count += 1
+
+    def format_window(self, now_ns: int) -> str:
+        values = percentiles_ns(self.render_time.window_counts(now_ns))
+        if values[0] is None:
+            return "-"
+        return "/".join(_format_ms(min(value, self.render_time.max_ns)) for value in values) + " ms"
+
+    def to_dict(self, now_ns: int) -> dict:
+        max_ns = self.render_time.max_ns
+        window = percentiles_ns(self.render_time.window_counts(now_ns))
+        return {
+            "fps_cap": round(1e9 / self.frame_ns, 1),
+            "ticks": self.tick_count,
+            "frames": self.frame_count,
+            "dropped_frames": self.dropped_count,
+            "render_max_ms": round(max_ns / 1e6, 3),
+            **{f"render_p{percentile}_ms": None if value is None else round(min(value, max_ns) / 1e6, 3)
+               for percentile, value in zip(PERCENTILES, window)},
+        }
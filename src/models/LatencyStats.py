@@ -0,0 +1,220 @@
+# Robot-to-screen latency histograms, per entry and per stage:
+#     network  robot set() -> NT listener callback on this machine (robot_ns -> timestamp_ns)
+#     display  NT callback / receive -> rows pushed to the view (timestamp_ns -> display_ns), poll jitter + GUI backlog
+#     total    robot set() -> screen (robot_ns -> display_ns)
+# network and total need the robot's time so they only exist for live NetworkTables data.
+#
+# Values go into log-spaced buckets (4 per doubling, so a percentile is within ~19%), one set of counts per
+# slice of the rolling window plus lifetime counts for the metrics dump. Recording is a log2 and two increments.
+
+import json
+from collections import deque
+from math import log2
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from models.LogMessage import LogMessage
+from config import LATENCY_WINDOW_S, LATENCY_WINDOW_SLICES
+
+STAGES = ["network", "display", "total"]
+PERCENTILES = [50, 95, 99]
+
+BUCKETS_PER_DOUBLING = 4
+BUCKET_COUNT = 28 * BUCKETS_PER_DOUBLING + 1  # up to 2^28 us (~4.5 min), anything slower lands in the last one
+
+
+def metrics_path_for(log_path: Path) -> Path:
+    # robot_log_20250101_120000.txt -> robot_log_20250101_120000.metrics.json
+    log_path = Path(log_path)
+    return log_path.with_name(log_path.name.split(".")[0] + ".metrics.json")
+
+
+def _bucket(value_ns: int) -> int:
+    micros = value_ns // 1000
+    if micros < 1:
+        return 0
+    return min(int(log2(micros) * BUCKETS_PER_DOUBLING) + 1, BUCKET_COUNT - 1)
+
+
+def _bucket_upper_ns(bucket: int) -> int:
+    # values in a bucket are reported as its upper edge
+    return int(2 ** (bucket / BUCKETS_PER_DOUBLING) * 1000)
+
+
+def percentiles_ns(counts: List[int], percentiles: Iterable[float] = PERCENTILES) -> List[Optional[int]]:
+    total = sum(counts)
+    if not total:
+        return [None for _ in percentiles]
+
+    results = []
+    for percentile in percentiles:
+        wanted = total * percentile / 100
+        seen = 0
+        for bucket, count in enumerate(counts):
+            seen += count
+            if count and seen >= wanted:
+                results.append(_bucket_upper_ns(bucket))
+                break
+    return results
+
+
+class LatencyHistogram:
+
+    def __init__(self, window_s: float = LATENCY_WINDOW_S, slices: int = LATENCY_WINDOW_SLICES):
+        self.slice_ns = int(window_s * 1e9 / slices)
+        self.slice_count = slices
+        self.slices = deque()  # [slice number, counts], oldest first
+        self.lifetime = [0] * BUCKET_COUNT
+        self.count = 0
+        self.max_ns = 0
+
+    def record(self, values_ns: Iterable[int], now_ns: int):
+        counts = self._current_slice(now_ns)
+        lifetime = self.lifetime
+        max_ns = self.max_ns
+        recorded = 0
+        for value in values_ns:
+            if value < 0:
+                value = 0  # clock sync jitter, can't be faster than instant
+            bucket = _bucket(value)
+            counts[bucket] += 1
+            lifetime[bucket] += 1
+            if value > max_ns:
+                max_ns = value
+            recorded += 1
+        self.max_ns = max_ns
+        self.count += recorded
+
+    def window_counts(self, now_ns: int) -> List[int]:
+        self._drop_old(now_ns // self.slice_ns)
+        counts = [0] * BUCKET_COUNT
+        for _, slice_counts in self.slices:
+            for bucket, count in enumerate(slice_counts):
+                counts[bucket] += count
+        return counts
+
+    def _current_slice(self, now_ns: int) -> List[int]:
+        number = now_ns // self.slice_ns
+        if not self.slices or self.slices[-1][0] != number:
+            self._drop_old(number)
+            self.slices.append([number, [0] * BUCKET_COUNT])
+        return self.slices[-1][1]
+
+    def _drop_old(self, number: int):
+        while self.slices and self.slices[0][0] <= number - self.slice_count:
+            self.slices.popleft()
+
+
+class LatencyStats:
+
+    def __init__(self, window_s: float = LATENCY_WINDOW_S, slices: int = LATENCY_WINDOW_SLICES):
+        self.window_s = window_s
+        self.slices = slices
+        self.histograms: Dict[str, Dict[str, LatencyHistogram]] = {stage: {} for stage in STAGES}
+
+    def _histogram(self, stage: str, entry_name: str) -> LatencyHistogram:
+        per_entry = self.histograms[stage]
+        histogram = per_entry.get(entry_name)
+        if histogram is None:
+            histogram = per_entry[entry_name] = LatencyHistogram(self.window_s, self.slices)
+        return histogram
+
+    def _record(self, stage: str, values: Dict[str, List[int]], now_ns: int):
+        for entry_name, entry_values in values.items():
+            self._histogram(stage, entry_name).record(entry_values, now_ns)
+
+    def record_received(self, messages: Iterable[LogMessage]):
+        # network stage, for messages that know when the robot sent them
+        network = {}
+        now_ns = None
+        for log_msg in messages:
+            if log_msg.robot_ns is not None:
+                network.setdefault(log_msg.entry_name, []).append(log_msg.timestamp_ns - log_msg.robot_ns)
+                now_ns = log_msg.timestamp_ns
+        if now_ns is not None:
+            self._record("network", network, now_ns)
+
+    def record_displayed(self, messages: Iterable[LogMessage], display_ns: int):
+        # stamps display_ns on the messages and records the display and total stages
+        display = {}
+        total = {}
+        for log_msg in messages:
+            log_msg.display_ns = display_ns
+            display.setdefault(log_msg.entry_name, []).append(display_ns - log_msg.timestamp_ns)
+            if log_msg.robot_ns is not None:
+                total.setdefault(log_msg.entry_name, []).append(display_ns - log_msg.robot_ns)
+        self._record("display", display, display_ns)
+        self._record("total", total, display_ns)
+
+    def window_percentiles(self, stage: str, now_ns: int, entry_name: Optional[str] = None) -> List[Optional[int]]:
+        # p50/p95/p99 in ns over the rolling window, for one entry or all of them
+        per_entry = self.histograms[stage]
+        if entry_name is None:
+            histograms = per_entry.values()
+        else:
+            histograms = [per_entry[entry_name]] if entry_name in per_entry else []
+        counts = [0] * BUCKET_COUNT
+        for histogram in histograms:
+            for bucket, count in enumerate(histogram.window_counts(now_ns)):
+                counts[bucket] += count
+        return percentiles_ns(counts)
+
+    def has_data(self, stage: str) -> bool:
+        return any(histogram.count for histogram in self.histograms[stage].values())
+
+    def format_window(self, stage: str, now_ns: int, entry_name: Optional[str] = None) -> str:
+        values = self.window_percentiles(stage, now_ns, entry_name)
+        if values[0] is None:
+            return "-"
+        return "/".join(_format_ms(value) for value in values) + " ms"
+
+    def to_dict(self, now_ns: int) -> dict:
+        stages = {}
+        for stage, per_entry in self.histograms.items():
+            entries = {}
+            lifetime_all = [0] * BUCKET_COUNT
+            window_all = [0] * BUCKET_COUNT
+            max_all = 0
+            for entry_name, histogram in sorted(per_entry.items()):
+                window = histogram.window_counts(now_ns)
+                entries[entry_name] = _summary(histogram.lifetime, window, histogram.max_ns)
+                for bucket in range(BUCKET_COUNT):
+                    lifetime_all[bucket] += histogram.lifetime[bucket]
+                    window_all[bucket] += window[bucket]
+                max_all = max(max_all, histogram.max_ns)
+            stages[stage] = {"all": _summary(lifetime_all, window_all, max_all), "entries": entries}
+
+        return {"window_s": self.window_s, "stages": stages}
+
+    def dump(self, path: Path, now_ns: int, extra: Optional[dict] = None) -> bool:
+        # writes to_dict() (plus whatever else the caller wants on record, e.g. ingest stats) as JSON
+        data = self.to_dict(now_ns)
+        if extra:
+            data.update(extra)
+        try:
+            temp = Path(path).with_name(Path(path).name + ".part")
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            temp.replace(path)
+            return True
+        except Exception as e:
+            print(f"Error writing metrics: {e}")
+            return False
+
+
+def _format_ms(value_ns: int) -> str:
+    millis = value_ns / 1e6
+    return f"{millis:.1f}" if millis < 10 else f"{millis:.0f}"
+
+
+def _summary(lifetime: List[int], window: List[int], max_ns: int) -> dict:
+    def as_ms(values):
+        # a bucket's upper edge can be past the slowest value actually seen
+        return {f"p{percentile}_ms": None if value is None else round(min(value, max_ns) / 1e6, 3)
+                for percentile, value in zip(PERCENTILES, values)}
+
+    return {
+        "count": sum(lifetime),
+        "max_ms": round(max_ns / 1e6, 3),
+        **as_ms(percentiles_ns(lifetime)),
+        "window": {"count": sum(window), **as_ms(percentiles_ns(window))},
+    }
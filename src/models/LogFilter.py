@@ -0,0 +1,168 @@
+# Filter expressions for the log view and exports, e.g.
+#     entry:error,system,drivetrain text:CAN|brownout last:30s source:robotA
+# entry: any of these entries, text: the message contains any of these (case-insensitive, with several text:
+# terms each one has to match), last: only messages from the last N s/m/h before "now" (the wall clock, or the
+# replay position), source: only messages from these ingest sources (IngestSources.py). A bare word is an entry if
+# it names one, text otherwise, and "All" (or nothing) shows everything.
+#
+# A filter is compiled once. select() works on the store's columns instead of looking at every message:
+# the time window is a binary search on the timestamp column, the entry set is a merge of the per-entry
+# seq lists, and only what's left gets the text (and source) check.
+
+import re
+import shlex
+from bisect import bisect_left
+from typing import FrozenSet, List, Optional
+from models.LogMessage import LogMessage
+from models.MessageStore import MessageStore
+
+TIME_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+class LogFilter:
+
+    def __init__(self,
+                 entries: Optional[FrozenSet[str]] = None,
+                 text: Optional[List[List[str]]] = None,
+                 last_seconds: Optional[float] = None,
+                 sources: Optional[FrozenSet[str]] = None):
+        self.entries = frozenset(entries) if entries else None  # None = every entry
+        self.text = [list(terms) for terms in text or [] if terms]  # AND of OR-groups
+        self.last_seconds = last_seconds or None
+        self.sources = frozenset(sources) if sources else None  # None = every source (and untagged messages)
+
+        # one case-insensitive pattern per text: group
+        self.text_patterns = [
+            re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE) for terms in self.text
+        ]
+
+    @classmethod
+    def parse(cls, expression: str, known_entries: Optional[List[str]] = None) -> "LogFilter":
+        # raises ValueError with something that can go straight into the status bar
+        known_entries = set(known_entries or [])
+        entries = set()
+        text = []
+        last_seconds = None
+        sources = set()
+
+        if expression.strip() in ("", "All"):
+            return cls()
+
+        for token in shlex.split(expression):
+            key, sep, value = token.partition(":")
+            key = key.lower()
+            if not sep:
+                if token in known_entries:
+                    entries.add(token)
+                else:
+                    text.append([token])
+            elif key in ("entry", "entries"):
+                entries.update(name for name in value.split(",") if name)
+            elif key == "text":
+                text.append([term for term in value.split("|") if term])
+            elif key == "last":
+                last_seconds = cls._parse_duration(value)
+            elif key in ("source", "sources"):
+                sources.update(name for name in value.split(",") if name)
+            else:
+                raise ValueError(f"Unknown filter key '{key}' (use entry:, text:, last: or source:)")
+
+        return cls(frozenset(entries), text, last_seconds, frozenset(sources))
+
+    @staticmethod
+    def _parse_duration(value: str) -> float:
+        match = re.fullmatch(r"(\d+(?:\.\d+)?)([smh]?)", value.strip().lower())
+        if not match:
+            raise ValueError(f"Bad time window '{value}' (e.g. last:30s, last:5m)")
+        return float(match.group(1)) * TIME_UNITS[match.group(2) or "s"]
+
+    def __str__(self) -> str:
+        parts = []
+        if self.entries:
+            parts.append("entry:" + ",".join(sorted(self.entries)))
+        for terms in self.text:
+            parts.append(shlex.quote("text:" + "|".join(terms)))
+        if self.last_seconds:
+            parts.append(f"last:{self.last_seconds:g}s")
+        if self.sources:
+            parts.append("source:" + ",".join(sorted(self.sources)))
+        return " ".join(parts) or "All"
+
+    @property
+    def is_empty(self) -> bool:
+        return self.entries is None and not self.text and self.last_seconds is None and self.sources is None
+
+    @property
+    def single_entry(self) -> Optional[str]:
+        # the entry name if this filter is nothing but one entry (the store keeps that list ready-made)
+        if (self.entries is not None and len(self.entries) == 1 and not self.text and self.last_seconds is None
+                and self.sources is None):
+            return next(iter(self.entries))
+        return None
+
+    def cutoff_ns(self, now_ns: int) -> Optional[int]:
+        if self.last_seconds is None:
+            return None
+        return now_ns - int(self.last_seconds * 1e9)
+
+    def matches(self, log_msg: LogMessage, now_ns: int) -> bool:
+        # the same filter one message at a time
+        if self.entries is not None and log_msg.entry_name not in self.entries:
+            return False
+        cutoff = self.cutoff_ns(now_ns)
+        if cutoff is not None and log_msg.timestamp_ns < cutoff:
+            return False
+        return self._message_matches(log_msg)
+
+    def first_seq(self, store: MessageStore, now_ns: int) -> int:
+        # oldest seq that can still pass the time window
+        cutoff = self.cutoff_ns(now_ns)
+        if cutoff is None:
+            return store.first_seq
+        return store.first_seq_since(cutoff)
+
+    def select(self, store: MessageStore, now_ns: int, from_seq: int = 0, to_seq: Optional[int] = None) -> List[int]:
+        # seqs (oldest first) of the retained messages passing the filter, from_seq <= seq < to_seq
+        from_seq = max(from_seq, self.first_seq(store, now_ns))
+        to_seq = store.next_seq if to_seq is None else min(to_seq, store.next_seq)
+        if from_seq >= to_seq:
+            return []
+
+        if self.entries is None:
+            if not self.text_patterns and self.sources is None:
+                return list(range(from_seq, to_seq))
+            messages = store.messages_between(from_seq, to_seq)
+            return [from_seq + offset for offset, log_msg in enumerate(messages) if self._message_matches(log_msg)]
+
+        lists = [store.seqs_for_entry(entry_name, from_seq, to_seq) for entry_name in self.entries]
+        seqs = lists[0] if len(lists) == 1 else sorted(seq for seqs in lists for seq in seqs)
+        return self._keep_matching(store, seqs)
+
+    def keep(self, store: MessageStore, seqs: List[int], now_ns: int) -> List[int]:
+        # narrows an existing (sorted) list of seqs down to the ones passing the filter, e.g. search results
+        seqs = seqs[bisect_left(seqs, self.first_seq(store, now_ns)):]
+        if self.entries is not None:
+            seqs = store.keep_entries(seqs, self.entries)
+        return self._keep_matching(store, seqs)
+
+    def select_messages(self, store: MessageStore, now_ns: int) -> List[LogMessage]:
+        if self.is_empty:
+            return list(store)
+        if self.single_entry:
+            return store.by_entry(self.single_entry)
+        return [store.get_seq(seq) for seq in self.select(store, now_ns)]
+
+    def _message_matches(self, log_msg: LogMessage) -> bool:
+        # the checks that need the message itself, the store has no column for them
+        if self.sources is not None and log_msg.source not in self.sources:
+            return False
+        message = log_msg.message
+        for pattern in self.text_patterns:
+            if not pattern.search(message):
+                return False
+        return True
+
+    def _keep_matching(self, store: MessageStore, seqs: List[int]) -> List[int]:
+        if not self.text_patterns and self.sources is None:
+            return seqs
+        return [seq for seq in seqs if self._message_matches(store.get_seq(seq))]
@@ -1,38 +1,172 @@
 
-from datetime import datetime
-from dataclasses import dataclass
-from typing import Optional
+import re
+from datetime import datetime, timedelta
+from sys import intern
+from typing import Optional, Tuple
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+NS_PER_DAY = 86400 * 10**9
+
+# how a coalesced record's count and first time are kept in log files, after the message text:
+#     [12:00:06.240] [drivetrain] Brake mode engaged [repeat x312 first=12:00:00.020]
+REPEAT_SUFFIX_PATTERN = re.compile(r" \[repeat x(\d+) first=(\d\d):(\d\d):(\d\d)\.(\d{3})\]$")
+
+# a message from one of several ingest sources (IngestSources.py) keeps the source id after its entry name:
+#     [12:00:06.240] [drivetrain@robotA] Brake mode engaged
+SOURCE_SEPARATOR = "@"
+
+
+def to_ns(timestamp: datetime) -> int:
+    # exact integer nanoseconds (no float rounding), naive timestamps are taken as local wall clock time
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return (timestamp - _EPOCH) // _ONE_MICROSECOND * 1000
+
+
+def from_ns(timestamp_ns: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=timestamp_ns // 1000)
+
+
+def format_time_of_day(timestamp_ns: int) -> str:
+    # same as strftime("%H:%M:%S.%f")[:-3] without building a datetime
+    seconds, millis = divmod(timestamp_ns // 1_000_000, 1000)
+    minutes, seconds = divmod(seconds % 86400, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{millis:03d}"
+
+
+def split_repeat(text: str, timestamp_ns: int) -> Tuple[str, Optional[Tuple[int, int]]]:
+    # message text read back from a log file -> (message, (count, first_ns) or None), timestamp_ns is the line's
+    # own (= last) time and the first time is the same day or, if that would be later, the day before
+    if not text.endswith("]"):
+        return text, None
+    match = REPEAT_SUFFIX_PATTERN.search(text)
+    if not match:
+        return text, None
+    count, hours, minutes, seconds, millis = (int(group) for group in match.groups())
+    first_of_day = (((hours * 60 + minutes) * 60 + seconds) * 1000 + millis) * 10**6
+    last_ms = timestamp_ns // 10**6 * 10**6
+    first_ns = last_ms - (last_ms % NS_PER_DAY - first_of_day) % NS_PER_DAY
+    return text[:match.start()], (count, first_ns)
+
+
+def split_source(name: str) -> Tuple[str, Optional[str]]:
+    # "drivetrain@robotA" as log files keep it -> ("drivetrain", "robotA"), a plain entry name -> (name, None)
+    entry_name, separator, source = name.partition(SOURCE_SEPARATOR)
+    return (entry_name, source) if separator else (name, None)
 
 
-@dataclass
 class LogMessage:
     #single log msg from robot
-    entry_name: str
-    message: str
-    timestamp: Optional[datetime] = None
+    #kept small (slots, int ns times, interned names), a million of these can be in memory at once
+    __slots__ = ("entry_name", "message", "timestamp_ns", "server_time", "robot_ns", "display_ns", "repeat",
+                 "source", "_time_str")
+    
+    def __init__(self, entry_name: str, message: str, timestamp: Optional[datetime] = None,
+                 server_time: Optional[int] = None, timestamp_ns: Optional[int] = None,
+                 robot_ns: Optional[int] = None, repeat: Optional[Tuple[int, int]] = None,
+                 source: Optional[str] = None):
+        self.entry_name = intern(entry_name)
+        self.message = message
+        if timestamp_ns is None:
+            #time is set to current time if no timestamp is provided
+            timestamp_ns = to_ns(timestamp if timestamp is not None else datetime.now())
+        self.timestamp_ns = timestamp_ns
+        self.server_time = server_time #NT server time in microseconds (live mode only)
+        self.robot_ns = robot_ns
+        self.display_ns = None
+        self.repeat = repeat
+        self.source = intern(source) if source is not None else None
+        self._time_str = None
     
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = datetime.now() #time is set to current time if no timestamp is provided
+    @property
+    def timestamp(self) -> datetime:
+        return from_ns(self.timestamp_ns)
+    
+    @timestamp.setter
+    def timestamp(self, timestamp: datetime):
+        self.timestamp_ns = to_ns(timestamp)
+        self._time_str = None
     
     def __str__(self):
-        time_str = self.timestamp.strftime("%H:%M:%S.%f")[:-3] #format msg with timestamp and entry name
-        return f"[{time_str}] [{self.entry_name}] {self.message}"
+        #format msg with timestamp and entry name. Uses the cached time text if the display already made it but
+        #doesn't keep its own, every message gets written to the file once and caching all of them costs more
+        #memory than the formatting costs time
+        time_str = self._time_str or format_time_of_day(self.timestamp_ns)
+        return f"[{time_str}] [{self.qualified_name}] {self.message}{self.repeat_suffix()}"
+    
+    def __repr__(self):
+        return (f"LogMessage(entry_name={self.entry_name!r}, message={self.message!r}, "
+                f"timestamp={self.timestamp!r}, server_time={self.server_time!r})")
+    
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.entry_name == other.entry_name and self.message == other.message
+                and self.timestamp_ns == other.timestamp_ns and self.server_time == other.server_time
+                and self.repeat == other.repeat and self.source == other.source)
+    
+    __hash__ = None  # mutable like the dataclass it used to be
     
     def formatted_time(self):
-        return self.timestamp.strftime("%H:%M:%S.%f")[:-3]
+        #cached, the display asks for it on every repaint of the row
+        time_str = self._time_str
+        if time_str is None:
+            time_str = self._time_str = format_time_of_day(self.timestamp_ns)
+        return time_str
+    
+    @property
+    def qualified_name(self) -> str:
+        #entry name as log files and the view show it, with the source id if there is one
+        if self.source is None:
+            return self.entry_name
+        return f"{self.entry_name}{SOURCE_SEPARATOR}{self.source}"
+    
+    @property
+    def repeat_count(self) -> int:
+        return self.repeat[0] if self.repeat else 1
+    
+    @property
+    def first_ns(self) -> int:
+        return self.repeat[1] if self.repeat else self.timestamp_ns
+    
+    def repeat_suffix(self) -> str:
+        # what log files add after the message text for a coalesced record (see split_repeat)
+        if not self.repeat:
+            return ""
+        return f" [repeat x{self.repeat[0]} first={format_time_of_day(self.repeat[1])}]"
     
     def to_dict(self):
-        return {
+        data = {
             "entry_name": self.entry_name,
             "message": self.message,
             "timestamp": self.timestamp.isoformat()
         }
+        if self.server_time is not None:
+            data["server_time"] = self.server_time
+        if self.robot_ns is not None:
+            data["robot_ns"] = self.robot_ns
+        if self.display_ns is not None:
+            data["display_ns"] = self.display_ns
+        if self.source is not None:
+            data["source"] = self.source
+        if self.repeat:
+            data["repeat_count"] = self.repeat[0]
+            data["first_timestamp"] = from_ns(self.repeat[1]).isoformat()
+        return data
     
     @classmethod
     def from_dict(cls, data): #create from dictionary
-        return cls(
+        log_msg = cls(
             entry_name=data["entry_name"],
             message=data["message"],
-            timestamp=datetime.fromisoformat(data["timestamp"])
-        )
\ No newline at end of file
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            server_time=data.get("server_time"),
+            robot_ns=data.get("robot_ns"),
+            repeat=(data["repeat_count"], to_ns(datetime.fromisoformat(data["first_timestamp"])))
+            if "repeat_count" in data else None,
+            source=data.get("source")
+        )
+        log_msg.display_ns = data.get("display_ns")
+        return log_msg
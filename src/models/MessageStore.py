@@ -0,0 +1,249 @@
+# Fixed capacity ring buffer that holds the in-memory message history.
+# Append, eviction and index lookups are all O(1). Timestamps are kept in an int64 column and entry names
+# as small interned ids so filters can compare ints instead of strings. Every entry also keeps a SeqList of
+# its own messages, so per-entry views and exports only touch the messages they show.
+
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, List, Optional
+from models.LogMessage import LogMessage
+
+
+class SeqList:
+    # Append-only list of message seqs that drops from the front in amortized O(1), used for filtered views
+
+    def __init__(self):
+        self._items = array("q")
+        self._start = 0
+        self.removed = 0  # how many seqs have been trimmed from the front so far
+
+    def append(self, seq: int):
+        self._items.append(seq)
+
+    def extend(self, seqs):
+        self._items.extend(seqs)
+
+    def trim_before(self, seq: int):
+        items = self._items
+        start = self._start
+        end = len(items)
+        while start < end and items[start] < seq:
+            start += 1
+        self.removed += start - self._start
+
+        # compact once the dead prefix is bigger than what's left
+        if start > 1024 and start * 2 > end:
+            del items[:start]
+            start = 0
+        self._start = start
+
+    def __len__(self) -> int:
+        return len(self._items) - self._start
+
+    def __getitem__(self, index: int) -> int:
+        if index < 0 or index >= len(self):
+            raise IndexError("seq index out of range")
+        return self._items[self._start + index]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._items[self._start:])
+
+    def between(self, from_seq: int, to_seq: int) -> array:
+        # the seqs with from_seq <= seq < to_seq, found by binary search since seqs only ever increase
+        start = bisect_left(self._items, from_seq, self._start)
+        return self._items[start:bisect_left(self._items, to_seq, start)]
+
+
+class MessageStore:
+
+    def __init__(self, capacity: int = 0):
+        self.capacity = capacity  # 0 (or less) means unbounded
+
+        # entry name <-> small integer id, shared for the lifetime of the store
+        self.entry_names: List[str] = []
+        self.entry_ids = {}
+        self._entry_seqs: List[SeqList] = []  # by entry id, seqs of the retained messages of that entry
+
+        # seq numbers keep counting across evictions and clears, so a seq always names the same message
+        self.next_seq = 0
+        self.evicted_count = 0
+
+        # indexes that follow the store (e.g. SearchIndex), see add_observer
+        self.observers = []
+
+        self.clear()
+
+    def clear(self):
+        size = max(self.capacity, 0)
+        self._messages: List[Optional[LogMessage]] = [None] * size
+        self._timestamps = array("q", bytes(8 * size))
+        self._entries = array("H", bytes(2 * size))
+        self._head = 0  # physical slot of the oldest message
+        self._count = 0
+
+        # trimmed rather than replaced, views holding one keep counting its removed rows correctly
+        for seqs in self._entry_seqs:
+            seqs.trim_before(self.next_seq)
+
+        for observer in self.observers:
+            observer.store_cleared()
+
+    def add_observer(self, observer):
+        # observer gets message_appended(seq, msg), message_evicted(seq, msg) and store_cleared() calls
+        self.observers.append(observer)
+
+    @property
+    def first_seq(self) -> int:
+        return self.next_seq - self._count
+
+    def intern_entry(self, entry_name: str) -> int:
+        entry_id = self.entry_ids.get(entry_name)
+        if entry_id is None:
+            entry_id = len(self.entry_names)
+            self.entry_names.append(entry_name)
+            self.entry_ids[entry_name] = entry_id
+            self._entry_seqs.append(SeqList())
+        return entry_id
+
+    def entry_seqs(self, entry_name: str) -> SeqList:
+        # the live SeqList for one entry, it grows on append and drops evicted seqs from the front
+        return self._entry_seqs[self.intern_entry(entry_name)]
+
+    def append(self, log_msg: LogMessage) -> Optional[LogMessage]:
+        # returns the evicted message, if the buffer was full
+        entry_id = self.intern_entry(log_msg.entry_name)
+        timestamp = log_msg.timestamp_ns
+        evicted = None
+
+        if self.capacity <= 0:
+            self._messages.append(log_msg)
+            self._timestamps.append(timestamp)
+            self._entries.append(entry_id)
+            self._count += 1
+        elif self._count < self.capacity:
+            slot = (self._head + self._count) % self.capacity
+            self._messages[slot] = log_msg
+            self._timestamps[slot] = timestamp
+            self._entries[slot] = entry_id
+            self._count += 1
+        else:
+            # overwrite the oldest slot and move the head forward
+            slot = self._head
+            evicted = self._messages[slot]
+            self._entry_seqs[self._entries[slot]].trim_before(self.next_seq - self.capacity + 1)
+            self._messages[slot] = log_msg
+            self._timestamps[slot] = timestamp
+            self._entries[slot] = entry_id
+            self._head = (slot + 1) % self.capacity
+            self.evicted_count += 1
+
+        seq = self.next_seq
+        self.next_seq += 1
+        self._entry_seqs[entry_id].append(seq)
+
+        for observer in self.observers:
+            if evicted is not None:
+                observer.message_evicted(seq - self.capacity, evicted)
+            observer.message_appended(seq, log_msg)
+        return evicted
+
+    def extend(self, messages: List[LogMessage]) -> int:
+        # returns how many old messages were evicted
+        evicted = 0
+        for log_msg in messages:
+            if self.append(log_msg) is not None:
+                evicted += 1
+        return evicted
+
+    def _slot(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError("message index out of range")
+        if self.capacity <= 0:
+            return index
+        return (self._head + index) % self.capacity
+
+    def _ranges(self) -> List[range]:
+        # physical slot ranges in oldest -> newest order (at most two once the buffer has wrapped)
+        end = self._head + self._count
+        if self.capacity <= 0 or end <= self.capacity:
+            return [range(self._head, end)]
+        return [range(self._head, self.capacity), range(0, end - self.capacity)]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> LogMessage:
+        return self._messages[self._slot(index)]
+
+    def __iter__(self) -> Iterator[LogMessage]:
+        for slots in self._ranges():
+            yield from self._messages[slots.start:slots.stop]
+
+    def get_seq(self, seq: int) -> LogMessage:
+        return self[seq - self.first_seq]
+
+    def messages_between(self, from_seq: int, to_seq: int) -> List[LogMessage]:
+        # retained messages with from_seq <= seq < to_seq, oldest first
+        first_seq = self.first_seq
+        start = max(from_seq - first_seq, 0)
+        count = min(to_seq - first_seq, self._count) - start
+        if count <= 0:
+            return []
+        if self.capacity <= 0:
+            return self._messages[start:start + count]
+
+        slot = (self._head + start) % self.capacity
+        if slot + count <= self.capacity:
+            return self._messages[slot:slot + count]
+        return self._messages[slot:] + self._messages[:slot + count - self.capacity]
+
+    def timestamp_at(self, index: int) -> int:
+        return self._timestamps[self._slot(index)]
+
+    def entry_at(self, index: int) -> str:
+        return self.entry_names[self._entries[self._slot(index)]]
+
+    def keep_entries(self, seqs, entry_names: Iterable[str]) -> List[int]:
+        # the seqs (all retained) whose message belongs to one of entry_names, checked on the entry id column
+        entry_ids = {self.entry_ids[name] for name in entry_names if name in self.entry_ids}
+        if not entry_ids:
+            return []
+        entries = self._entries
+        offset = self._head - self.first_seq
+        if self.capacity <= 0:
+            return [seq for seq in seqs if entries[seq + offset] in entry_ids]
+        capacity = self.capacity
+        return [seq for seq in seqs if entries[(seq + offset) % capacity] in entry_ids]
+
+    def first_seq_since(self, timestamp_ns: int) -> int:
+        # seq of the oldest retained message at or after timestamp_ns (next_seq if there is none),
+        # a binary search on the timestamp column since messages arrive in time order
+        passed = 0
+        for slots in self._ranges():
+            index = bisect_left(self._timestamps, timestamp_ns, slots.start, slots.stop)
+            passed += index - slots.start
+            if index < slots.stop:
+                break
+        return self.first_seq + passed
+
+    def seqs_for_entry(self, entry_name: str, from_seq: int = 0, to_seq: Optional[int] = None) -> List[int]:
+        # seqs (oldest first) of the retained messages for one entry, from_seq <= seq < to_seq
+        entry_id = self.entry_ids.get(entry_name)
+        if entry_id is None:
+            return []
+        to_seq = self.next_seq if to_seq is None else to_seq
+        return list(self._entry_seqs[entry_id].between(from_seq, to_seq))
+
+    def by_entry(self, entry_name: str) -> List[LogMessage]:
+        # O(messages of that entry), not O(store)
+        entry_id = self.entry_ids.get(entry_name)
+        if entry_id is None:
+            return []
+        messages = self._messages
+        offset = self._head - self.first_seq
+        if self.capacity <= 0:
+            return [messages[seq + offset] for seq in self._entry_seqs[entry_id]]
+        capacity = self.capacity
+        return [messages[(seq + offset) % capacity] for seq in self._entry_seqs[entry_id]]
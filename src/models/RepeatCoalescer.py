@@ -0,0 +1,74 @@
+# Collapses runs of the same message per entry into one record with repeat = (count, first_ns), sent when the run
+# breaks or window_ms after its first repeat. A record that comes out late takes the newest time handed out so far
+
+from typing import Dict, List, Optional
+from models.LogMessage import LogMessage
+from config import COALESCE_WINDOW_MS
+
+
+class _Run:
+    __slots__ = ("message", "count", "first_ns", "last")
+
+    def __init__(self, message: str):
+        self.message = message
+        self.count = 0  # repeats not handed out yet
+        self.first_ns = 0
+        self.last: Optional[LogMessage] = None
+
+    def add(self, log_msg: LogMessage):
+        if not self.count:
+            self.first_ns = log_msg.first_ns
+        self.count += log_msg.repeat_count
+        self.last = log_msg
+
+    def take(self, not_before_ns: int) -> LogMessage:
+        last = self.last
+        record = LogMessage(last.entry_name, self.message, timestamp_ns=max(last.timestamp_ns, not_before_ns),
+                            server_time=last.server_time, robot_ns=last.robot_ns,
+                            repeat=(self.count, self.first_ns))
+        self.count = 0
+        return record
+
+
+class RepeatCoalescer:
+
+    def __init__(self, window_ms: float = COALESCE_WINDOW_MS):
+        self.window_ns = int(window_ms * 1e6)
+        self.runs: Dict[str, _Run] = {}
+        self.latest_ns = 0  # newest time handed out
+
+    def process(self, messages: List[LogMessage], now_ns: int) -> List[LogMessage]:
+        # call on every poll, even with nothing new, so a run that stopped still comes out within the window
+        window_ns = self.window_ns
+        latest_ns = self.latest_ns
+        output = []
+        for log_msg in messages:
+            run = self.runs.get(log_msg.entry_name)
+            if run is not None and run.message == log_msg.message:
+                run.add(log_msg)
+                if log_msg.timestamp_ns - run.first_ns >= window_ns:
+                    output.append(run.take(latest_ns))
+                    latest_ns = output[-1].timestamp_ns
+                continue
+
+            if run is not None and run.count:
+                output.append(run.take(latest_ns))
+            if log_msg.timestamp_ns > latest_ns:
+                latest_ns = log_msg.timestamp_ns
+            output.append(log_msg)
+            self.runs[log_msg.entry_name] = _Run(log_msg.message)
+
+        for run in self.runs.values():
+            if run.count and now_ns - run.first_ns >= window_ns:
+                output.append(run.take(latest_ns))
+        self.latest_ns = latest_ns
+        return output
+
+    def held_since_ns(self) -> Optional[int]:
+        # the oldest time a record still being counted can come out with (its last repeat so far), None = nothing
+        # held. IngestSources.py holds the merge back for it
+        return min((run.last.timestamp_ns for run in self.runs.values() if run.count), default=None)
+
+    def flush(self) -> List[LogMessage]:
+        # everything still being counted, e.g. on shutdown
+        return [run.take(self.latest_ns) for run in self.runs.values() if run.count]
@@ -0,0 +1,125 @@
+# Full-text search over the MessageStore. SearchIndex is an inverted index (word -> SeqList of message seqs)
+# kept up to date as a store observer, so a word query is a posting list intersection instead of a scan.
+# Queries the index can't answer (regexes, numbers, punctuation) are matched message by message instead.
+
+import re
+from typing import Dict, List, Optional, Set
+from models.LogMessage import LogMessage
+from models.MessageStore import MessageStore, SeqList
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# words that don't start with a digit: numbers (ids, sensor values...) are nearly all unique,
+# indexing them would just bloat the index
+INDEXED_WORD_PATTERN = re.compile(r"\b[^\W\d]\w*")
+
+
+def _is_indexed(word: str) -> bool:
+    return not word[0].isdigit()
+
+
+def index_words(text: str) -> Set[str]:
+    return set(INDEXED_WORD_PATTERN.findall(text.lower()))
+
+
+class SearchQuery:
+    # What was typed in the search box, compiled once.
+    # Plain text: every word has to appear as a whole word, case-insensitive. Regex: re.search, case-insensitive.
+
+    def __init__(self, text: str, regex: bool = False):
+        self.text = text
+        self.regex = regex
+
+        if regex:
+            self.words = []
+            self.patterns = [re.compile(text, re.IGNORECASE)]  # re.error goes back to the caller
+        else:
+            self.words = list(dict.fromkeys(WORD_PATTERN.findall(text.lower())))
+            if self.words:
+                self.patterns = [re.compile(rf"\b{re.escape(word)}\b", re.IGNORECASE) for word in self.words]
+            else:
+                # nothing but punctuation, e.g. "->", just look for it as is
+                self.patterns = [re.compile(re.escape(text.strip()), re.IGNORECASE)]
+
+        # one pattern for all the pieces, the delegate uses it to highlight matches
+        self.highlight_pattern = re.compile("|".join(f"(?:{p.pattern})" for p in self.patterns), re.IGNORECASE)
+
+    @property
+    def indexed_words(self) -> List[str]:
+        return [word for word in self.words if _is_indexed(word)]
+
+    @property
+    def needs_verify(self) -> bool:
+        # the index only knows some of the words, candidates still have to be checked for the rest
+        return len(self.indexed_words) < len(self.words)
+
+    def matches(self, log_msg: LogMessage) -> bool:
+        message = log_msg.message
+        for pattern in self.patterns:
+            if not pattern.search(message):
+                return False
+        return True
+
+
+class SearchIndex:
+
+    def __init__(self, store: MessageStore):
+        self.store = store
+        self.postings: Dict[str, SeqList] = {}
+
+        # catch up on anything already in the store, then follow it
+        first_seq = store.first_seq
+        for offset, log_msg in enumerate(store):
+            self.message_appended(first_seq + offset, log_msg)
+        store.add_observer(self)
+
+    def message_appended(self, seq: int, log_msg: LogMessage):
+        postings = self.postings
+        for word in index_words(log_msg.message):
+            seqs = postings.get(word)
+            if seqs is None:
+                seqs = postings[word] = SeqList()
+            seqs.append(seq)
+
+    def message_evicted(self, seq: int, log_msg: LogMessage):
+        # the evicted message is the oldest one, so it sits at the front of each of its words' lists
+        postings = self.postings
+        for word in index_words(log_msg.message):
+            seqs = postings.get(word)
+            if seqs is not None:
+                seqs.trim_before(seq + 1)
+                if not len(seqs):
+                    del postings[word]
+
+    def store_cleared(self):
+        self.postings = {}
+
+    def can_answer(self, query: SearchQuery) -> bool:
+        return not query.regex and bool(query.indexed_words)
+
+    def lookup(self, query: SearchQuery, from_seq: int = 0, to_seq: Optional[int] = None) -> List[int]:
+        # seqs (oldest first) of the retained messages matching the query with from_seq <= seq < to_seq.
+        # Cost follows the postings in that range, not the store size.
+        store = self.store
+        from_seq = max(from_seq, store.first_seq)
+        to_seq = store.next_seq if to_seq is None else to_seq
+
+        lists = []
+        for word in query.indexed_words:
+            seqs = self.postings.get(word)
+            if seqs is None:
+                return []
+            lists.append(seqs.between(from_seq, to_seq))
+
+        # walk the rarest word's seqs, checking them against the others
+        lists.sort(key=len)
+        result = lists[0]
+        for seqs in lists[1:]:
+            if not result:
+                break
+            seqs = set(seqs)
+            result = [seq for seq in result if seq in seqs]
+
+        if query.needs_verify:
+            result = [seq for seq in result if query.matches(store.get_seq(seq))]
+        return list(result)
@@ -0,0 +1,142 @@
+# Merges the batches of several ingest sources, each pushed from its own thread, into one feed in time order.
+# Every push carries the source's watermark: the time it has handed over everything up to, so a message can go
+# out once every source's watermark has passed it. A source that stalls (disconnected, slow network) only holds the
+# others back for window_ms, after that messages go out regardless and anything it sends later that is older than
+# what already went out is late: it takes the newest time handed out so far (like RepeatCoalescer) so the
+# MessageStore still gets its appends in order, and is counted. At most max_pending messages are held: once that
+# many are waiting everything goes out on the next pop, and while nobody pops new ones are dropped (counted, like
+# IngestCore's queue does).
+#
+# Each source's messages are already in time order, so the ready part of every source is a slice off the front
+# of its queue and the merge is one sort of the concatenated runs (timsort merges sorted runs in C).
+
+import threading
+from operator import attrgetter
+from typing import Dict, List
+from models.LogMessage import LogMessage
+from config import MERGE_REORDER_WINDOW_MS, MERGE_MAX_PENDING
+
+_timestamp = attrgetter("timestamp_ns")
+
+
+class _SourceQueue:
+    __slots__ = ("messages", "watermark_ns", "in_order", "closed")
+
+    def __init__(self):
+        self.messages: List[LogMessage] = []
+        self.watermark_ns = 0
+        self.in_order = True
+        self.closed = False  # removed, what's left goes out without waiting for it
+
+
+class SourceMerger:
+
+    def __init__(self, window_ms: float = MERGE_REORDER_WINDOW_MS, max_pending: int = MERGE_MAX_PENDING):
+        self.window_ns = int(window_ms * 1e6)
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+        self.queues: Dict[str, _SourceQueue] = {}
+        self.pending_count = 0
+        self.latest_ns = 0  # newest time handed out so far
+        self.late_count = 0
+        self.forced_count = 0  # went out before the window was up because max_pending was reached
+        self.dropped_count = 0
+
+    def add_source(self, source_id: str):
+        with self.lock:
+            self.queues[source_id] = _SourceQueue()
+
+    def remove_source(self, source_id: str):
+        with self.lock:
+            source_queue = self.queues.get(source_id)
+            if source_queue is not None:
+                source_queue.closed = True
+
+    def push(self, source_id: str, messages: List[LogMessage], watermark_ns: int):
+        # from the source's thread: messages in time order, and nothing older than watermark_ns will follow
+        with self.lock:
+            source_queue = self.queues[source_id]
+            room = self.max_pending - self.pending_count
+            if len(messages) > room:
+                self.dropped_count += len(messages) - max(room, 0)
+                messages = messages[:max(room, 0)]
+            if messages:
+                held = source_queue.messages
+                if held and messages[0].timestamp_ns < held[-1].timestamp_ns:
+                    source_queue.in_order = False
+                held.extend(messages)
+                self.pending_count += len(messages)
+            if watermark_ns > source_queue.watermark_ns:
+                source_queue.watermark_ns = watermark_ns
+
+    def pop_ready(self, now_ns: int) -> List[LogMessage]:
+        # everything every source is done with (or that has waited out the window), oldest first
+        with self.lock:
+            cutoff = now_ns - self.window_ns
+            watermarks = [source_queue.watermark_ns for source_queue in self.queues.values()
+                          if not source_queue.closed]
+            if watermarks:
+                cutoff = max(cutoff, min(watermarks))
+            else:
+                cutoff = now_ns
+            forced = self.pending_count >= self.max_pending
+
+            runs = []
+            for source_id, source_queue in list(self.queues.items()):
+                held = source_queue.messages
+                if held:
+                    if not source_queue.in_order:
+                        held.sort(key=_timestamp)
+                        source_queue.in_order = True
+                    if forced or source_queue.closed:
+                        split = len(held)
+                    else:
+                        split = len(held)
+                        while split and held[split - 1].timestamp_ns > cutoff:
+                            split -= 1  # from the back, only the newest few are still held back
+                    if split:
+                        runs.append(held[:split])
+                        del held[:split]
+                        self.pending_count -= split
+                        if forced:
+                            self.forced_count += split
+                if source_queue.closed and not held:
+                    del self.queues[source_id]
+            return self._merge(runs)
+
+    def flush(self) -> List[LogMessage]:
+        # everything still held back, for shutting down
+        with self.lock:
+            runs = []
+            for source_queue in self.queues.values():
+                if source_queue.messages:
+                    if not source_queue.in_order:
+                        source_queue.messages.sort(key=_timestamp)
+                        source_queue.in_order = True
+                    runs.append(source_queue.messages)
+                    source_queue.messages = []
+            self.pending_count = 0
+            return self._merge(runs)
+
+    def _merge(self, runs: List[List[LogMessage]]) -> List[LogMessage]:
+        if not runs:
+            return []
+        if len(runs) == 1:
+            merged = runs[0]
+        else:
+            merged = [log_msg for run in runs for log_msg in run]
+            merged.sort(key=_timestamp)
+
+        # only the front can be older than what already went out
+        latest_ns = self.latest_ns
+        for log_msg in merged:
+            if log_msg.timestamp_ns >= latest_ns:
+                break
+            log_msg.timestamp_ns = latest_ns
+            self.late_count += 1
+        self.latest_ns = merged[-1].timestamp_ns
+        return merged
+
+    def get_stats(self) -> dict:
+        return {"held": self.pending_count, "late": self.late_count, "forced": self.forced_count,
+                "dropped": self.dropped_count}
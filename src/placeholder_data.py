@@ -1,75 +1,140 @@
 #Since I don't have access to the actual robot for this, I did research online regarding this 
 # & implemented this file to generate REALISTIC test data that copies actual robot logging
+#
+# Also a load generator for stress testing: with per-entry rates (msgs/s) and optional bursts it hands out
+# every message that was due since the last call, spaced evenly at the current rate. Each entry has its own
+# random stream seeded from (seed, entry name) so the same seed gives the same messages at the same offsets
+# from the first call no matter how often it's polled.
 
 
 import random
 from datetime import datetime
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Tuple
 from config import PLACEHOLDER_MESSAGES
 
+# template keyword -> values to fill it with, checked in order, the first match wins
+_FILLERS = [
+    (lambda t: "angle" in t or "degrees" in t, lambda rng: (rng.uniform(-180, 180),)),
+    (lambda t: "position" in t, lambda rng: (rng.uniform(0, 10), rng.uniform(0, 10))),
+    (lambda t: "current" in t, lambda rng: (rng.uniform(0, 40),)),
+    (lambda t: "RPM" in t, lambda rng: (rng.randint(4000, 6000),)),
+    (lambda t: "temperature" in t or "°C" in t, lambda rng: (rng.randint(20, 60),)),
+    (lambda t: "distance" in t, lambda rng: (rng.uniform(1, 5),)),
+    (lambda t: "AprilTag" in t, lambda rng: (rng.randint(1, 8),)),
+    (lambda t: "point" in t, lambda rng: (rng.randint(1, 10),)),
+    (lambda t: "ID" in t or "device" in t, lambda rng: (rng.randint(1, 20),)),
+    (lambda t: "voltage" in t.lower(), lambda rng: (rng.uniform(11.5, 12.8),)),
+    (lambda t: "inches" in t, lambda rng: (rng.uniform(0, 24),)),
+    (lambda t: "utilization" in t or "%" in t, lambda rng: (rng.randint(20, 80),)),
+    (lambda t: "memory" in t.lower(), lambda rng: (rng.randint(100, 500),)),
+    (lambda t: True, lambda rng: (rng.randint(1, 100),)),
+]
+
+
+def _compile_template(template: str) -> Callable[[random.Random], str]:
+    # works out once which values a template takes, so making a message is a choice and a format call
+    if "{}" not in template and "{:" not in template:
+        return lambda rng: template
+    fill = next(fill for matches, fill in _FILLERS if matches(template))
+    format_template = template.format
+    return lambda rng: format_template(*fill(rng))
+
+
+class _EntryStream:
+    # one entry's share of the load: when its next message is due and the random stream it's made from
+    __slots__ = ("entry_name", "period_ns", "burst", "rng", "templates", "next_ns")
+
+    def __init__(self, entry_name: str, rate: float, burst: Optional[Tuple[float, float, float]], rng: random.Random,
+                 templates: List[Callable[[random.Random], str]]):
+        self.entry_name = entry_name
+        self.period_ns = 1e9 / rate
+        # (every_s, length_s, multiplier): for length_s out of every every_s seconds the rate is multiplier times
+        self.burst = None if burst is None else (burst[0] * 1e9, burst[1] * 1e9, burst[2])
+        self.rng = rng
+        self.templates = templates
+        self.next_ns = 0.0
+
 
 class PlaceholderDataGenerator:
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, rates: Optional[Dict[str, float]] = None,
+                 bursts: Optional[Dict[str, Tuple[float, float, float]]] = None):
         self.messages = PLACEHOLDER_MESSAGES
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.templates = {entry_name: [_compile_template(template) for template in templates]
+                          for entry_name, templates in self.messages.items()}
+        
+        bursts = bursts or {}
+        stream_seed = seed if seed is not None else self.random.random()
+        self.streams = [
+            _EntryStream(entry_name, rate, bursts.get(entry_name), random.Random(f"{stream_seed}:{entry_name}"),
+                         self._templates_for(entry_name))
+            for entry_name, rate in (rates or {}).items() if rate > 0
+        ]
+        self.origin_ns = None
+    
+    @property
+    def has_load(self) -> bool:
+        # rates were given, poll with messages_until() instead of one random message per tick
+        return bool(self.streams)
+    
+    def _templates_for(self, entry_name: str) -> List[Callable[[random.Random], str]]:
+        templates = self.templates.get(entry_name)
+        if templates is None:
+            message = f"Sample message from {entry_name}"
+            templates = [lambda rng: message]
+        return templates
     
     def get_random_message(self, entry_name: str) -> str:
         if entry_name not in self.messages:
             return self._generate_generic_message(entry_name)
         
         
-        msg_template = random.choice(self.messages[entry_name])
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
         
         # Fill in template placeholders with realistic values
-        message = self._fill_template(msg_template)
+        message = self.random.choice(self.templates[entry_name])(self.random)
         
         return f"[{timestamp}] {message}"
     
-    def _fill_template(self, template: str) -> str:
-        if "{}" not in template and "{:" not in template:
-            return template
-        
-        if "angle" in template or "degrees" in template:
-            return template.format(random.uniform(-180, 180))
-        
-        elif "position" in template:
-            return template.format(random.uniform(0, 10), random.uniform(0, 10))
-        
-        elif "current" in template:
-            return template.format(random.uniform(0, 40))
-        
-        elif "RPM" in template:
-            return template.format(random.randint(4000, 6000))
-        
-        elif "temperature" in template or "°C" in template:
-            return template.format(random.randint(20, 60))
-        
-        elif "distance" in template:
-            return template.format(random.uniform(1, 5))
-        
-        elif "AprilTag" in template:
-            return template.format(random.randint(1, 8))
-        
-        elif "point" in template:
-            return template.format(random.randint(1, 10))
-        
-        elif "ID" in template or "device" in template:
-            return template.format(random.randint(1, 20))
-        
-        elif "voltage" in template.lower():
-            return template.format(random.uniform(11.5, 12.8))
-        
-        elif "inches" in template:
-            return template.format(random.uniform(0, 24))
-        
-        elif "utilization" in template or "%" in template:
-            return template.format(random.randint(20, 80))
-        
-        elif "memory" in template.lower():
-            return template.format(random.randint(100, 500))
-        else:
-            return template.format(random.randint(1, 100))
+    def messages_until(self, now_ns: int) -> List[Tuple[int, str, str]]:
+        # (timestamp_ns, entry name, message) for everything due since the last call, oldest first.
+        # The first call starts the clock, offsets (and bursts) count from there
+        if self.origin_ns is None:
+            self.origin_ns = now_ns
+        origin_ns = self.origin_ns
+        until = now_ns - origin_ns
+        
+        due = []
+        for stream in self.streams:
+            next_ns = stream.next_ns
+            if next_ns > until:
+                continue
+            entry_name = stream.entry_name
+            rng = stream.rng
+            choice = rng.choice
+            templates = stream.templates
+            period_ns = stream.period_ns
+            burst = stream.burst
+            if burst is None:
+                while next_ns <= until:
+                    due.append((origin_ns + int(next_ns), entry_name, choice(templates)(rng)))
+                    next_ns += period_ns
+            else:
+                every_ns, length_ns, multiplier = burst
+                burst_period_ns = period_ns / multiplier
+                while next_ns <= until:
+                    due.append((origin_ns + int(next_ns), entry_name, choice(templates)(rng)))
+                    next_ns += burst_period_ns if next_ns % every_ns < length_ns else period_ns
+            stream.next_ns = next_ns
+        
+        if len(self.streams) > 1:
+            due.sort(key=itemgetter(0))  # each stream is already in order, so this is a merge
+        return due
     
     def _generate_generic_message(self, entry_name: str) -> str:
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        return f"[{timestamp}] Sample message from {entry_name}"
\ No newline at end of file
+        return f"[{timestamp}] Sample message from {entry_name}"
+    
\ No newline at end of file
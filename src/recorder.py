@@ -0,0 +1,83 @@
+# Headless recorder: IngestCore (or several sources, INGEST_SOURCES) -> LogFileManager with no GUI and no Qt, for
+# running as a service on the pit laptop or a coprocessor. Stops cleanly (everything flushed and the segment
+# closed) on Ctrl+C or SIGTERM.
+#
+# Run from src/:  python -m recorder [--format text|binary|sqlite] [--stats-interval 10]
+
+import argparse
+import signal
+import threading
+import time
+from datetime import datetime
+from IngestSources import create_ingest
+from LogFileManager import LogFileManager
+from models.LogMessage import to_ns
+from models.LatencyStats import metrics_path_for
+from config import UPDATE_INTERVAL_MS, LOG_FILE_FORMAT, METRICS_DUMP_INTERVAL_S
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Record robot logs without the viewer")
+    parser.add_argument("--format", choices=["text", "binary", "sqlite"], default=LOG_FILE_FORMAT)
+    parser.add_argument("--poll-ms", type=int, default=UPDATE_INTERVAL_MS, help="how often to drain NetworkTables")
+    parser.add_argument("--stats-interval", type=float, default=10, help="seconds between status lines, 0 = quiet")
+    args = parser.parse_args(argv)
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda signum, frame: stop.set())
+
+    file_manager = LogFileManager(log_format=args.format)
+    log_file = file_manager.create_new_log_file()
+    print(f"Logging to: {log_file}")
+
+    def status_text(connected: bool) -> str:
+        return "Connected" if connected else "Disconnected"
+
+    core = create_ingest(on_connection_changed=lambda connected: print(status_text(connected)),
+                         on_source_status=lambda source_id, connected: print(f"{source_id}: {status_text(connected)}"))
+
+    # only the network stage (robot -> here) exists without a display
+    metrics_path = metrics_path_for(log_file)
+    started = datetime.now()
+
+    def dump_metrics():
+        core.latency.dump(metrics_path, to_ns(datetime.now()), {
+            "session_started": started.isoformat(),
+            "dumped": datetime.now().isoformat(),
+            "ingest": core.get_ingest_stats(),
+            "writer": file_manager.get_writer_stats(),
+        })
+
+    last_stats = last_dump = time.monotonic()
+    try:
+        while not stop.wait(args.poll_ms / 1000):
+            file_manager.write_messages(core.poll())
+
+            now = time.monotonic()
+            if args.stats_interval and now - last_stats >= args.stats_interval:
+                last_stats = now
+                stats = core.get_ingest_stats()
+                writer_stats = file_manager.get_writer_stats()
+                print(f"Received: {stats['received']} | Dropped: {stats['dropped']} | "
+                      f"Disk queue: {writer_stats.get('pending', 0)} | Disk dropped: {writer_stats.get('dropped', 0)} | "
+                      f"Network latency p50/p95/p99: {core.latency.format_window('network', to_ns(datetime.now()))} | "
+                      f"File: {file_manager.get_current_filepath().name}")
+
+            if METRICS_DUMP_INTERVAL_S and now - last_dump >= METRICS_DUMP_INTERVAL_S:
+                last_dump = now
+                dump_metrics()
+    finally:
+        # whatever was still queued goes to disk before the segment is closed
+        file_manager.write_messages(core.poll() + core.flush())
+        dump_metrics()
+        core.disconnect()
+        file_manager.close_current_file()
+        file_manager.compressor.wait_idle()
+        print("Recorder stopped")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
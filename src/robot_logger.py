@@ -1,80 +1,240 @@
-from ntcore import NetworkTableInstance
+from ntcore import NetworkTableInstance, PubSubOptions
 from datetime import datetime
+import time
+
+# the clock NT timestamps values with (wpi::Now), in microseconds: the FPGA clock on the roboRIO and in simulation.
+# Off the robot without wpilib it's ntcore's own clock if this pyntcore still has it, else a plain monotonic one
+try:
+    from wpilib import RobotController
+    nt_now = RobotController.getFPGATime
+except ImportError:
+    try:
+        from ntcore import _now as nt_now
+    except ImportError:
+        def nt_now() -> int:
+            return time.monotonic_ns() // 1000
+
+
+class _Channel:
+    # one entry's publishers plus what buffered mode is holding for it until the next flush()
+    # and, with coalescing on, the run of repeats of its last message that hasn't been sent yet
+    __slots__ = ("publisher", "batch_publisher", "buffer", "dropped", "last_message", "repeats", "first_repeat",
+                 "last_repeat")
+
+    def __init__(self, publisher):
+        self.publisher = publisher
+        self.batch_publisher = None  # made on the first flush() that has something for this entry
+        self.buffer = []
+        self.dropped = 0
+        self.last_message = None
+        self.repeats = 0
+        self.first_repeat = 0
+        self.last_repeat = 0
 
 
 class RobotLogger:
+    # Buffered mode sends each entry's messages of a loop as one string array on flush(), call it once per loop
+    # Fast mode sends no text timestamp, only the NT value's own time. set_level() drops quieter messages unformatted
+    # Coalescing counts repeats of an entry's last message and sends the run as one "... [repeat xN ...]" message
+    
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+    
+    ENTRY_NAMES = ["drivetrain", "intake", "shooter", "elevator", "vision", "auto", "system", "error"]
     
     # Class variables for NetworkTables connection
     _nt_instance = None
     _log_table = None
-    _entries = {}
+    _entries = {}  # entry name -> _Channel
     _initialized = False
     
+    _buffered = False
+    _fast = False
+    _coalesce = False
+    _level = 0  # everything goes out until set_level() says otherwise
+    
+    # the log_<subsystem> helpers' channels, looked up once in initialize() instead of on every call
+    _drivetrain = _intake = _shooter = _elevator = _vision = _auto = _system = _error = None
+    
+    # caps what one loop can queue per entry so a runaway log call can't grow the flush without bound
+    MAX_BUFFERED_PER_FLUSH = 256
+    COALESCE_WINDOW_US = 1000000
+    BATCH_TABLE = "batch"
+    
+    # keepDuplicates so repeated messages (e.g. "Brake mode engaged") are still sent to the dashboard
+    _publish_options = PubSubOptions(sendAll=True, keepDuplicates=True)
+    
     @classmethod
-    def initialize(cls):
-        if cls._initialized:
+    def initialize(cls, instance: NetworkTableInstance = None, buffered: bool = None, fast: bool = None,
+                   coalesce: bool = None):
+        # instance defaults to the robot's default NT instance, benchmarks pass their own.
+        # buffered/fast/coalesce=None keep the current mode (all off to begin with)
+        if cls._initialized and instance is None:
+            if coalesce is not None and coalesce != cls._coalesce:
+                cls._send_repeats(force=True)
+                cls._coalesce = coalesce
+            if buffered is not None and buffered != cls._buffered:
+                cls.flush()
+                cls._buffered = buffered
+            if fast is not None:
+                cls._fast = fast
             return
         
-        cls._nt_instance = NetworkTableInstance.getDefault()
+        cls._nt_instance = instance or NetworkTableInstance.getDefault()
         cls._log_table = cls._nt_instance.getTable("Logging")
+        if buffered is not None:
+            cls._buffered = buffered
+        if fast is not None:
+            cls._fast = fast
+        if coalesce is not None:
+            cls._coalesce = coalesce
         
         # predefined logging entries for diff subsystems
-        cls._entries = {
-            "drivetrain": cls._log_table.getStringTopic("drivetrain").publish(),
-            "intake": cls._log_table.getStringTopic("intake").publish(),
-            "shooter": cls._log_table.getStringTopic("shooter").publish(),
-            "elevator": cls._log_table.getStringTopic("elevator").publish(),
-            "vision": cls._log_table.getStringTopic("vision").publish(),
-            "auto": cls._log_table.getStringTopic("auto").publish(),
-            "system": cls._log_table.getStringTopic("system").publish(),
-            "error": cls._log_table.getStringTopic("error").publish(),
-        }
+        cls._entries = {}
+        for entry_name in cls.ENTRY_NAMES:
+            setattr(cls, f"_{entry_name}", cls._add_entry(entry_name))
         
         cls._initialized = True
     
     @classmethod
-    def log(cls, entry_name: str, message: str):
+    def set_level(cls, level: int):
+        # e.g. RobotLogger.set_level(RobotLogger.WARNING) in competition to skip the chatty stuff
+        cls._level = level
+    
+    @classmethod
+    def _add_entry(cls, entry_name: str) -> _Channel:
+        channel = cls._entries[entry_name] = _Channel(
+            cls._log_table.getStringTopic(entry_name).publish(cls._publish_options)
+        )
+        return channel
+    
+    @classmethod
+    def _channel(cls, entry_name: str) -> _Channel:
         if not cls._initialized:
             cls.initialize()
+        return cls._entries.get(entry_name) or cls._add_entry(entry_name)
+    
+    @classmethod
+    def log(cls, entry_name: str, message: str, *args, level: int = INFO):
+        if level < cls._level:
+            return
+        cls._write(cls._channel(entry_name), message, args)
+    
+    @classmethod
+    def _write(cls, channel: _Channel, message: str, args: tuple):
+        if args:
+            message = message % args
         
-        if entry_name not in cls._entries:
-            cls._entries[entry_name] = cls._log_table.getStringTopic(entry_name).publish()
-
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        formatted_message = f"[{timestamp}] {message}"
+        if cls._coalesce:
+            if message == channel.last_message:
+                now = nt_now()
+                if not channel.repeats:
+                    channel.first_repeat = now
+                channel.repeats += 1
+                channel.last_repeat = now
+                if now - channel.first_repeat >= cls.COALESCE_WINDOW_US:
+                    cls._send_run(channel)
+                return
+            if channel.repeats:
+                cls._send_run(channel)
+            channel.last_message = message
         
-        cls._entries[entry_name].set(formatted_message)
+        cls._send(channel, message)
+    
+    @classmethod
+    def _send_run(cls, channel: _Channel):
+        cls._send(channel, f"{channel.last_message} [repeat x{channel.repeats} "
+                           f"first={channel.first_repeat} last={channel.last_repeat}]")
+        channel.repeats = 0
+    
+    @classmethod
+    def _send_repeats(cls, force: bool = False):
+        # runs that have been counting for the whole window (or all of them) go out
+        now = nt_now()
+        for channel in cls._entries.values():
+            if channel.repeats and (force or now - channel.first_repeat >= cls.COALESCE_WINDOW_US):
+                cls._send_run(channel)
+    
+    @classmethod
+    def _send(cls, channel: _Channel, message: str):
+        if cls._fast:
+            timestamp = nt_now()
+        else:
+            message = f"[{cls._timestamp()}] {message}"
+            timestamp = 0  # NT stamps it with the current time
+        
+        if not cls._buffered:
+            channel.publisher.set(message, timestamp)
+        elif len(channel.buffer) < cls.MAX_BUFFERED_PER_FLUSH:
+            channel.buffer.append(message)
+        else:
+            channel.dropped += 1
+    
+    @staticmethod
+    def _timestamp() -> str:
+        return datetime.now().strftime("%H:%M:%S.%f")[:-3]
+    
+    @classmethod
+    def flush(cls):
+        # publishes everything buffered since the last flush, one string array per entry that has something.
+        # Also what bounds how long a coalesced run can wait, so call it every loop with coalescing on too
+        if cls._coalesce:
+            cls._send_repeats()
+        
+        for entry_name, channel in cls._entries.items():
+            buffer = channel.buffer
+            if not buffer:
+                continue
+            if channel.dropped:
+                notice = f"[logger] {channel.dropped} more messages dropped this loop"
+                buffer.append(notice if cls._fast else f"[{cls._timestamp()}] {notice}")
+                channel.dropped = 0
+        
+            if channel.batch_publisher is None:
+                topic = cls._log_table.getSubTable(cls.BATCH_TABLE).getStringArrayTopic(entry_name)
+                channel.batch_publisher = topic.publish(cls._publish_options)
+            channel.batch_publisher.set(buffer)
+            buffer.clear()
     
-
     
     @classmethod
-    def log_drivetrain(cls, message: str):
-        cls.log("drivetrain", message)
+    def log_drivetrain(cls, message: str, *args, level: int = INFO):
+        if level >= cls._level:
+            cls._write(cls._drivetrain or cls._channel("drivetrain"), message, args)
     
     @classmethod
-    def log_intake(cls, message: str):
-        cls.log("intake", message)
+    def log_intake(cls, message: str, *args, level: int = INFO):
+        if level >= cls._level:
+            cls._write(cls._intake or cls._channel("intake"), message, args)
     
     @classmethod
-    def log_shooter(cls, message: str):
-        cls.log("shooter", message)
+    def log_shooter(cls, message: str, *args, level: int = INFO):
+        if level >= cls._level:
+            cls._write(cls._shooter or cls._channel("shooter"), message, args)
     
     @classmethod
-    def log_elevator(cls, message: str):
-        cls.log("elevator", message)
+    def log_elevator(cls, message: str, *args, level: int = INFO):
+        if level >= cls._level:
+            cls._write(cls._elevator or cls._channel("elevator"), message, args)
     
     @classmethod
-    def log_vision(cls, message: str):
-        cls.log("vision", message)
+    def log_vision(cls, message: str, *args, level: int = INFO):
+        if level >= cls._level:
+            cls._write(cls._vision or cls._channel("vision"), message, args)
     
     @classmethod
-    def log_auto(cls, message: str):
-        cls.log("auto", message)
+    def log_auto(cls, message: str, *args, level: int = INFO):
+        if level >= cls._level:
+            cls._write(cls._auto or cls._channel("auto"), message, args)
     
     @classmethod
-    def log_system(cls, message: str):
-        cls.log("system", message)
+    def log_system(cls, message: str, *args, level: int = INFO):
+        if level >= cls._level:
+            cls._write(cls._system or cls._channel("system"), message, args)
     
     @classmethod
-    def log_error(cls, message: str):
-        cls.log("error", message)
\ No newline at end of file
+    def log_error(cls, message: str, *args, level: int = ERROR):
+        if level >= cls._level:
+            cls._write(cls._error or cls._channel("error"), message, args)